@@ -1,6 +1,22 @@
-from .core import CodeGenCore, ConfigManager, CodeGenerator, TemplateManager
-from .templates import list_templates, read_template, get_template_path
-from .utils import create_directory, write_file, camel_to_snake, snake_to_camel
+from .utils.lazy import lazy_attributes
+
+# Public names are imported on first use: importing code_gen_lib does not load
+# jinja2 or yaml until a class that needs them is accessed.
+_LAZY_ATTRIBUTES = {
+    'CodeGenCore': ('.core', 'CodeGenCore'),
+    'ConfigManager': ('.core.config_manager', 'ConfigManager'),
+    'CodeGenerator': ('.core.generator', 'CodeGenerator'),
+    'AsyncCodeGenerator': ('.core.async_generator', 'AsyncCodeGenerator'),
+    'TemplateManager': ('.core.template_manager', 'TemplateManager'),
+    'list_templates': ('.templates', 'list_templates'),
+    'read_template': ('.templates', 'read_template'),
+    'get_template_path': ('.templates', 'get_template_path'),
+    'create_directory': ('.utils.file_operations', 'ensure_directory'),
+    'write_file': ('.utils.file_operations', 'write_file'),
+    'camel_to_snake': ('.utils.string_utils', 'camel_to_snake'),
+    'snake_to_camel': ('.utils.string_utils', 'snake_to_camel'),
+}
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES, globals())
 
 # Version of the code_gen_lib package
 __version__ = '0.1.0'
@@ -25,6 +41,7 @@ class CodeGenLib:
     to all major components and functionalities.
     """
     def __init__(self, config_file):
+        from .core import CodeGenCore
         self.core = CodeGenCore(config_file)
 
     def generate_code(self, template_name, context):
@@ -45,34 +62,40 @@ class CodeGenLib:
 
     def list_templates(self):
         """List all available templates."""
+        from .templates import list_templates
         return list_templates()
 
     def read_template(self, folder, template_name):
         """Read the content of a specific template."""
+        from .templates import read_template
         return read_template(folder, template_name)
 
     @staticmethod
     def create_directory(path):
         """Create a directory."""
-        create_directory(path)
+        from .utils.file_operations import ensure_directory
+        ensure_directory(path)
 
     @staticmethod
     def write_file(path, content):
         """Write content to a file."""
+        from .utils.file_operations import write_file
         write_file(path, content)
 
     @staticmethod
     def camel_to_snake(name):
         """Convert a string from camelCase to snake_case."""
+        from .utils.string_utils import camel_to_snake
         return camel_to_snake(name)
 
     @staticmethod
     def snake_to_camel(name):
         """Convert a string from snake_case to camelCase."""
+        from .utils.string_utils import snake_to_camel
         return snake_to_camel(name)
 
 # Define what should be imported with "from code_gen_lib import *"
-__all__ = ['CodeGenLib', 'CodeGenCore', 'ConfigManager', 'CodeGenerator', 'TemplateManager',
+__all__ = ['CodeGenLib', 'CodeGenCore', 'ConfigManager', 'CodeGenerator', 'AsyncCodeGenerator', 'TemplateManager',
            'list_templates', 'read_template', 'get_template_path',
            'create_directory', 'write_file', 'camel_to_snake', 'snake_to_camel',
            'get_library_info']
\ No newline at end of file
@@ -0,0 +1,5 @@
+"""
+Performance benchmarks for code_gen_lib.
+
+Run the suite with ``python -m code_gen_lib.benchmarks.bench_generation --help``.
+"""
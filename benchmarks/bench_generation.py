@@ -0,0 +1,378 @@
+"""
+Throughput benchmarks for rendering, writing and end-to-end generation.
+
+Every benchmark runs over the shipped templates ('crud/crud_operations',
+'database/connection' and every 'framework_configs/*' template) with synthetic
+contexts for 10 up to 100k models. Rendering is measured with a cold (freshly
+created) and a warm (already compiled) environment; end-to-end generation is
+measured with the serial, thread and process backends.
+
+Results are written as JSON and can be compared against a stored baseline:
+
+    python -m code_gen_lib.benchmarks.bench_generation --scales 10,1000 --output bench.json
+    python -m code_gen_lib.benchmarks.bench_generation --baseline bench.json --tolerance 0.25
+
+The comparison exits with status 1 when a benchmark is slower than its baseline
+by more than the tolerance.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import jinja2
+import yaml
+from ..core.generator import CodeGenerator
+from ..core.manifest import library_version
+from ..core.template_manager import TemplateManager
+from ..templates import TEMPLATE_BASE_PATH
+from ..utils.file_operations import BatchFileWriter, write_file
+
+DEFAULT_SCALES = (10, 100, 1000)
+MAX_SCALE = 100000
+DEFAULT_TOLERANCE = 0.2
+RESULT_FORMAT_VERSION = 1
+
+BACKENDS = ('serial', 'thread', 'process')
+
+
+def shipped_templates():
+    """
+    List the shipped templates covered by the benchmarks.
+
+    Returns:
+        list: Template names, relative to the templates package.
+    """
+    framework_dir = os.path.join(TEMPLATE_BASE_PATH, 'framework_configs')
+    framework_templates = sorted(f"framework_configs/{filename}" for filename in os.listdir(framework_dir)
+                                 if filename.endswith('.jinja2'))
+    return ['crud/crud_operations.py.jinja2', 'database/connection.py.jinja2'] + framework_templates
+
+
+def synthetic_context(index):
+    """
+    Build a context for one synthetic model, covering every shipped template.
+
+    Args:
+        index (int): Number of the model; makes every context distinct.
+
+    Returns:
+        dict: The template context.
+    """
+    name = f"Model{index}"
+    database_url = f"postgresql://user:secret@db{index % 8}.internal:5432/app_{index}"
+    return {
+        'model_name': name,
+        'model_name_snake': f"model{index}",
+        'database_url': database_url,
+        'database_engine': 'postgresql',
+        'database_name': f"app_{index}",
+        'database_user': 'user',
+        'database_password': 'secret',
+        'database_host': f"db{index % 8}.internal",
+        'database_port': 5432,
+        'project_name': f"project_{index}",
+        'app_name': f"App {index}",
+        'secret_key': f"secret-{index:08d}",
+        'debug': index % 2 == 0,
+        'allowed_hosts': ['localhost', f"host{index}.example.com"],
+        'custom_apps': [f"app_{index}_{n}" for n in range(3)],
+        'language_code': 'en-us',
+        'time_zone': 'UTC',
+        'access_token_expire_minutes': 30,
+        'algorithm': 'HS256',
+        'dev_database_name': f"dev_{index}",
+        'test_database_name': f"test_{index}",
+        'broker_url': 'redis://localhost:6379/0',
+        'backend_url': 'redis://localhost:6379/1',
+        'result_expires': 3600,
+        'scheduled_tasks': {
+            f"task_{n}": {'task': f"project_{index}.tasks.task_{n}", 'schedule': 60.0 * (n + 1), 'args': [n]}
+            for n in range(3)
+        },
+        'markers': ['slow: marks slow tests', f"model{index}: tests for {name}"],
+        'env_vars': {'APP_ENV': 'test', 'MODEL': name},
+    }
+
+
+def build_workload(scale, templates):
+    """
+    Spread ``scale`` synthetic models over the templates.
+
+    Args:
+        scale (int): Number of synthetic models.
+        templates (list): Template names to cycle through.
+
+    Returns:
+        list: (template_name, context) pairs.
+    """
+    return [(templates[index % len(templates)], synthetic_context(index)) for index in range(scale)]
+
+
+def _measure(name, scale, func, repeat):
+    # Best of ``repeat`` runs; the minimum is the least noisy estimate.
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    seconds = min(timings)
+    return {
+        'name': name,
+        'scale': scale,
+        'seconds': seconds,
+        'items_per_second': scale / seconds if seconds else None,
+        'runs': timings,
+    }
+
+
+def bench_render(scale, templates, repeat):
+    """
+    Benchmark TemplateManager.render_template with a cold and a warm environment.
+
+    The cold case creates a new environment inside the timed region, so every
+    template is loaded and compiled once; the warm case reuses an environment
+    whose templates are already compiled. The bulk case renders the same
+    workload through TemplateManager.render_many on the warm environment.
+
+    Returns:
+        list: Result records.
+    """
+    workload = build_workload(scale, templates)
+    template_dirs = [TEMPLATE_BASE_PATH]
+
+    def render_all(template_manager):
+        for template_name, context in workload:
+            template_manager.render_template(template_name, context)
+
+    def cold():
+        render_all(TemplateManager(template_dirs, shared_environment=False))
+
+    warm_manager = TemplateManager(template_dirs, shared_environment=False)
+    for template_name in templates:
+        warm_manager.get_template(template_name)
+
+    def render_bulk():
+        # One render_many() run per template, as a bulk job over many models would.
+        for template_name in templates:
+            contexts = (context for name, context in workload if name == template_name)
+            for _ in warm_manager.render_many(template_name, contexts):
+                pass
+
+    return [
+        _measure('render.cold', scale, cold, repeat),
+        _measure('render.warm', scale, lambda: render_all(warm_manager), repeat),
+        _measure('render.many', scale, render_bulk, repeat),
+    ]
+
+
+def bench_write(scale, templates, repeat, work_dir):
+    """
+    Benchmark writing pre-rendered outputs with write_file and BatchFileWriter.
+
+    Returns:
+        list: Result records.
+    """
+    template_manager = TemplateManager([TEMPLATE_BASE_PATH])
+    outputs = [template_manager.render_template(template_name, context)
+               for template_name, context in build_workload(scale, templates)]
+    paths = [_output_path(work_dir, index) for index in range(scale)]
+
+    def write_each():
+        for path, content in zip(paths, outputs):
+            write_file(path, content)
+
+    def write_batch():
+        writer = BatchFileWriter()
+        for path, content in zip(paths, outputs):
+            writer.write(path, content)
+        writer.commit()
+
+    results = []
+    for name, func in (('write.write_file', write_each), ('write.batch_writer', write_batch)):
+        shutil.rmtree(work_dir, ignore_errors=True)
+        results.append(_measure(name, scale, func, repeat))
+    return results
+
+
+def bench_generate(scale, templates, repeat, work_dir, workers, backends=BACKENDS):
+    """
+    Benchmark CodeGenerator.generate_multiple end to end on each backend.
+
+    Returns:
+        list: Result records.
+    """
+    config_path = os.path.join(work_dir, 'bench_config.yaml')
+    os.makedirs(work_dir, exist_ok=True)
+    with open(config_path, 'w') as f:
+        yaml.dump({'template_dirs': [TEMPLATE_BASE_PATH]}, f)
+    generator = CodeGenerator(config_path)
+    output_dir = os.path.join(work_dir, 'generated')
+    generation_configs = [
+        {'template_name': template_name, 'output_path': _output_path(output_dir, index), 'context': context}
+        for index, (template_name, context) in enumerate(build_workload(scale, templates))
+    ]
+
+    def generate(backend):
+        result = generator.generate_multiple(generation_configs, workers=workers, executor=backend)
+        result.raise_for_errors()
+
+    results = []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for backend in backends:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            results.append(_measure(f"generate.{backend}", scale, lambda: generate(backend), repeat))
+    return results
+
+
+def _output_path(base_dir, index):
+    # 1000 files per directory keeps the layout close to a real project tree.
+    return os.path.join(base_dir, f"pkg_{index // 1000}", f"model_{index}.py")
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=3, workers=None, templates=None, backends=BACKENDS):
+    """
+    Run the whole benchmark suite.
+
+    Args:
+        scales (iterable): Numbers of synthetic models to benchmark with.
+        repeat (int): Runs per benchmark; the fastest run is reported.
+        workers (int, optional): Pool size for the parallel backends. Defaults to
+                                 the CPU count.
+        templates (list, optional): Template names. Defaults to every shipped template.
+        backends (iterable): Backends for the end-to-end benchmark.
+
+    Returns:
+        dict: The report, with environment metadata and one record per benchmark.
+
+    Raises:
+        ValueError: If a scale is outside 1..100000.
+    """
+    templates = templates or shipped_templates()
+    workers = workers or os.cpu_count() or 1
+    results = []
+    for scale in scales:
+        if not 1 <= scale <= MAX_SCALE:
+            raise ValueError(f"Scale must be between 1 and {MAX_SCALE}: {scale}")
+        work_dir = tempfile.mkdtemp(prefix='codegen-bench-')
+        try:
+            results.extend(bench_render(scale, templates, repeat))
+            results.extend(bench_write(scale, templates, repeat, os.path.join(work_dir, 'write')))
+            results.extend(bench_generate(scale, templates, repeat, os.path.join(work_dir, 'generate'),
+                                          workers, backends))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        'format_version': RESULT_FORMAT_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'jinja2': jinja2.__version__,
+            'code_gen_lib': library_version(),
+            'workers': workers,
+        },
+        'templates': templates,
+        'results': results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a report against a baseline report.
+
+    Args:
+        report (dict): The current report.
+        baseline (dict): A report produced by an earlier run.
+        tolerance (float): Allowed slowdown as a fraction, e.g. 0.2 for 20%.
+
+    Returns:
+        list: One dict per benchmark found in both reports, with the baseline and
+              current seconds, the relative change and whether it regressed.
+    """
+    baseline_results = {(record['name'], record['scale']): record for record in baseline.get('results', [])}
+    comparison = []
+    for record in report['results']:
+        previous = baseline_results.get((record['name'], record['scale']))
+        if previous is None or not previous['seconds']:
+            continue
+        change = record['seconds'] / previous['seconds'] - 1
+        comparison.append({
+            'name': record['name'],
+            'scale': record['scale'],
+            'baseline_seconds': previous['seconds'],
+            'seconds': record['seconds'],
+            'change': change,
+            'regressed': change > tolerance,
+        })
+    return comparison
+
+
+def format_report(report, comparison=None):
+    """
+    Format a report as a human-readable table.
+
+    Returns:
+        str: One line per benchmark.
+    """
+    changes = {(entry['name'], entry['scale']): entry for entry in comparison or []}
+    lines = [f"{'benchmark':<22}{'scale':>8}{'seconds':>12}{'items/s':>12}{'vs baseline':>14}"]
+    for record in report['results']:
+        entry = changes.get((record['name'], record['scale']))
+        change = ''
+        if entry is not None:
+            change = f"{entry['change'] * 100:+.1f}%{' !' if entry['regressed'] else ''}"
+        lines.append(f"{record['name']:<22}{record['scale']:>8}{record['seconds']:>12.4f}"
+                     f"{record['items_per_second'] or 0:>12.0f}{change:>14}")
+    return '\n'.join(lines)
+
+
+def _parse_scales(value):
+    return [int(scale) for scale in value.split(',') if scale]
+
+
+def main(argv=None):
+    """
+    Command-line entry point.
+
+    Returns:
+        int: 0 on success, 1 if a benchmark regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--scales', type=_parse_scales, default=list(DEFAULT_SCALES),
+                        help=f"comma-separated model counts, up to {MAX_SCALE} (default: 10,100,1000)")
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark; the fastest is kept')
+    parser.add_argument('--workers', type=int, default=None, help='pool size for the parallel backends')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='comma-separated generate_multiple backends to benchmark')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='compare against a JSON report from an earlier run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown against the baseline as a fraction (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.scales, args.repeat, args.workers,
+                            backends=[backend for backend in args.backends.split(',') if backend])
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare_to_baseline(report, json.load(f), args.tolerance)
+        report['comparison'] = comparison
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(format_report(report, comparison))
+
+    if comparison and any(entry['regressed'] for entry in comparison):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Import-time benchmark for code_gen_lib.
+
+Each measurement runs a fresh interpreter with ``-X importtime`` and sums the
+cumulative time of the imports the measured statement triggered. Besides plain
+``import code_gen_lib``, the first access to a lazily loaded class is measured,
+and the report lists which heavy dependencies a bare import pulled in.
+
+    python -m code_gen_lib.benchmarks.bench_import --output imports.json
+    python -m code_gen_lib.benchmarks.bench_import --baseline imports.json
+
+The comparison exits with status 1 when an import got slower than the tolerance
+allows, or when a bare import loads jinja2 or yaml again.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from .bench_generation import DEFAULT_TOLERANCE, compare_to_baseline, format_report
+
+PACKAGE = __package__.split('.')[0]
+
+# Dependencies that a bare 'import code_gen_lib' must not load.
+HEAVY_DEPENDENCIES = ('jinja2', 'yaml')
+
+# Written to stderr right before the measured statement runs.
+MARKER = '-- measured imports --'
+
+# (benchmark name, statement run in a fresh interpreter)
+SCENARIOS = (
+    ('import.package', f"import {PACKAGE}"),
+    ('import.utils', f"from {PACKAGE}.utils import camel_to_snake"),
+    ('import.code_generator', f"from {PACKAGE} import CodeGenerator"),
+    ('import.template_manager', f"from {PACKAGE}.core import TemplateManager"),
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse the report written by ``python -X importtime``.
+
+    Only the imports made after the ``MARKER`` line are considered, which leaves
+    out the modules imported during interpreter startup.
+
+    Args:
+        stderr (str): The interpreter's standard error output.
+
+    Returns:
+        list: (module, self microseconds, cumulative microseconds, nesting level)
+              tuples, in the order the imports finished.
+    """
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+    imports = []
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        try:
+            own, cumulative = int(fields[0]), int(fields[1])
+        except (ValueError, IndexError):
+            # The header line.
+            continue
+        name = fields[2].rstrip()
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append((name.strip(), own, cumulative, level))
+    return imports
+
+
+def measure(statement, python=sys.executable):
+    """
+    Run a statement in a fresh interpreter and measure the imports it triggers.
+
+    Args:
+        statement (str): Python code to run, e.g. 'import code_gen_lib'.
+        python (str): Interpreter to run.
+
+    Returns:
+        tuple: (seconds spent importing, parsed imports as returned by
+               parse_importtime(), set of top-level packages loaded).
+    """
+    code = (f"import sys\nsys.stderr.write({MARKER!r} + '\\n')\n{statement}\n"
+            "print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))")
+    process = subprocess.run([python, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                             cwd=_package_parent(), check=True)
+    imports = parse_importtime(process.stderr)
+    seconds = sum(cumulative for _, _, cumulative, level in imports if level == 0) / 1e6
+    return seconds, imports, set(process.stdout.split())
+
+
+def slowest_modules(imports, limit=10):
+    """
+    Rank imported modules by their own import time.
+
+    Args:
+        imports (list): Parsed imports as returned by parse_importtime().
+        limit (int): Maximum number of modules to report.
+
+    Returns:
+        list: (module, self seconds) pairs, slowest first.
+    """
+    ranked = sorted(imports, key=lambda entry: entry[1], reverse=True)[:limit]
+    return [(name, own / 1e6) for name, own, _, _ in ranked]
+
+
+def run_benchmarks(repeat=5, python=sys.executable):
+    """
+    Measure every import scenario.
+
+    Args:
+        repeat (int): Fresh interpreters per scenario; the fastest run is reported.
+        python (str): Interpreter to run.
+
+    Returns:
+        dict: The report, in the format used by bench_generation.
+    """
+    results = []
+    loaded = set()
+    for name, statement in SCENARIOS:
+        runs = [measure(statement, python) for _ in range(repeat)]
+        seconds, imports, modules = min(runs, key=lambda run: run[0])
+        if name == 'import.package':
+            loaded = modules
+        results.append({
+            'name': name,
+            'scale': 1,
+            'seconds': seconds,
+            'items_per_second': None,
+            'runs': [run[0] for run in runs],
+            'slowest_modules': slowest_modules(imports),
+        })
+    return {
+        'python': python,
+        'results': results,
+        'heavy_dependencies_loaded': sorted(set(HEAVY_DEPENDENCIES) & loaded),
+    }
+
+
+def _package_parent():
+    # The directory from which the package is importable.
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main(argv=None):
+    """
+    Command-line entry point.
+
+    Returns:
+        int: 0 on success, 1 on a regression against the baseline or eager heavy imports.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per scenario')
+    parser.add_argument('--output', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='compare against a JSON report from an earlier run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown against the baseline as a fraction (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.repeat)
+    comparison = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare_to_baseline(report, json.load(f), args.tolerance)
+        report['comparison'] = comparison
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(format_report(report, comparison))
+    if report['heavy_dependencies_loaded']:
+        print(f"'import {PACKAGE}' loaded: {', '.join(report['heavy_dependencies_loaded'])}")
+        return 1
+    if comparison and any(entry['regressed'] for entry in comparison):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
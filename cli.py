@@ -0,0 +1,555 @@
+"""
+Command-line interface of code_gen_lib.
+
+    python -m code_gen_lib generate batch.yaml
+    python -m code_gen_lib serve --socket /tmp/codegen.sock
+    python -m code_gen_lib generate batch.yaml --socket /tmp/codegen.sock
+    python -m code_gen_lib stop --socket /tmp/codegen.sock
+    python -m code_gen_lib bundle build templates.zip --config codegen.yaml
+    python -m code_gen_lib bundle check templates.zip --config codegen.yaml
+    python -m code_gen_lib generate batch.yaml --shard 0/4 --shard-result shard-0.json
+    python -m code_gen_lib merge shard-*.json --output merged.json
+    python -m code_gen_lib validate batch.yaml
+
+A batch manifest is a YAML or JSON file listing the outputs to generate:
+
+    config: codegen.yaml        # generator config, relative to the manifest
+    workers: 4                  # optional, as for generate_multiple()
+    executor: thread            # optional, as for generate_multiple()
+    validate: true              # optional, as for generate_multiple()
+    outputs:
+      - template_name: crud/crud_operations.py.jinja2
+        output_path: app/crud/user.py
+        context: {model_name: User, model_name_snake: user}
+
+A bare list of outputs is accepted as well. Relative paths are resolved against
+the manifest's directory.
+
+``serve`` keeps generators, parsed configs and compiled templates warm in a
+long-running process that listens on a Unix socket. ``generate --socket`` sends
+the batch to that server and falls back to generating in-process when no server
+is listening. Requests and responses are single lines of JSON.
+
+``generate --shard K/N`` generates only the K-th of N shards of the manifest,
+assigned by a stable hash of the output paths or, with ``--balance cost``, by
+template cost, and writes the shard's result to ``--shard-result``. ``merge``
+combines the results of every shard, checks that the manifest was covered
+exactly once and reports conflicting outputs.
+
+``validate`` checks every output of a manifest against the variables its
+template requires, without rendering, and lists every problem found.
+
+``bundle build`` precompiles the templates under the config's 'template_dirs'
+into a zip archive or directory for the config's 'bundle' section; ``bundle
+check`` exits with status 1 when a bundle is stale.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+# Exit statuses.
+EXIT_OK = 0
+EXIT_FAILED_ITEMS = 1
+EXIT_ERROR = 2
+
+
+class CLIError(Exception):
+    """Raised for invalid manifests and server communication problems."""
+    pass
+
+
+def load_manifest(manifest_path, config_path=None):
+    """
+    Load a batch manifest and resolve its paths.
+
+    Args:
+        manifest_path (str): Path of the YAML or JSON manifest.
+        config_path (str, optional): Generator config overriding the manifest's 'config'.
+
+    Returns:
+        dict: Request with absolute 'config' path, 'outputs' list and optional
+              'workers' and 'executor'.
+
+    Raises:
+        CLIError: If the manifest cannot be read or is malformed.
+    """
+    try:
+        with open(manifest_path, 'r') as f:
+            if manifest_path.endswith('.json'):
+                manifest = json.load(f)
+            else:
+                import yaml
+                manifest = yaml.safe_load(f)
+    except (OSError, ValueError) as e:
+        raise CLIError(f"Cannot read manifest {manifest_path}: {e}")
+    except Exception as e:
+        # yaml.YAMLError; yaml is imported lazily.
+        raise CLIError(f"Cannot parse manifest {manifest_path}: {e}")
+
+    if isinstance(manifest, list):
+        manifest = {'outputs': manifest}
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('outputs'), list):
+        raise CLIError(f"Manifest {manifest_path} must be a list of outputs or a mapping with 'outputs'")
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    config_path = config_path or manifest.get('config')
+    if not config_path:
+        raise CLIError("No generator config given; set 'config' in the manifest or pass --config")
+
+    outputs = []
+    for number, item in enumerate(manifest['outputs']):
+        if not isinstance(item, dict) or not item.get('template_name') or not item.get('output_path'):
+            raise CLIError(f"Output #{number} needs 'template_name' and 'output_path'")
+        outputs.append(dict(item, output_path=os.path.join(base_dir, item['output_path'])))
+    return {
+        'command': 'generate',
+        'config': os.path.join(base_dir, config_path),
+        'outputs': outputs,
+        'workers': manifest.get('workers'),
+        'executor': manifest.get('executor'),
+        'validate': manifest.get('validate'),
+    }
+
+
+def batch_to_dict(batch):
+    """
+    Convert a BatchResult into JSON-serializable data.
+
+    Args:
+        batch (BatchResult): The result of a batch.
+
+    Returns:
+        dict: 'ok', 'summary', 'stale', 'hook_errors' and one entry per item under 'results'.
+    """
+    return {
+        'ok': not batch.failed and not batch.hook_errors,
+        'summary': batch.summary(),
+        'stale': list(batch.stale),
+        'hook_errors': [{'hook': name, 'error': str(error)} for name, error in batch.hook_errors],
+        'results': [{
+            'index': result.index,
+            'template_name': result.template_name,
+            'output_path': result.output_path,
+            'status': result.status,
+            'error': str(result.error) if result.error is not None else None,
+            'duration': result.duration,
+        } for result in batch.results],
+    }
+
+
+class GeneratorPool:
+    """
+    CodeGenerator instances kept warm per config file.
+
+    Each generator is reused for every request naming its config; the config is
+    re-read only when it changed on disk. Requests for the same config run one
+    at a time; requests for different configs run concurrently.
+    """
+
+    def __init__(self):
+        """Initialize an empty GeneratorPool."""
+        self._generators = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._generators)
+
+    def generate(self, request):
+        """
+        Run a 'generate' request.
+
+        Args:
+            request (dict): Request as produced by load_manifest().
+
+        Returns:
+            dict: Response as produced by batch_to_dict().
+        """
+        from .core.generator import CodeGenerator
+        config_path = os.path.abspath(request['config'])
+        with self._lock:
+            entry = self._generators.get(config_path)
+            if entry is None:
+                entry = self._generators[config_path] = [None, threading.Lock()]
+        with entry[1]:
+            if entry[0] is None:
+                entry[0] = CodeGenerator(config_path)
+            else:
+                entry[0].reload_config()
+            batch = entry[0].generate_multiple(request['outputs'], workers=request.get('workers'),
+                                               executor=request.get('executor'), validate=request.get('validate'))
+        return batch_to_dict(batch)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            start = time.perf_counter()
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+            self.wfile.flush()
+            self.server.log(f"{response.get('command', 'request')} handled in "
+                            f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+class GenerationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix-socket server that generates batches with warm generators.
+
+    Every connection may send any number of requests, one JSON object per line,
+    and gets one JSON line back per request. Supported commands are 'generate'
+    (see load_manifest()), 'ping' and 'shutdown'.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, log=None):
+        """
+        Initialize the GenerationServer and bind its socket.
+
+        The socket is only accessible by the current user.
+
+        Args:
+            socket_path (str): Path of the Unix socket.
+            log (file, optional): Stream for one log line per request. Defaults to stderr.
+
+        Raises:
+            CLIError: If another server is already listening on the socket.
+        """
+        if os.path.exists(socket_path):
+            if _server_alive(socket_path):
+                raise CLIError(f"A server is already listening on {socket_path}")
+            # Left behind by a server that did not shut down cleanly.
+            os.remove(socket_path)
+        self.socket_path = socket_path
+        self.pool = GeneratorPool()
+        self.started = time.time()
+        self._log = log if log is not None else sys.stderr
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def log(self, message):
+        print(f"[code_gen_lib] {message}", file=self._log, flush=True)
+
+    def dispatch(self, line):
+        """
+        Decode and run one request.
+
+        Args:
+            line (bytes): The JSON request line.
+
+        Returns:
+            dict: The response; failures are reported with 'ok': False and 'error'.
+        """
+        try:
+            request = json.loads(line)
+            command = request.get('command', 'generate')
+            if command == 'generate':
+                response = self.pool.generate(request)
+            elif command == 'ping':
+                response = {'ok': True, 'pid': os.getpid(), 'generators': len(self.pool),
+                            'uptime': time.time() - self.started}
+            elif command == 'shutdown':
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                response = {'ok': True}
+            else:
+                response = {'ok': False, 'error': f"Unknown command: {command}"}
+        except Exception as e:
+            command = None
+            response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        response['command'] = command
+        return response
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def send_request(socket_path, request, timeout=None):
+    """
+    Send one request to a running server and wait for the response.
+
+    Args:
+        socket_path (str): Path of the server's Unix socket.
+        request (dict): The request.
+        timeout (float, optional): Socket timeout in seconds.
+
+    Returns:
+        dict: The decoded response.
+
+    Raises:
+        ConnectionError: If no server is listening on the socket.
+        CLIError: If the server closed the connection without answering.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No server listening on {socket_path}: {e}")
+        client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with client.makefile('rb') as stream:
+            line = stream.readline()
+    if not line:
+        raise CLIError("The server closed the connection without answering")
+    return json.loads(line)
+
+
+def _server_alive(socket_path):
+    try:
+        return send_request(socket_path, {'command': 'ping'}, timeout=1.0).get('ok', False)
+    except (ConnectionError, OSError, CLIError, ValueError):
+        return False
+
+
+def _generate(args):
+    request = load_manifest(args.manifest, args.config)
+    if args.workers is not None:
+        request['workers'] = args.workers
+    if args.executor is not None:
+        request['executor'] = args.executor
+    if args.validate:
+        request['validate'] = True
+    if args.shard is not None:
+        return _generate_shard(args, request)
+
+    response = None
+    if args.socket:
+        try:
+            response = send_request(args.socket, request)
+        except ConnectionError as e:
+            print(f"{e}; generating in-process", file=sys.stderr)
+    if response is None:
+        response = GeneratorPool().generate(request)
+
+    if args.json:
+        print(json.dumps(response, indent=2))
+    elif 'error' in response:
+        print(f"Error: {response['error']}", file=sys.stderr)
+    else:
+        for result in response['results']:
+            if result['error'] is not None:
+                print(f"Failed {result['output_path']}: {result['error']}", file=sys.stderr)
+            elif result['status'] == 'generated' and not args.quiet:
+                print(f"Generated {result['output_path']}")
+        for hook_error in response.get('hook_errors', []):
+            print(f"Batch hook {hook_error['hook']} failed: {hook_error['error']}", file=sys.stderr)
+        summary = response['summary']
+        print(f"{summary['generated']} generated, {summary['skipped']} skipped, "
+              f"{summary['failed']} failed in {summary['wall_time'] * 1000:.1f} ms")
+    if 'error' in response:
+        return EXIT_ERROR
+    return EXIT_OK if response['ok'] else EXIT_FAILED_ITEMS
+
+
+def _parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}'; expected INDEX/COUNT, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}'; INDEX must be between 0 and COUNT - 1")
+    return index, count
+
+
+def _load_costs(path):
+    # Either a mapping of template names to costs or a merged shard result.
+    with open(path, 'r') as f:
+        costs = json.load(f)
+    if 'shards' in costs and 'outputs' in costs:
+        costs = costs['shards']['template_costs']
+    if not isinstance(costs, dict):
+        raise CLIError(f"{path} does not hold template costs")
+    return costs
+
+
+def _generate_shard(args, request):
+    from .core.generator import CodeGenerator
+    from .core.sharding import generate_shard
+    shard_index, shard_count = args.shard
+    costs = _load_costs(args.costs) if args.costs else None
+    root = os.path.dirname(os.path.abspath(args.manifest))
+    generator = CodeGenerator(request['config'])
+    response = generate_shard(generator, request['outputs'], shard_index, shard_count, args.shard_result,
+                              args.balance, costs, root, request.get('workers'), request.get('executor'))
+    failed = [record for record in response['outputs'] if record['status'] == 'failed']
+    if args.json:
+        print(json.dumps(response, indent=2))
+    else:
+        for record in failed:
+            print(f"Failed {record['output_path']}: {record['error']}", file=sys.stderr)
+        print(f"Shard {shard_index}/{shard_count}: {len(response['outputs'])} outputs, {len(failed)} failed "
+              f"in {response['wall_time'] * 1000:.1f} ms")
+    return EXIT_FAILED_ITEMS if failed else EXIT_OK
+
+
+def _validate(args):
+    from .core.generator import CodeGenerator
+    request = load_manifest(args.manifest, args.config)
+    issues = CodeGenerator(request['config']).validate_manifest(request['outputs'])
+    for issue in issues:
+        print(issue, file=sys.stderr)
+    print(f"{len(request['outputs'])} outputs checked, {len(issues)} problem(s) found")
+    return EXIT_FAILED_ITEMS if issues else EXIT_OK
+
+
+def _merge(args):
+    from .core.sharding import merge_shard_results
+    merged = merge_shard_results(args.results, args.output)
+    if args.json:
+        print(json.dumps(merged, indent=2))
+    else:
+        for conflict in merged['conflicts']:
+            print(f"Conflict: {conflict['output_path']} is written by items {conflict['indices']}", file=sys.stderr)
+        summary = merged['summary']
+        print(f"Merged {merged['shards']['count']} shards: {summary['generated']} generated, "
+              f"{summary['skipped']} skipped, {summary['failed']} failed, {len(merged['conflicts'])} conflicts")
+    return EXIT_OK if merged['ok'] else EXIT_FAILED_ITEMS
+
+
+def _serve(args):
+    server = GenerationServer(args.socket)
+    server.log(f"listening on {args.socket} (pid {os.getpid()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return EXIT_OK
+
+
+def _stop(args):
+    try:
+        send_request(args.socket, {'command': 'shutdown'}, timeout=5.0)
+    except ConnectionError as e:
+        print(e, file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+
+def _bundle_template_dirs(args):
+    if args.template_dir:
+        return args.template_dir
+    if args.config:
+        from .core.config_manager import load_config_snapshot
+        template_dirs = load_config_snapshot(args.config).get('template_dirs')
+        if template_dirs:
+            return list(template_dirs)
+    from .templates import TEMPLATE_BASE_PATH
+    return [TEMPLATE_BASE_PATH]
+
+
+def _bundle_build(args):
+    from .core.bundle import build_bundle
+    bundle = build_bundle(_bundle_template_dirs(args), args.bundle, enable_async=args.enable_async)
+    print(f"Bundled {len(bundle.templates)} templates into {bundle.path}")
+    for name, error in sorted(bundle.skipped.items()):
+        print(f"Skipped {name}: {error}")
+    return EXIT_OK
+
+
+def _bundle_check(args):
+    from .core.bundle import TemplateBundle
+    bundle = TemplateBundle(args.bundle)
+    template_dirs = _bundle_template_dirs(args)
+    reason = bundle.incompatibility(args.enable_async)
+    stale = bundle.stale_templates(template_dirs)
+    unbundled = bundle.unbundled_templates(template_dirs)
+    if reason is not None:
+        print(f"Bundle is stale: {reason}")
+    for name in stale:
+        print(f"Stale: {name}")
+    for name in unbundled:
+        print(f"Not bundled: {name}")
+    if reason is not None or stale or unbundled:
+        return EXIT_FAILED_ITEMS
+    print(f"Bundle is up to date ({len(bundle.templates)} templates)")
+    return EXIT_OK
+
+
+def build_parser():
+    """
+    Build the argument parser of the command-line interface.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog='code_gen_lib', description='Generate code from templates.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='generate the outputs listed in a batch manifest')
+    generate.add_argument('manifest', help='YAML or JSON batch manifest')
+    generate.add_argument('--config', help="generator config; overrides the manifest's 'config'")
+    generate.add_argument('--workers', type=int, help='number of pool workers')
+    generate.add_argument('--executor', choices=('serial', 'thread', 'process'), help='execution backend')
+    generate.add_argument('--socket', help='send the batch to the server listening on this socket')
+    generate.add_argument('--json', action='store_true', help='print the full result as JSON')
+    generate.add_argument('--quiet', action='store_true', help='do not print a line per output')
+    generate.add_argument('--validate', action='store_true',
+                          help='check every output before rendering and stop if any is invalid')
+    generate.add_argument('--shard', type=_parse_shard, metavar='INDEX/COUNT',
+                          help='generate only one shard of the manifest, e.g. 0/4')
+    generate.add_argument('--balance', choices=('hash', 'cost'), default='hash',
+                          help='assign outputs to shards by path hash or by template cost')
+    generate.add_argument('--costs', help='JSON template costs, or a merged shard result, for --balance cost')
+    generate.add_argument('--shard-result', help='file the shard result is written to')
+    generate.set_defaults(handler=_generate)
+
+    validate = commands.add_parser('validate', help='check a batch manifest without rendering it')
+    validate.add_argument('manifest', help='YAML or JSON batch manifest')
+    validate.add_argument('--config', help="generator config; overrides the manifest's 'config'")
+    validate.set_defaults(handler=_validate)
+
+    merge = commands.add_parser('merge', help='combine the results of every shard of a manifest')
+    merge.add_argument('results', nargs='+', help='shard result files')
+    merge.add_argument('--output', help='file the merged result is written to')
+    merge.add_argument('--json', action='store_true', help='print the merged result as JSON')
+    merge.set_defaults(handler=_merge)
+
+    serve = commands.add_parser('serve', help='keep generators warm behind a Unix socket')
+    serve.add_argument('--socket', required=True, help='path of the Unix socket to listen on')
+    serve.set_defaults(handler=_serve)
+
+    stop = commands.add_parser('stop', help='stop a running server')
+    stop.add_argument('--socket', required=True, help="path of the server's Unix socket")
+    stop.set_defaults(handler=_stop)
+
+    bundle = commands.add_parser('bundle', help='precompile templates into a bundle')
+    bundle_commands = bundle.add_subparsers(dest='bundle_command', required=True)
+    for name, handler, help_text in (('build', _bundle_build, 'build a bundle'),
+                                     ('check', _bundle_check, 'check a bundle against the template sources')):
+        command = bundle_commands.add_parser(name, help=help_text)
+        command.add_argument('bundle', help='bundle path; a .zip archive or a directory')
+        command.add_argument('--config', help="generator config whose 'template_dirs' are bundled")
+        command.add_argument('--template-dir', action='append', help='template directory; may be repeated')
+        command.add_argument('--async', dest='enable_async', action='store_true',
+                             help='bundle for AsyncCodeGenerator')
+        command.set_defaults(handler=handler)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the command-line interface.
+
+    Args:
+        argv (list, optional): Arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: 0 on success, 1 if some outputs failed, 2 on errors.
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
@@ -1,7 +1,18 @@
 
-from .config_manager import ConfigManager
-from .generator import CodeGenerator
-from .template_manager import TemplateManager
+from ..utils.lazy import lazy_attributes
+
+# Public classes are imported on first use, so that importing the package does
+# not load jinja2 and yaml.
+_LAZY_ATTRIBUTES = {
+    'ConfigManager': ('.config_manager', 'ConfigManager'),
+    'CodeGenerator': ('.generator', 'CodeGenerator'),
+    'AsyncCodeGenerator': ('.async_generator', 'AsyncCodeGenerator'),
+    'TemplateManager': ('.template_manager', 'TemplateManager'),
+    'GenerationStats': ('.instrumentation', 'GenerationStats'),
+    'RenderBudget': ('.budgets', 'RenderBudget'),
+    'ShardPlan': ('.sharding', 'ShardPlan'),
+}
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES, globals())
 
 # Version of the core package
 __version__ = '0.1.0'
@@ -25,9 +36,12 @@ class CodeGenCore:
     A unified interface for the core functionality of the code generation library.
     """
     def __init__(self, config_file):
-        self.config_manager = ConfigManager(config_file)
-        self.template_manager = TemplateManager()
-        self.generator = CodeGenerator(self.config_manager, self.template_manager)
+        from .generator import CodeGenerator
+        # The generator owns the config and template managers; its templates come
+        # from the shared environment registry.
+        self.generator = CodeGenerator(config_file)
+        self.config_manager = self.generator.config_manager
+        self.template_manager = self.generator.template_manager
 
     def generate_code(self, template_name, context):
         """
@@ -75,4 +89,5 @@ class CodeGenCore:
         return self.template_manager.list_templates()
 
 # Define what should be imported with "from core import *"
-__all__ = ['ConfigManager', 'CodeGenerator', 'TemplateManager', 'CodeGenCore', 'get_core_info']
\ No newline at end of file
+__all__ = ['ConfigManager', 'CodeGenerator', 'AsyncCodeGenerator', 'TemplateManager', 'GenerationStats',
+           'RenderBudget', 'ShardPlan', 'CodeGenCore', 'get_core_info']
\ No newline at end of file
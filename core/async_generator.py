@@ -0,0 +1,302 @@
+import asyncio
+import time
+import weakref
+from functools import partial
+from .config_manager import thaw
+from .exceptions import OutputError, RenderBudgetExceeded, TemplateError
+from .generator import CodeGenerator
+from .parallel import BatchResult, GenerationResult
+from .template_manager import TemplateManager
+from ..utils.file_operations import BatchFileWriter
+
+# Default number of generations allowed to run at the same time.
+DEFAULT_MAX_CONCURRENCY = 32
+
+
+class _SyncGenerator(CodeGenerator):
+    """The CodeGenerator an AsyncCodeGenerator wraps."""
+
+    def _create_template_manager(self, bytecode_cache):
+        """Create the synchronous TemplateManager, leaving a bundle built for async rendering out."""
+        bundle = self.bundle
+        if bundle is not None and bundle.manifest.get('enable_async'):
+            bundle = None
+        return TemplateManager(thaw(self.config.get('template_dirs')), bytecode_cache=bytecode_cache,
+                               bundle=bundle)
+
+
+class AsyncCodeGenerator:
+    """
+    Asynchronous variant of CodeGenerator for use inside an asyncio event loop.
+
+    The generator wraps a CodeGenerator, which holds the config, the manifest,
+    the hooks and the instrumentation; attributes not defined here are read
+    from it. Templates are rendered with an async-enabled Jinja2 environment
+    built from the same config, and template lookups, checksums and file writes
+    run in an executor, so awaiting many generations at once with
+    asyncio.gather() does not stall the loop. A semaphore per event loop caps
+    how many generations are in flight, so one generator can be used from
+    several asyncio.run() calls.
+    """
+
+    def __init__(self, config_path, max_concurrency=DEFAULT_MAX_CONCURRENCY, executor=None):
+        """
+        Initialize the AsyncCodeGenerator.
+
+        Args:
+            config_path (str): Path to the configuration file.
+            max_concurrency (int): Maximum number of generations running at once.
+            executor (concurrent.futures.Executor, optional): Executor used for
+                blocking work. Defaults to the event loop's default executor.
+
+        Raises:
+            ConfigError: If the configuration file is not found or cannot be loaded.
+            ValueError: If max_concurrency is not a positive integer.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+        self.generator = _SyncGenerator(config_path)
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        # asyncio primitives belong to the loop they are first used in.
+        self._semaphores = weakref.WeakKeyDictionary()
+        # The async environment, and the synchronous manager it mirrors.
+        self._async_manager = None
+        self._async_manager_for = None
+        self._async_template_manager()
+
+    def __getattr__(self, name):
+        if name == 'generator':
+            raise AttributeError(name)
+        return getattr(self.generator, name)
+
+    def _semaphore(self):
+        """Get the concurrency semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _async_template_manager(self):
+        """Get the async-enabled TemplateManager, rebuilt when the generator's manager is replaced."""
+        template_manager = self.generator.template_manager
+        if self._async_manager_for is not template_manager:
+            manager = TemplateManager(thaw(self.generator.config.get('template_dirs')),
+                                      bytecode_cache=template_manager.bytecode_cache, enable_async=True,
+                                      bundle=self.generator.bundle)
+            for name, filter_func in template_manager.custom_filters.items():
+                manager.add_filter(name, filter_func)
+            for name, value in template_manager.custom_globals.items():
+                manager.add_global(name, value)
+            self._async_manager, self._async_manager_for = manager, template_manager
+        self._async_manager.set_render_budget(template_manager.render_budget)
+        return self._async_manager
+
+    def add_custom_filter(self, name, filter_func):
+        """
+        Add a custom filter to both template environments.
+
+        Args:
+            name (str): Name of the filter.
+            filter_func (callable): Function to use as the filter.
+        """
+        self.generator.add_custom_filter(name, filter_func)
+        self._async_template_manager().add_filter(name, filter_func)
+
+    def add_global_variable(self, name, value):
+        """
+        Add a global variable to both template environments.
+
+        Args:
+            name (str): Name of the global variable.
+            value: Value of the global variable.
+        """
+        self.generator.add_global_variable(name, value)
+        self._async_template_manager().add_global(name, value)
+
+    async def generate_code(self, template_name, output_path, **kwargs):
+        """
+        Generate code using a template and write it to an output file.
+
+        Args:
+            template_name (str): Name of the template to use.
+            output_path (str): Path where the generated code will be written.
+            **kwargs: Additional context data for the template.
+
+        Returns:
+            bool: True if the file was written, False if it was skipped as up to date.
+
+        Raises:
+            TemplateError: If there's an error with the template.
+            OutputError: If there's an error writing the output file.
+        """
+        generator = self.generator
+        prepared = False
+        context = kwargs
+        if generator.validate:
+            context, prepared = await self._run_in_executor(
+                partial(generator._validate_inputs, template_name, output_path, **kwargs)), True
+        writer = BatchFileWriter(generator.fsync, generator.buffer_size)
+        generated = await self._generate_async(template_name, output_path, context, writer=writer,
+                                               prepared=prepared)
+        await self._run_in_executor(writer.commit)
+        if generated and generator.manifest is not None:
+            await self._run_in_executor(generator.manifest.save_if_due)
+        if generated and generator.hooks.has('batch'):
+            for hook_name, error in await self._run_in_executor(generator.hooks.run_batch, [output_path]):
+                raise OutputError(f"Batch hook '{hook_name}' failed for '{output_path}': {str(error)}")
+        return generated
+
+    async def _generate_async(self, template_name, output_path, context, checksums=None, writer=None,
+                              prepared=False):
+        """Render and write a single output without blocking the event loop; see CodeGenerator._generate()."""
+        generator = self.generator
+        async with self._semaphore():
+            instrumentation = generator.instrumentation
+            timer = instrumentation.start(template_name, output_path) if instrumentation is not None else None
+            try:
+                if not prepared:
+                    context = generator.hooks.pre_render(generator._merge_context(template_name, context),
+                                                         output_path)
+                if timer is not None:
+                    timer.lap('config_merge')
+
+                fingerprint = None
+                if generator.manifest is not None and (writer is None or writer.writes_to_filesystem):
+                    # Computing the template checksum reads template sources from disk.
+                    fingerprint = await self._run_in_executor(
+                        generator._fingerprint, template_name, context, checksums)
+                    if timer is not None:
+                        timer.lap('fingerprint')
+                    if generator.manifest.is_up_to_date(output_path, fingerprint):
+                        if timer is not None:
+                            instrumentation.finish(timer, skipped=True)
+                        return False
+                manager = self._async_template_manager()
+                if timer is not None:
+                    timer.template_cached = manager.is_template_cached(template_name)
+                # Loading and compiling the template reads its source from disk.
+                template = await self._run_in_executor(manager.get_template, template_name)
+                if timer is not None:
+                    timer.lap('template_lookup')
+
+                if writer is None:
+                    writer = BatchFileWriter(buffer_size=generator.buffer_size)
+                rendered_content = await manager.render_template_async(template_name, context, template=template)
+                if timer is not None:
+                    timer.lap('render')
+                if generator.hooks.has('post_render', output_path):
+                    rendered_content = await self._run_in_executor(generator.hooks.post_render, rendered_content,
+                                                                   output_path)
+                    if timer is not None:
+                        timer.lap('hooks')
+                nbytes = await self._run_in_executor(writer.write, output_path, rendered_content)
+
+                if fingerprint is not None:
+                    generator.manifest.record(output_path, fingerprint)
+                if timer is not None:
+                    timer.lap('write')
+                    instrumentation.finish(timer, nbytes)
+
+                return True
+
+            except RenderBudgetExceeded:
+                raise
+            except TemplateError as e:
+                raise TemplateError(f"Error with template '{template_name}': {str(e)}")
+            except IOError as e:
+                raise OutputError(f"Error writing to output file '{output_path}': {str(e)}")
+
+    async def generate_multiple(self, generation_configs, workers=None, executor=None, fsync=None, sink=None,
+                                validate=None):
+        """
+        Generate multiple code files concurrently.
+
+        At most ``max_concurrency`` items are in flight at any time. Errors are
+        collected per item and results keep the order of ``generation_configs``.
+        With ``workers`` or ``executor`` the batch runs on the wrapped
+        CodeGenerator's thread or process pool instead, awaited from an executor.
+
+        Args:
+            generation_configs (list): List of dictionaries, each containing 'template_name', 'output_path', and 'context'.
+            workers (int, optional): Number of pool workers, as in CodeGenerator.generate_multiple().
+            executor (optional): 'serial', 'thread', 'process' or a
+                                 concurrent.futures.Executor instance, as in
+                                 CodeGenerator.generate_multiple().
+            fsync (bool, optional): Flush all outputs to disk at the end of the batch.
+                                    Defaults to 'output.fsync' from the config.
+            sink (OutputSink, optional): Write the outputs to a MemorySink, ZipSink or
+                                         TarSink instead of the filesystem.
+            validate (bool, optional): Check every item before anything is rendered,
+                                       as in CodeGenerator.generate_multiple().
+
+        Returns:
+            BatchResult: Per-item results in submission order, with a timing summary.
+
+        Raises:
+            ValueError: If the executor or worker count is invalid.
+            ValidationError: If validation is on and any item is invalid.
+        """
+        generator = self.generator
+        if workers is not None or executor is not None:
+            return await self._run_in_executor(partial(
+                generator.generate_multiple, generation_configs, workers, executor, fsync, sink, validate))
+        contexts = [None] * len(generation_configs)
+        if generator.validate if validate is None else validate:
+            contexts = await self._run_in_executor(generator.create_validator().check, generation_configs)
+        start = time.perf_counter()
+        checksums = {}
+        if sink is not None:
+            writer = sink
+        else:
+            writer = BatchFileWriter(generator.fsync if fsync is None else fsync, generator.buffer_size)
+        results = await asyncio.gather(*(
+            self._generate_item_async(index, config, checksums, writer, contexts[index])
+            for index, config in enumerate(generation_configs)
+        ))
+        await self._run_in_executor(writer.commit)
+        stale = []
+        if writer.writes_to_filesystem:
+            stale = await self._run_in_executor(generator._finish_batch, generation_configs, checksums)
+        hook_errors = await self._run_in_executor(generator._run_batch_hooks, results, writer)
+        return BatchResult(list(results), 'async', self.max_concurrency,
+                           time.perf_counter() - start, stale, writer.stats(), hook_errors)
+
+    async def _generate_item_async(self, index, config, checksums, writer, context=None):
+        """Generate one item of a batch, capturing any error in the result."""
+        template_name = config.get('template_name')
+        output_path = config.get('output_path')
+        start = time.perf_counter()
+        error = None
+        generated = False
+        try:
+            prepared = context is not None
+            if not prepared:
+                context = config.get('context', {})
+            generated = await self._generate_async(template_name, output_path, context, checksums, writer,
+                                                   prepared)
+        except Exception as e:
+            error = e
+        return GenerationResult(index, template_name, output_path, error,
+                                time.perf_counter() - start, skipped=error is None and not generated)
+
+    async def generate_framework_config(self, framework, output_path, **kwargs):
+        return await self.generate_code(self.generator._framework_config_template(framework), output_path,
+                                        **kwargs)
+
+    def render_many(self, template_name, contexts, output_pattern=None, sink=None, fsync=None):
+        """
+        Render one template for many contexts with the wrapped CodeGenerator.
+
+        This runs synchronously, as CodeGenerator.render_many() does; from a
+        coroutine, call it through loop.run_in_executor().
+
+        Returns:
+            iterator or BatchResult: See CodeGenerator.render_many().
+        """
+        return self.generator.render_many(template_name, contexts, output_pattern, sink, fsync)
+
+    async def _run_in_executor(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
@@ -0,0 +1,302 @@
+import contextvars
+import sys
+import time
+from collections import deque
+from jinja2 import nodes
+from jinja2.compiler import CodeGenerator
+from .exceptions import ConfigError, RenderBudgetExceeded
+
+# Version of the compiled template code. Bytecode caches and bundles built with
+# another version are not reused.
+COMPILER_VERSION = 1
+
+# Name of the filter wrapped around every for loop's iterable. It cannot be
+# written in a template, so templates cannot call or shadow it.
+LOOP_FILTER = 'code_gen_lib.loop_budget'
+
+# Number of trailing output characters, and at most how many of the last
+# chunks they are taken from, kept for diagnostics.
+PARTIAL_OUTPUT_CHARS = 200
+PARTIAL_OUTPUT_CHUNKS = 64
+
+# How many template frames up the stack are searched for the current line.
+_MAX_FRAME_DEPTH = 8
+
+_active_tracker = contextvars.ContextVar('code_gen_lib_render_budget', default=None)
+
+
+class RenderBudget:
+    """
+    Limits applied to a single render.
+
+    The timeout and the output size are checked whenever the template emits
+    output and on every loop iteration; the loop iteration cap counts the
+    iterations of all for loops of the render together, including loops in
+    included templates and macros. A single expression that never returns (a
+    huge string multiplication, say) cannot be interrupted.
+    """
+
+    def __init__(self, timeout=None, max_output_bytes=None, max_loop_iterations=None):
+        """
+        Initialize the RenderBudget.
+
+        Args:
+            timeout (float, optional): Maximum wall-clock time of a render, in seconds.
+            max_output_bytes (int, optional): Maximum size of the UTF-8 encoded output.
+            max_loop_iterations (int, optional): Maximum number of loop iterations.
+
+        Raises:
+            ConfigError: If a limit is not a positive number.
+        """
+        for name, value in (('timeout', timeout), ('max_output_bytes', max_output_bytes),
+                            ('max_loop_iterations', max_loop_iterations)):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))
+                                      or value <= 0):
+                raise ConfigError(f"Render budget '{name}' must be a positive number")
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self.max_loop_iterations = max_loop_iterations
+
+    def track(self, template_name):
+        """
+        Start tracking a render against this budget.
+
+        Args:
+            template_name (str): Name of the template being rendered.
+
+        Returns:
+            BudgetTracker: Tracker for one render.
+        """
+        return BudgetTracker(self, template_name)
+
+    def __eq__(self, other):
+        return isinstance(other, RenderBudget) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return (f"RenderBudget(timeout={self.timeout!r}, max_output_bytes={self.max_output_bytes!r}, "
+                f"max_loop_iterations={self.max_loop_iterations!r})")
+
+
+class BudgetTracker:
+    """Usage of one render, checked against its RenderBudget."""
+
+    def __init__(self, budget, template_name):
+        """
+        Initialize the BudgetTracker.
+
+        Args:
+            budget (RenderBudget): The limits to enforce.
+            template_name (str): Name of the template being rendered.
+        """
+        self.budget = budget
+        self.template_name = template_name
+        self.start = time.perf_counter()
+        self.deadline = self.start + budget.timeout if budget.timeout is not None else None
+        self.output_bytes = 0
+        self.loop_iterations = 0
+        self._recent_chunks = deque(maxlen=PARTIAL_OUTPUT_CHUNKS)
+
+    def generate(self, chunks):
+        """
+        Pass the chunks of a render through, enforcing the budget.
+
+        The tracker is active only while a chunk is being produced, so several
+        renders can be streamed in turn from the same thread.
+
+        Args:
+            chunks (iterator): Output of jinja2.Template.generate().
+
+        Yields:
+            str: The chunks.
+
+        Raises:
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        while True:
+            token = _active_tracker.set(self)
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            finally:
+                _active_tracker.reset(token)
+            self.add_output(chunk)
+            yield chunk
+
+    def render(self, chunks):
+        """
+        Join the chunks of a render into its output, enforcing the budget.
+
+        Args:
+            chunks (iterator): Output of jinja2.Template.generate().
+
+        Returns:
+            str: The rendered output.
+
+        Raises:
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        # The whole render happens here, so the tracker is activated once and
+        # the per-chunk checks are inlined.
+        parts = self._recent_chunks = []
+        append = parts.append
+        max_output_bytes = self.budget.max_output_bytes
+        deadline = self.deadline
+        token = _active_tracker.set(self)
+        try:
+            for chunk in chunks:
+                append(chunk)
+                self.output_bytes += len(chunk) if chunk.isascii() else len(chunk.encode('utf-8'))
+                if max_output_bytes is not None and self.output_bytes > max_output_bytes:
+                    raise self.exceeded('max_output_bytes', max_output_bytes)
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise self.exceeded('timeout', self.budget.timeout)
+        finally:
+            _active_tracker.reset(token)
+        return ''.join(parts)
+
+    async def generate_async(self, chunks):
+        """
+        Asynchronous counterpart of generate().
+
+        Args:
+            chunks (async iterator): Output of jinja2.Template.generate_async().
+
+        Yields:
+            str: The chunks.
+
+        Raises:
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        while True:
+            token = _active_tracker.set(self)
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                _active_tracker.reset(token)
+            self.add_output(chunk)
+            yield chunk
+
+    def add_output(self, chunk):
+        """Account for a chunk of output and check the size and time limits."""
+        self.output_bytes += len(chunk) if chunk.isascii() else len(chunk.encode('utf-8'))
+        self._recent_chunks.append(chunk)
+        if self.budget.max_output_bytes is not None and self.output_bytes > self.budget.max_output_bytes:
+            raise self.exceeded('max_output_bytes', self.budget.max_output_bytes)
+        self.check_time()
+
+    def check_time(self, lineno=None):
+        """Raise RenderBudgetExceeded if the render ran past its timeout."""
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise self.exceeded('timeout', self.budget.timeout, lineno)
+
+    def iterate(self, iterable):
+        """
+        Iterate a template loop, counting its iterations against the budget.
+
+        Args:
+            iterable (iterable): The loop's iterable.
+
+        Yields:
+            The items of the iterable.
+
+        Raises:
+            RenderBudgetExceeded: If the render exceeds its loop iteration or time budget.
+        """
+        max_iterations = self.budget.max_loop_iterations
+        for item in iterable:
+            self.loop_iterations += 1
+            if max_iterations is not None and self.loop_iterations > max_iterations:
+                raise self.exceeded('max_loop_iterations', max_iterations, _template_lineno())
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                raise self.exceeded('timeout', self.budget.timeout, _template_lineno())
+            yield item
+
+    def diagnostics(self, lineno=None):
+        """
+        Describe the render so far.
+
+        Args:
+            lineno (int, optional): Template line the render was at, if known.
+
+        Returns:
+            dict: Elapsed seconds, output bytes, loop iterations, the template
+                  line and the tail of the partial output.
+        """
+        return {
+            'elapsed': time.perf_counter() - self.start,
+            'output_bytes': self.output_bytes,
+            'loop_iterations': self.loop_iterations,
+            'lineno': lineno,
+            'partial_output': ''.join(self._recent_chunks)[-PARTIAL_OUTPUT_CHARS:],
+        }
+
+    def exceeded(self, limit, value, lineno=None):
+        """Build the RenderBudgetExceeded error for a limit."""
+        return RenderBudgetExceeded(self.template_name, limit, value, self.diagnostics(lineno))
+
+
+def _template_lineno():
+    # The loop's template code is a few frames up; its globals identify the template.
+    frame = sys._getframe(2)
+    for _ in range(_MAX_FRAME_DEPTH):
+        if frame is None:
+            break
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            return template.get_corresponding_lineno(frame.f_lineno)
+        frame = frame.f_back
+    return None
+
+
+def loop_budget(iterable):
+    """
+    Filter wrapped around the iterable of every for loop by BudgetCodeGenerator.
+
+    Outside a budgeted render the iterable is returned unchanged.
+    """
+    tracker = _active_tracker.get()
+    if tracker is None:
+        return iterable
+    return tracker.iterate(iterable)
+
+
+class BudgetCodeGenerator(CodeGenerator):
+    """Jinja2 code generator that routes every for loop through loop_budget()."""
+
+    def visit_Template(self, node, frame=None):
+        # Dependencies such as filters are collected from the tree while it is
+        # compiled, so loops are rewritten before anything is generated.
+        for loop in node.find_all(nodes.For):
+            if not (isinstance(loop.iter, nodes.Filter) and loop.iter.name == LOOP_FILTER):
+                loop.iter = nodes.Filter(loop.iter, LOOP_FILTER, [], [], None, None, lineno=loop.iter.lineno)
+        super().visit_Template(node, frame)
+
+
+def create_render_budget(settings):
+    """
+    Create a render budget from the 'render_budget' section of the config.
+
+    The section is a mapping with the keys 'timeout' (seconds),
+    'max_output_bytes' and 'max_loop_iterations'; missing keys are unlimited.
+
+    Args:
+        settings (dict): The 'render_budget' config section.
+
+    Returns:
+        RenderBudget: The budget, or None if the section is empty.
+
+    Raises:
+        ConfigError: If the section is malformed.
+    """
+    if not settings:
+        return None
+    if not isinstance(settings, dict):
+        raise ConfigError("'render_budget' must be a mapping")
+    unknown = set(settings) - {'timeout', 'max_output_bytes', 'max_loop_iterations'}
+    if unknown:
+        raise ConfigError(f"Unknown 'render_budget' settings: {', '.join(sorted(unknown))}")
+    return RenderBudget(settings.get('timeout'), settings.get('max_output_bytes'),
+                        settings.get('max_loop_iterations'))
@@ -0,0 +1,313 @@
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+import jinja2
+from jinja2 import BaseLoader, FileSystemLoader, ModuleLoader, TemplateNotFound, TemplateSyntaxError
+from .budgets import COMPILER_VERSION
+from .environment_registry import ENVIRONMENT_OPTIONS, create_environment
+from .exceptions import ConfigError, TemplateError
+from .manifest import library_version
+from ..templates.index import TemplateIndex
+from ..utils.hashing import hash_text
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_MANIFEST_NAME = 'bundle_manifest.json'
+
+
+def build_bundle(template_dirs, target, enable_async=False, extensions=None):
+    """
+    Compile every template under the template directories into a bundle.
+
+    Each template is compiled to a Python module, as Jinja2's ModuleLoader
+    expects, and stored in a zip archive (when ``target`` ends in '.zip') or a
+    directory. A manifest records the Jinja2 and compiler versions, the
+    environment options and a checksum of every template source, so stale bundles can be detected.
+    The bundle is built next to ``target`` and moved into place when complete.
+
+    Templates that fail to compile (for example because they use a custom
+    filter that is only registered at runtime) are left out of the bundle and
+    recorded as skipped; they are rendered from source.
+
+    Args:
+        template_dirs (list or str): Directories to compile templates from.
+        target (str): Path of the zip archive or directory to create.
+        enable_async (bool): Compile templates for asynchronous rendering.
+        extensions (list, optional): Only bundle templates with these suffixes.
+
+    Returns:
+        TemplateBundle: The new bundle.
+
+    Raises:
+        TemplateError: If a template directory cannot be read.
+    """
+    if isinstance(template_dirs, (str, os.PathLike)):
+        template_dirs = [template_dirs]
+    template_dirs = [os.fspath(path) for path in template_dirs]
+    index = TemplateIndex(template_dirs, extensions)
+    environment = create_environment(template_dirs, enable_async=enable_async)
+
+    modules = {}
+    templates = {}
+    skipped = {}
+    for name in index.names():
+        try:
+            source, filename, _ = environment.loader.get_source(environment, name)
+        except TemplateNotFound as e:
+            raise TemplateError(f"Cannot read template {name}: {str(e)}")
+        try:
+            modules[ModuleLoader.get_module_filename(name)] = environment.compile(
+                source, name, filename, raw=True, defer_init=True)
+        except TemplateSyntaxError as e:
+            skipped[name] = str(e)
+            continue
+        templates[name] = hash_text(source)
+
+    manifest = {
+        'format': BUNDLE_FORMAT_VERSION,
+        'jinja2_version': jinja2.__version__,
+        'compiler_version': COMPILER_VERSION,
+        'library_version': library_version(),
+        'enable_async': bool(enable_async),
+        'environment_options': ENVIRONMENT_OPTIONS,
+        'templates': templates,
+        'skipped': skipped,
+    }
+    _write_bundle(os.fspath(target), modules, json.dumps(manifest, indent=2, sort_keys=True))
+    return TemplateBundle(target)
+
+
+def _write_bundle(target, modules, manifest_text):
+    target = os.path.abspath(target)
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    is_zip = target.lower().endswith('.zip')
+    if is_zip:
+        fd, temp_path = tempfile.mkstemp(dir=parent, suffix='.tmp')
+        os.close(fd)
+    else:
+        temp_path = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+    try:
+        if is_zip:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for filename, code in sorted(modules.items()):
+                    archive.writestr(filename, code)
+                archive.writestr(BUNDLE_MANIFEST_NAME, manifest_text)
+            os.replace(temp_path, target)
+        else:
+            for filename, code in modules.items():
+                with open(os.path.join(temp_path, filename), 'w', encoding='utf-8') as f:
+                    f.write(code)
+            with open(os.path.join(temp_path, BUNDLE_MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                f.write(manifest_text)
+            # A directory cannot be replaced atomically; swap it in as quickly as possible.
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            os.replace(temp_path, target)
+    except BaseException:
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
+        elif os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class TemplateBundle:
+    """
+    A precompiled template bundle created by build_bundle().
+
+    Loading templates from a bundle skips parsing and compiling their sources.
+    With ``verify`` enabled, a bundled template is only used while its source
+    (if the source is present at all) still matches the checksum recorded at
+    build time; edited, added and unbundled templates are loaded from source,
+    so source files act as overrides of the bundle.
+    """
+
+    def __init__(self, path, verify=True):
+        """
+        Initialize the TemplateBundle.
+
+        Args:
+            path (str): Path of the bundle's zip archive or directory.
+            verify (bool): Check template sources against the bundle's checksums
+                           on load. Disable it for deployments that ship the
+                           bundle without sources, or to skip reading sources.
+
+        Raises:
+            TemplateError: If the bundle or its manifest cannot be read.
+        """
+        self.path = os.path.abspath(os.fspath(path))
+        self.verify = verify
+        try:
+            if zipfile.is_zipfile(self.path):
+                with zipfile.ZipFile(self.path) as archive:
+                    manifest_text = archive.read(BUNDLE_MANIFEST_NAME).decode('utf-8')
+            else:
+                with open(os.path.join(self.path, BUNDLE_MANIFEST_NAME), encoding='utf-8') as f:
+                    manifest_text = f.read()
+            self.manifest = json.loads(manifest_text)
+        except (OSError, KeyError, ValueError) as e:
+            raise TemplateError(f"Cannot read template bundle {self.path}: {str(e)}")
+        self.build_id = hash_text(manifest_text)
+        self.templates = self.manifest.get('templates', {})
+        self.skipped = self.manifest.get('skipped', {})
+
+    def incompatibility(self, enable_async=False):
+        """
+        Explain why the bundle cannot be used by this installation, if it cannot.
+
+        Args:
+            enable_async (bool): Whether the environment renders asynchronously.
+
+        Returns:
+            str: The reason, or None if the bundle is usable.
+        """
+        if self.manifest.get('format') != BUNDLE_FORMAT_VERSION:
+            return f"bundle format {self.manifest.get('format')} is not supported"
+        if self.manifest.get('jinja2_version') != jinja2.__version__:
+            return (f"bundle was built with Jinja2 {self.manifest.get('jinja2_version')}, "
+                    f"running {jinja2.__version__}")
+        if self.manifest.get('compiler_version') != COMPILER_VERSION:
+            return "bundle was built by another version of the template compiler"
+        if self.manifest.get('environment_options') != ENVIRONMENT_OPTIONS:
+            return "bundle was built with different environment options"
+        if self.manifest.get('enable_async') != bool(enable_async):
+            mode = 'asynchronous' if self.manifest.get('enable_async') else 'synchronous'
+            return f"bundle was built for {mode} rendering"
+        return None
+
+    def stale_templates(self, template_dirs):
+        """
+        List the bundled templates whose source no longer matches the bundle.
+
+        Templates without a source under ``template_dirs`` are not stale.
+
+        Args:
+            template_dirs (list or str): Directories holding the template sources.
+
+        Returns:
+            list: Names of the stale templates.
+        """
+        loader = FileSystemLoader(template_dirs)
+        return [name for name in sorted(self.templates) if not self._matches_source(loader, name)]
+
+    def unbundled_templates(self, template_dirs):
+        """
+        List the source templates that are missing from the bundle.
+
+        Args:
+            template_dirs (list or str): Directories holding the template sources.
+
+        Returns:
+            list: Names of templates that would be loaded from source.
+        """
+        return [name for name in TemplateIndex(template_dirs).names() if name not in self.templates]
+
+    def create_loader(self, template_dirs, enable_async=False):
+        """
+        Create a Jinja2 loader serving templates from the bundle and the sources.
+
+        Args:
+            template_dirs (list or str): Directories holding the template sources.
+            enable_async (bool): Whether the environment renders asynchronously.
+
+        Returns:
+            BundleLoader: The loader.
+
+        Raises:
+            TemplateError: If the bundle cannot be used by this installation.
+        """
+        reason = self.incompatibility(enable_async)
+        if reason is not None:
+            raise TemplateError(f"Template bundle {self.path} is stale: {reason}; rebuild it")
+        return BundleLoader(self, FileSystemLoader(template_dirs))
+
+    def _matches_source(self, source_loader, name):
+        try:
+            source, _, _ = source_loader.get_source(None, name)
+        except TemplateNotFound:
+            return True
+        return hash_text(source) == self.templates[name]
+
+    def __repr__(self):
+        return f"TemplateBundle({self.path!r})"
+
+
+class BundleLoader(BaseLoader):
+    """
+    Jinja2 loader that prefers a precompiled bundle and falls back to sources.
+
+    Template sources stay available through get_source(), so checksums,
+    dependency lookups and incremental fingerprints keep working whenever the
+    source files are present.
+    """
+
+    def __init__(self, bundle, source_loader):
+        """
+        Initialize the BundleLoader.
+
+        Args:
+            bundle (TemplateBundle): The bundle to load compiled templates from.
+            source_loader (jinja2.BaseLoader): Loader for template sources.
+        """
+        self.bundle = bundle
+        self.source_loader = source_loader
+        self.module_loader = ModuleLoader(bundle.path)
+
+    def get_source(self, environment, template):
+        return self.source_loader.get_source(environment, template)
+
+    def list_templates(self):
+        try:
+            names = set(self.source_loader.list_templates())
+        except OSError:
+            names = set()
+        return sorted(names | set(self.bundle.templates))
+
+    def load(self, environment, name, globals=None):
+        if self.is_bundled(name):
+            return self.module_loader.load(environment, name, globals)
+        return self.source_loader.load(environment, name, globals)
+
+    def is_bundled(self, name):
+        """
+        Check whether a template is served from the bundle.
+
+        Args:
+            name (str): Name of the template.
+
+        Returns:
+            bool: True if the bundled template is used, False if it is loaded from source.
+        """
+        if name not in self.bundle.templates:
+            return False
+        return not self.bundle.verify or self.bundle._matches_source(self.source_loader, name)
+
+
+def load_bundle(settings):
+    """
+    Load the bundle named by the 'bundle' section of the config.
+
+    The section may be the path of the bundle or a mapping with the keys
+    'path', 'enabled' and 'verify'.
+
+    Args:
+        settings (str or dict): The 'bundle' config section.
+
+    Returns:
+        TemplateBundle: The bundle, or None if none is configured.
+
+    Raises:
+        ConfigError: If the section is malformed.
+        TemplateError: If the bundle cannot be read.
+    """
+    if not settings:
+        return None
+    if isinstance(settings, (str, os.PathLike)):
+        settings = {'path': settings}
+    if not isinstance(settings, dict) or not settings.get('path'):
+        raise ConfigError("'bundle' must be a path or a mapping with a 'path'")
+    if not settings.get('enabled', True):
+        return None
+    return TemplateBundle(settings['path'], bool(settings.get('verify', True)))
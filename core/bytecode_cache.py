@@ -0,0 +1,154 @@
+import hashlib
+import os
+import tempfile
+import jinja2
+from jinja2.bccache import BytecodeCache, Bucket
+from .budgets import COMPILER_VERSION
+from .exceptions import ConfigError
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'code_gen_lib', 'bytecode')
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+CACHE_FILE_SUFFIX = '.jinja.cache'
+
+
+class PersistentBytecodeCache(BytecodeCache):
+    """
+    On-disk Jinja2 bytecode cache shared between processes.
+
+    Entries are keyed by template name, source checksum, Jinja2 version and
+    compiler version, so an edited template or an upgraded Jinja2 never picks
+    up stale bytecode. Sync and async environments compile different code and
+    get separate entries. The total size of the cache directory is capped; the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        """
+        Initialize the PersistentBytecodeCache.
+
+        Args:
+            directory (str, optional): Directory holding the cache files.
+                                       Defaults to ~/.cache/code_gen_lib/bytecode.
+            max_size (int, optional): Maximum total size of the cache in bytes.
+                                      None disables eviction.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory or DEFAULT_CACHE_DIR))
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_bucket(self, environment, name, filename, source):
+        checksum = self.get_source_checksum(source)
+        key = hashlib.sha1(
+            f"{jinja2.__version__}|{COMPILER_VERSION}|{environment.is_async}|{name}|{filename}|{checksum}"
+            .encode('utf-8')
+        ).hexdigest()
+        bucket = Bucket(environment, key, checksum)
+        self.load_bytecode(bucket)
+        return bucket
+
+    def load_bytecode(self, bucket):
+        path = self._get_cache_path(bucket.key)
+        try:
+            with open(path, 'rb') as f:
+                bucket.load_bytecode(f)
+            # Bump the modification time so eviction treats the entry as recently used.
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def dump_bytecode(self, bucket):
+        # Write to a temporary file first so that concurrent processes never read
+        # a partially written entry.
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                bucket.write_bytecode(f)
+            os.replace(temp_path, self._get_cache_path(bucket.key))
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self._evict()
+
+    def clear(self):
+        """Remove every entry from the cache directory."""
+        for path, _, _ in self._list_entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def size(self):
+        """
+        Get the total size of the cache.
+
+        Returns:
+            int: Size of all cache entries in bytes.
+        """
+        return sum(size for _, size, _ in self._list_entries())
+
+    def _get_cache_path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def _list_entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(CACHE_FILE_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _evict(self):
+        if self.max_size is None:
+            return
+        entries = self._list_entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size:
+            return
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_size:
+                break
+
+
+def create_bytecode_cache(settings):
+    """
+    Create a bytecode cache from the 'bytecode_cache' section of the config.
+
+    The section may be a boolean or a mapping with the keys 'enabled',
+    'directory' and 'max_size' (in bytes).
+
+    Args:
+        settings (bool or dict): The 'bytecode_cache' config section.
+
+    Returns:
+        PersistentBytecodeCache: The configured cache, or None if it is disabled.
+
+    Raises:
+        ConfigError: If the section is malformed.
+    """
+    if not settings:
+        return None
+    if settings is True:
+        settings = {}
+    if not isinstance(settings, dict):
+        raise ConfigError("'bytecode_cache' must be a boolean or a mapping")
+    if not settings.get('enabled', True):
+        return None
+
+    max_size = settings.get('max_size', DEFAULT_MAX_SIZE)
+    if max_size is not None and (not isinstance(max_size, int) or max_size <= 0):
+        raise ConfigError("'bytecode_cache.max_size' must be a positive number of bytes")
+    return PersistentBytecodeCache(settings.get('directory'), max_size)
@@ -1,10 +1,106 @@
-
+import os
+import threading
 import yaml
+from .exceptions import ConfigError
+
+# Prefer the libyaml-backed loader when PyYAML was built with it.
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Parsed configuration snapshots keyed by absolute path. Each entry remembers the
+# mtime and size it was parsed from, so an edited file is parsed again.
+_config_cache = {}
+_config_cache_lock = threading.Lock()
+
+
+class FrozenDict(dict):
+    """Read-only dict used for shared configuration snapshots."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Configuration snapshots are read-only; use thaw() to get a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value):
+    """
+    Recursively convert parsed YAML into an immutable structure.
+
+    Args:
+        value: Parsed YAML data.
+
+    Returns:
+        The same data with dicts turned into FrozenDict and lists into tuples.
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """
+    Recursively convert a configuration snapshot into mutable dicts and lists.
+
+    Args:
+        value: A frozen configuration snapshot or part of one.
+
+    Returns:
+        A mutable deep copy of the data.
+    """
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def load_config_snapshot(config_path):
+    """
+    Load a YAML configuration file through a process-wide cache.
+
+    The file is parsed once per (path, mtime, size); later calls only stat the
+    file and return the cached snapshot. Snapshots are immutable so they can be
+    shared safely between ConfigManager and CodeGenerator instances and threads.
+
+    Args:
+        config_path (str): Path to the configuration file.
+
+    Returns:
+        FrozenDict: The parsed configuration. An empty file yields an empty mapping.
+
+    Raises:
+        FileNotFoundError: If the configuration file does not exist.
+        yaml.YAMLError: If the file is not valid YAML.
+    """
+    path = os.path.abspath(config_path)
+    stat = os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    with _config_cache_lock:
+        cached = _config_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path, 'r') as f:
+        snapshot = freeze(yaml.load(f, Loader=YAML_LOADER) or {})
+    with _config_cache_lock:
+        _config_cache[path] = (key, snapshot)
+    return snapshot
+
+
+def clear_config_cache():
+    """Drop every cached configuration snapshot."""
+    with _config_cache_lock:
+        _config_cache.clear()
+
 
 class ConfigManager:
     def __init__(self, config_path):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config_snapshot(config_path)
 
     def get_config(self, template_name):
         if template_name not in self.config:
@@ -12,5 +108,34 @@ class ConfigManager:
         return self.config[template_name]
 
     def get_required_kwargs(self, template_name):
-        config = self.get_config(template_name)
-        return config.get('required_kwargs', [])
\ No newline at end of file
+        """
+        Get the variables declared as required for a template.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            list: The 'required_kwargs' of the template's entry in the 'templates'
+                  section, or of a top-level entry named after the template; empty
+                  if neither declares any.
+        """
+        settings = (self.config.get('templates') or {}).get(template_name) or self.config.get(template_name) or {}
+        return list(settings.get('required_kwargs', []))
+
+    def get_bytecode_cache_config(self):
+        """
+        Get the settings of the persistent template bytecode cache.
+
+        Returns:
+            The 'bytecode_cache' section of the config, or None if it is absent.
+        """
+        return self.config.get('bytecode_cache')
+
+    def get_bundle_config(self):
+        """
+        Get the settings of the precompiled template bundle.
+
+        Returns:
+            The 'bundle' section of the config, or None if it is absent.
+        """
+        return self.config.get('bundle')
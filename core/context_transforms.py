@@ -0,0 +1,158 @@
+import re
+from .exceptions import ConfigError
+from ..utils.string_utils import camel_to_snake, pluralize, snake_to_camel, snake_to_pascal
+
+
+def _table_name(name):
+    return pluralize(camel_to_snake(name))
+
+
+# Identifier derivations available to the 'context_transforms' config section.
+DERIVATIONS = {
+    'snake': camel_to_snake,
+    'camel': lambda name: snake_to_camel(camel_to_snake(name)),
+    'pascal': lambda name: snake_to_pascal(camel_to_snake(name)),
+    'kebab': lambda name: camel_to_snake(name).replace('_', '-'),
+    'constant': lambda name: camel_to_snake(name).upper(),
+    'plural': pluralize,
+    'plural_snake': _table_name,
+    'table': _table_name,
+}
+
+# Transforms applied to every template unless the config's '*' entry replaces them.
+DEFAULT_TRANSFORMS = {'model_name_snake': 'snake(model_name)'}
+
+_RULE = re.compile(r'^\s*(\w+)\s*\(\s*(\w+)\s*\)\s*$')
+
+
+def compile_transforms(rules):
+    """
+    Compile a mapping of transform rules into transform steps.
+
+    Args:
+        rules (dict): Target context keys mapping to rules of the form
+                      'derivation(source_key)', e.g. 'table(model_name)'.
+
+    Returns:
+        tuple: (target, derivation function, source) steps, in rule order.
+
+    Raises:
+        ConfigError: If a rule is malformed or names an unknown derivation.
+    """
+    steps = []
+    for target, rule in (rules or {}).items():
+        match = _RULE.match(rule) if isinstance(rule, str) else None
+        if match is None:
+            raise ConfigError(f"Invalid context transform for '{target}': {rule!r}; "
+                              f"expected 'derivation(source_key)'")
+        derivation, source = match.groups()
+        if derivation not in DERIVATIONS:
+            raise ConfigError(f"Unknown derivation '{derivation}' for '{target}'; "
+                              f"expected one of {', '.join(sorted(DERIVATIONS))}")
+        steps.append((target, DERIVATIONS[derivation], source))
+    return tuple(steps)
+
+
+class ContextTransformer:
+    """
+    Derives identifiers in template contexts from the 'context_transforms' config.
+
+    The section maps template names, or '*' for every template, to rules of the
+    form ``target_key: derivation(source_key)``:
+
+        context_transforms:
+          '*':
+            model_name_snake: snake(model_name)
+          crud/crud_operations.py.jinja2:
+            table_name: table(model_name)
+
+    Rules are compiled once per template. A rule only fills in a key the
+    context does not already have, and is skipped when its source key is
+    missing or does not hold a string; rules run in order, so later rules can
+    build on earlier ones.
+    The derivations are memoized, so each model name is converted once.
+    """
+
+    def __init__(self, settings=None):
+        """
+        Initialize the ContextTransformer.
+
+        Args:
+            settings (dict or bool, optional): The 'context_transforms' config
+                section. False disables every transform, including the defaults.
+
+        Raises:
+            ConfigError: If the section is malformed.
+        """
+        if settings is False:
+            settings = {'*': {}}
+        elif settings is None or settings is True:
+            settings = {}
+        if not isinstance(settings, dict):
+            raise ConfigError("'context_transforms' must be a mapping of template names to rules")
+        default_rules = settings.get('*', DEFAULT_TRANSFORMS)
+        self.default_steps = compile_transforms(default_rules)
+        self.template_steps = {}
+        for template_name, rules in settings.items():
+            if template_name == '*':
+                continue
+            # A template's rules extend the '*' rules and override the same targets.
+            merged = {**(default_rules or {}), **(rules or {})}
+            self.template_steps[template_name] = compile_transforms(merged)
+
+    def steps(self, template_name):
+        """
+        Get the compiled transform steps of a template.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            tuple: (target, derivation function, source) steps.
+        """
+        return self.template_steps.get(template_name, self.default_steps)
+
+    def transform(self, template_name, context):
+        """
+        Add the derived identifiers of a template to a context, in place.
+
+        Args:
+            template_name (str): Name of the template.
+            context (dict): The merged context; it is updated in place.
+
+        Returns:
+            dict: The context.
+        """
+        for target, derive, source in self.steps(template_name):
+            if target not in context and isinstance(context.get(source), str):
+                context[target] = derive(context[source])
+        return context
+
+
+def derive_many(names, derivation):
+    """
+    Apply one derivation to many names, converting each distinct name once.
+
+    Args:
+        names (iterable): The names to convert.
+        derivation (str or callable): A DERIVATIONS key such as 'snake' or
+                                      'table', or a conversion function.
+
+    Returns:
+        list: The converted names, in input order.
+
+    Raises:
+        ConfigError: If the derivation is unknown.
+    """
+    if isinstance(derivation, str):
+        if derivation not in DERIVATIONS:
+            raise ConfigError(f"Unknown derivation '{derivation}'")
+        derivation = DERIVATIONS[derivation]
+    converted = {}
+    result = []
+    for name in names:
+        value = converted.get(name)
+        if value is None:
+            value = converted[name] = derivation(name)
+        result.append(value)
+    return result
@@ -0,0 +1,175 @@
+import os
+from .config_manager import load_config_snapshot
+
+# Config keys that change the output of every template when they change.
+GLOBAL_CONFIG_KEYS = ('template_dirs',)
+
+
+class DependencyGraph:
+    """
+    Dependency graph linking template files, config keys and generated outputs.
+
+    Template-to-template edges come from the Jinja2 AST ('include', 'extends'
+    and 'import'). Each entry of the config's 'templates:' section feeds the
+    template of the same name, and the generation manifest maps every output to
+    the template it was rendered from. Given a set of changed files, the graph
+    answers which templates and which outputs have to be regenerated.
+    """
+
+    def __init__(self, template_manager, config=None, config_path=None, manifest=None):
+        """
+        Initialize the DependencyGraph and build it.
+
+        Args:
+            template_manager (TemplateManager): Manager whose templates are analysed.
+            config (dict, optional): The configuration the outputs were generated with.
+            config_path (str, optional): Path of the configuration file, used to
+                                         recognise config edits among changed files.
+            manifest (GenerationManifest, optional): Manifest of generated outputs.
+        """
+        self.template_manager = template_manager
+        self.config = config or {}
+        self.config_path = os.path.abspath(config_path) if config_path else None
+        self.manifest = manifest
+        self.build()
+
+    def build(self):
+        """Analyse every template and (re)build the graph."""
+        self.dependencies = {}
+        self.dependents = {}
+        self.template_files = {}
+        for template_name in self.template_manager.list_templates():
+            try:
+                dependencies = self.template_manager.get_template_dependencies(template_name)
+                _, filename, _ = self.template_manager.env.loader.get_source(
+                    self.template_manager.env, template_name)
+            except Exception:
+                # Templates that cannot be parsed have no known dependencies; they
+                # are still tracked so edits to them are picked up.
+                dependencies = []
+                filename = None
+            self.dependencies[template_name] = sorted(set(dependencies))
+            if filename:
+                self.template_files[os.path.abspath(filename)] = template_name
+
+        for template_name, dependencies in self.dependencies.items():
+            self.dependents.setdefault(template_name, set())
+            for dependency in dependencies:
+                self.dependents.setdefault(dependency, set()).add(template_name)
+
+    def templates_for_config_change(self, old_config, new_config):
+        """
+        Find the templates affected by a configuration change.
+
+        Args:
+            old_config (dict): Configuration before the change.
+            new_config (dict): Configuration after the change.
+
+        Returns:
+            set: Names of the templates whose inputs changed.
+        """
+        for key in GLOBAL_CONFIG_KEYS:
+            if old_config.get(key) != new_config.get(key):
+                return set(self.dependencies)
+
+        old_templates = old_config.get('templates') or {}
+        new_templates = new_config.get('templates') or {}
+        return {
+            template_name
+            for template_name in set(old_templates) | set(new_templates)
+            if old_templates.get(template_name) != new_templates.get(template_name)
+        }
+
+    def affected_templates(self, changed_files):
+        """
+        Compute the templates that have to be re-rendered after files changed.
+
+        When the config file is among the changed files, its new contents are
+        compared with the graph's current config, which is then replaced by them.
+
+        Args:
+            changed_files (iterable): Paths of changed template or config files.
+                                      Template names are accepted as well.
+
+        Returns:
+            list: Affected template names, dependencies before their dependents.
+        """
+        seeds = set()
+        for changed in changed_files:
+            path = os.path.abspath(changed)
+            if self.config_path and path == self.config_path:
+                seeds |= self._config_changes()
+            elif path in self.template_files:
+                seeds.add(self.template_files[path])
+            elif changed in self.dependencies:
+                seeds.add(changed)
+
+        affected = set()
+        pending = list(seeds)
+        while pending:
+            template_name = pending.pop()
+            if template_name in affected:
+                continue
+            affected.add(template_name)
+            pending.extend(self.dependents.get(template_name, ()))
+        return self._topological_order(affected)
+
+    def affected_outputs(self, changed_files):
+        """
+        Compute the recorded outputs that have to be regenerated after files changed.
+
+        Args:
+            changed_files (iterable): Paths of changed template or config files.
+
+        Returns:
+            list: Output paths from the manifest, in the order they were generated.
+        """
+        if self.manifest is None:
+            return []
+        affected = set(self.affected_templates(changed_files))
+        return [output_path for output_path, entry in self.manifest.entries.items()
+                if entry.get('template') in affected]
+
+    def select_configs(self, generation_configs, changed_files):
+        """
+        Pick the generation configs whose template is affected by changed files.
+
+        Args:
+            generation_configs (list): Items as passed to generate_multiple().
+            changed_files (iterable): Paths of changed template or config files.
+
+        Returns:
+            list: The affected items, in their original order.
+        """
+        affected = set(self.affected_templates(changed_files))
+        return [config for config in generation_configs if config.get('template_name') in affected]
+
+    def _config_changes(self):
+        try:
+            new_config = load_config_snapshot(self.config_path)
+        except Exception:
+            # A missing or unparsable config affects nothing until it is fixed.
+            return set()
+        changed = self.templates_for_config_change(self.config, new_config)
+        self.config = new_config
+        return changed
+
+    def _topological_order(self, templates):
+        # Kahn's algorithm restricted to the given templates; ties are broken by
+        # name so the order is deterministic.
+        remaining = {
+            name: {dependency for dependency in self.dependencies.get(name, ()) if dependency in templates}
+            for name in templates
+        }
+        ordered = []
+        while remaining:
+            ready = sorted(name for name, dependencies in remaining.items() if not dependencies)
+            if not ready:
+                # Circular imports: emit what is left in name order.
+                ready = sorted(remaining)
+            for name in ready:
+                del remaining[name]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+            ordered.extend(ready)
+        return ordered
@@ -0,0 +1,226 @@
+import os
+import threading
+from collections import OrderedDict
+from jinja2 import BaseLoader, Environment, FileSystemLoader
+from .budgets import LOOP_FILTER, BudgetCodeGenerator, loop_budget
+from .bytecode_cache import PersistentBytecodeCache
+
+# Options every TemplateManager environment is created with.
+ENVIRONMENT_OPTIONS = {
+    'autoescape': False,
+    'trim_blocks': True,
+    'lstrip_blocks': True,
+}
+
+# Number of shared environments kept before the least recently used is dropped.
+DEFAULT_MAX_ENVIRONMENTS = 32
+
+
+class CachingLoader(BaseLoader):
+    """
+    Jinja2 loader that keeps the templates it compiled, indexed by name.
+
+    Environments are created with Jinja2's own cache turned off and this loader
+    in front of the real one, so that compiled templates can be looked up and
+    dropped by name. As with Jinja2's cache, a template whose source changed
+    is compiled again when auto_reload is on. Attributes not defined here, such
+    as BundleLoader.is_bundled(), are read from the wrapped loader.
+    """
+
+    def __init__(self, loader):
+        """
+        Initialize the CachingLoader.
+
+        Args:
+            loader (jinja2.BaseLoader): The loader templates are compiled from.
+        """
+        self.loader = loader
+        self.templates = {}
+
+    def __getattr__(self, name):
+        if name == 'loader':
+            raise AttributeError(name)
+        return getattr(self.loader, name)
+
+    @property
+    def has_source_access(self):
+        return self.loader.has_source_access
+
+    def get_source(self, environment, template):
+        return self.loader.get_source(environment, template)
+
+    def list_templates(self):
+        return self.loader.list_templates()
+
+    def load(self, environment, name, globals=None):
+        template = self.templates.get(name)
+        if template is not None and (not environment.auto_reload or template.is_up_to_date):
+            return template
+        template = self.templates[name] = self.loader.load(environment, name, globals)
+        return template
+
+    def is_cached(self, name):
+        """
+        Check whether a template is held compiled and up to date.
+
+        Args:
+            name (str): Name of the template.
+
+        Returns:
+            bool: True if the next lookup can reuse the compiled template.
+        """
+        template = self.templates.get(name)
+        return template is not None and template.is_up_to_date
+
+    def invalidate(self, names=None):
+        """
+        Drop compiled templates, so that their next lookup compiles them again.
+
+        Args:
+            names (iterable, optional): Names of the templates to drop. All if omitted.
+        """
+        if names is None:
+            self.templates.clear()
+            return
+        for name in names:
+            self.templates.pop(name, None)
+
+
+def create_environment(template_dirs, bytecode_cache=None, enable_async=False, bundle=None):
+    """
+    Create a Jinja2 environment configured the way TemplateManager expects.
+
+    Templates are compiled so that their loops can be held to a RenderBudget.
+
+    Args:
+        template_dirs (list): Directories to load templates from.
+        bytecode_cache (jinja2.BytecodeCache, optional): Cache for compiled templates.
+        enable_async (bool): Compile templates for asynchronous rendering.
+        bundle (TemplateBundle, optional): Precompiled templates to load first.
+
+    Returns:
+        jinja2.Environment: A new environment, whose loader is a CachingLoader.
+
+    Raises:
+        TemplateError: If the bundle cannot be used with these options.
+    """
+    if bundle is not None:
+        loader = bundle.create_loader(template_dirs, enable_async)
+    else:
+        loader = FileSystemLoader(template_dirs)
+    environment = Environment(
+        loader=CachingLoader(loader),
+        bytecode_cache=bytecode_cache,
+        enable_async=enable_async,
+        cache_size=0,
+        **ENVIRONMENT_OPTIONS
+    )
+    environment.code_generator_class = BudgetCodeGenerator
+    environment.filters[LOOP_FILTER] = loop_budget
+    return environment
+
+
+class EnvironmentRegistry:
+    """
+    Process-wide registry of Jinja2 environments shared between TemplateManagers.
+
+    Environments are keyed by their template directories and options, so every
+    TemplateManager (and with it every CodeGenerator and CodeGenCore) reading
+    the same directories reuses one environment and its compiled templates.
+    Jinja2 environments are safe to render from several threads; the registry
+    itself is guarded by a lock. Only the most recently used environments are
+    kept; managers holding an environment that was dropped keep using it.
+
+    Shared environments must not be customized: TemplateManager switches to a
+    private environment before adding filters or globals.
+    """
+
+    def __init__(self, max_environments=DEFAULT_MAX_ENVIRONMENTS):
+        """
+        Initialize an empty EnvironmentRegistry.
+
+        Args:
+            max_environments (int): Number of environments kept.
+        """
+        self.max_environments = max_environments
+        self._environments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_environment(self, template_dirs, bytecode_cache=None, enable_async=False, bundle=None):
+        """
+        Get the shared environment for a set of template directories and options.
+
+        Args:
+            template_dirs (list or str): Directories to load templates from.
+            bytecode_cache (jinja2.BytecodeCache, optional): Cache for compiled templates.
+                Persistent caches over the same directory count as the same cache.
+            enable_async (bool): Compile templates for asynchronous rendering.
+            bundle (TemplateBundle, optional): Precompiled templates to load first.
+                Bundles are shared when they have the same path, build and verify flag.
+
+        Returns:
+            jinja2.Environment: The shared environment, created on first request.
+
+        Raises:
+            TemplateError: If the bundle cannot be used with these options.
+        """
+        template_dirs = self._normalize_dirs(template_dirs)
+        bundle_key = (bundle.path, bundle.build_id, bundle.verify) if bundle is not None else None
+        key = (template_dirs, bool(enable_async), self._bytecode_cache_key(bytecode_cache), bundle_key)
+        with self._lock:
+            environment = self._environments.get(key)
+            if environment is None:
+                environment = create_environment(list(template_dirs), bytecode_cache, enable_async, bundle)
+                self._environments[key] = environment
+                if len(self._environments) > self.max_environments:
+                    self._environments.popitem(last=False)
+            else:
+                self._environments.move_to_end(key)
+            return environment
+
+    def invalidate(self, template_dirs=None):
+        """
+        Drop the compiled templates of shared environments.
+
+        Args:
+            template_dirs (list or str, optional): Only invalidate environments
+                loading from exactly these directories. All environments if omitted.
+
+        Returns:
+            int: Number of environments whose compiled templates were dropped.
+        """
+        wanted = None if template_dirs is None else self._normalize_dirs(template_dirs)
+        with self._lock:
+            environments = [environment for key, environment in self._environments.items()
+                            if wanted is None or key[0] == wanted]
+        for environment in environments:
+            environment.loader.invalidate()
+        return len(environments)
+
+    def clear(self):
+        """Forget every shared environment; later requests create new ones."""
+        with self._lock:
+            self._environments.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._environments)
+
+    @staticmethod
+    def _normalize_dirs(template_dirs):
+        if isinstance(template_dirs, (str, os.PathLike)):
+            template_dirs = [template_dirs]
+        return tuple(os.path.abspath(os.fspath(path)) for path in template_dirs)
+
+    @staticmethod
+    def _bytecode_cache_key(bytecode_cache):
+        if bytecode_cache is None:
+            return None
+        if isinstance(bytecode_cache, PersistentBytecodeCache):
+            return ('persistent', bytecode_cache.directory)
+        # Other caches are only shared when the very same instance is passed.
+        return ('instance', id(bytecode_cache))
+
+
+# The registry used by TemplateManager unless it is told not to share.
+environment_registry = EnvironmentRegistry()
@@ -13,4 +13,47 @@ class ConfigError(CodeGenLibError):
 
 class OutputError(CodeGenLibError):
     """Raised when there's an issue with output operations."""
-    pass
\ No newline at end of file
+    pass
+
+class BatchGenerationError(CodeGenLibError):
+    """Raised when one or more items of a batch generation run failed."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        details = '; '.join(f"{path}: {error}" for path, error in errors)
+        super().__init__(f"{len(errors)} item(s) failed to generate: {details}")
+
+class ValidationError(CodeGenLibError):
+    """Raised when items of a manifest do not provide what their templates need."""
+
+    # Number of issues spelled out in the message; all of them are in ``issues``.
+    MAX_REPORTED = 20
+
+    def __init__(self, issues):
+        self.issues = issues
+        details = '; '.join(str(issue) for issue in issues[:self.MAX_REPORTED])
+        more = f"; and {len(issues) - self.MAX_REPORTED} more" if len(issues) > self.MAX_REPORTED else ''
+        super().__init__(f"{len(issues)} problem(s) found in the manifest: {details}{more}")
+
+class ShardingError(CodeGenLibError):
+    """Raised when shard results cannot be combined into a complete result."""
+    pass
+
+class RenderBudgetExceeded(TemplateError):
+    """Raised when a render exceeds its time, output size or loop iteration budget."""
+
+    def __init__(self, template_name, limit, value, diagnostics):
+        self.template_name = template_name
+        self.limit = limit
+        self.value = value
+        self.diagnostics = diagnostics
+        location = f" at line {diagnostics['lineno']}" if diagnostics.get('lineno') else ''
+        super().__init__(
+            f"Render of template {template_name} exceeded its {limit} budget of {value}{location} "
+            f"after {diagnostics['elapsed']:.3f}s, {diagnostics['output_bytes']} output bytes "
+            f"and {diagnostics['loop_iterations']} loop iterations"
+        )
+
+    def __reduce__(self):
+        # Keep the diagnostics when the error travels back from a process worker.
+        return (self.__class__, (self.template_name, self.limit, self.value, self.diagnostics))
@@ -1,28 +1,40 @@
 
 import os
+import pickle
+import time
 import yaml
+from functools import partial
 from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 from .template_manager import TemplateManager
-from .config_manager import ConfigManager
-from ..utils.string_utils import camel_to_snake
-from .exceptions import ConfigError, TemplateError, OutputError
-from ..utils.file_operations import write_file, read_yaml, ensure_directory, list_files
+from .config_manager import ConfigManager, load_config_snapshot, thaw
+from .budgets import create_render_budget
+from .bytecode_cache import create_bytecode_cache
+from .context_transforms import ContextTransformer
+from .bundle import load_bundle
+from .dependency_graph import DependencyGraph
+from .hooks import HookPipeline
+from .validation import ManifestValidator
+from .instrumentation import GenerationStats
+from .render_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES
+from .exceptions import CodeGenLibError, ConfigError, TemplateError, OutputError, RenderBudgetExceeded
+from .manifest import DEFAULT_MANIFEST_NAME, DEFAULT_SAVE_INTERVAL, GenerationManifest, library_version
+from .parallel import (BatchResult, GenerationResult, create_executor, generate_in_worker,
+                       resolve_executor, worker_spec)
+from ..utils.file_operations import DEFAULT_BUFFER_SIZE, BatchFileWriter
 
-class CodeGenerationError(Exception):
-    """Base exception for code generation errors."""
-    pass
+# Configuration template of each framework; the ones not listed follow the pattern.
+FRAMEWORK_CONFIG_TEMPLATE = 'framework_configs/{framework}_config.py.jinja2'
+FRAMEWORK_CONFIG_TEMPLATES = {'django': 'framework_configs/django_settings.py.jinja2'}
 
-class TemplateError(CodeGenerationError):
-    """Raised when there's an issue with templates."""
-    pass
+# Earlier name of the library's base exception, kept for existing callers.
+CodeGenerationError = CodeGenLibError
 
-class ConfigError(CodeGenerationError):
-    """Raised when there's an issue with configuration."""
-    pass
-
-class OutputError(CodeGenerationError):
-    """Raised when there's an issue with output operations."""
-    pass
+def _picklable(value):
+    try:
+        pickle.dumps(value)
+        return True
+    except Exception:
+        return False
 
 class CodeGenerator:
     def __init__(self, config_path):
@@ -36,19 +48,60 @@ class CodeGenerator:
             ConfigError: If the configuration file is not found or cannot be loaded.
         """
         self.config = self._load_config(config_path)
-        self.template_manager = TemplateManager(self.config.get('template_dirs'))
-        if not os.path.exists(config_path):
-            raise ConfigError(f"Config file not found: {config_path}")
-        
+        # Mutable copies of the 'templates' sections, for the snapshot they were taken from.
+        self._template_configs_for = None
+        self._template_configs = {}
+
         try:
+            # Served from the config cache, so the file is not parsed a second time
             self.config_manager = ConfigManager(config_path)
         except Exception as e:
             raise ConfigError(f"Failed to initialize ConfigManager: {str(e)}")
         
+        bytecode_cache = create_bytecode_cache(self.config_manager.get_bytecode_cache_config())
+        self.bundle = load_bundle(self.config_manager.get_bundle_config())
         try:
-            self.template_manager = TemplateManager()
+            self.template_manager = self._create_template_manager(bytecode_cache)
         except Exception as e:
             raise TemplateError(f"Failed to initialize TemplateManager: {str(e)}")
+        self._configure_render_cache()
+        self.template_manager.set_render_budget(create_render_budget(self.config.get('render_budget')))
+        self.context_transformer = ContextTransformer(self.config.get('context_transforms'))
+
+        self.config_path = config_path
+        output_config = self.config.get('output') or {}
+        self.stream_output = bool(output_config.get('streaming', False))
+        self.buffer_size = output_config.get('buffer_size', DEFAULT_BUFFER_SIZE)
+        self.fsync = bool(output_config.get('fsync', False))
+        self.manifest = None
+        self.instrumentation = None
+        self.hooks = HookPipeline()
+        self.validate = self._validation_enabled()
+        incremental = self.config.get('incremental')
+        if incremental:
+            settings = incremental if isinstance(incremental, dict) else {}
+            if settings.get('enabled', True):
+                self.enable_incremental(settings.get('manifest'),
+                                        settings.get('save_interval', DEFAULT_SAVE_INTERVAL))
+
+    def _create_template_manager(self, bytecode_cache):
+        """Create the TemplateManager used for rendering."""
+        return TemplateManager(thaw(self.config.get('template_dirs')), bytecode_cache=bytecode_cache,
+                               bundle=self.bundle)
+
+    def _configure_render_cache(self):
+        """Enable render memoization if the 'render_cache' config section asks for it."""
+        settings = self.config.get('render_cache')
+        if not settings:
+            return
+        if not isinstance(settings, dict):
+            settings = {}
+        if settings.get('enabled', True):
+            self.template_manager.enable_render_cache(
+                settings.get('max_entries', DEFAULT_MAX_ENTRIES),
+                settings.get('max_bytes', DEFAULT_MAX_BYTES),
+            )
+
     def _load_config(self, config_path):
         """
         Load the configuration from a YAML file.
@@ -57,67 +110,601 @@ class CodeGenerator:
             config_path (str): Path to the configuration file.
 
         Returns:
-            dict: Loaded configuration.
+            FrozenDict: Loaded configuration, as a shared read-only snapshot.
 
         Raises:
             ConfigError: If the configuration file is not found or cannot be loaded.
         """
         try:
-            with open(config_path, 'r') as config_file:
-                return yaml.safe_load(config_file)
+            return load_config_snapshot(config_path)
         except FileNotFoundError:
             raise ConfigError(f"Configuration file not found: {config_path}")
         except yaml.YAMLError as e:
             raise ConfigError(f"Error parsing configuration file: {str(e)}")
 
+    def reload_config(self):
+        """
+        Reload the configuration file if it changed on disk.
+
+        The template environment is rebuilt only when 'template_dirs' or the
+        'bundle' section changed; custom filters and globals are carried over.
+
+        Raises:
+            ConfigError: If the configuration file cannot be loaded.
+        """
+        old_config = self.config
+        self.config = self._load_config(self.config_path)
+        self.config_manager.config = self.config
+        bundle_changed = self.config.get('bundle') != old_config.get('bundle')
+        if bundle_changed:
+            self.bundle = load_bundle(self.config_manager.get_bundle_config())
+        if bundle_changed or self.config.get('template_dirs') != old_config.get('template_dirs'):
+            old_manager = self.template_manager
+            self.template_manager = self._create_template_manager(old_manager.bytecode_cache)
+            for name, filter_func in old_manager.custom_filters.items():
+                self.template_manager.add_filter(name, filter_func)
+            for name, value in old_manager.custom_globals.items():
+                self.template_manager.add_global(name, value)
+        if self.config.get('render_cache') != old_config.get('render_cache'):
+            self.template_manager.disable_render_cache()
+        if self.template_manager.render_cache is None:
+            self._configure_render_cache()
+        self.template_manager.set_render_budget(create_render_budget(self.config.get('render_budget')))
+        self.context_transformer = ContextTransformer(self.config.get('context_transforms'))
+        self.validate = self._validation_enabled()
+
+    def _validation_enabled(self):
+        """Read the 'validation' config section: true, or a mapping with 'enabled'."""
+        settings = self.config.get('validation')
+        if isinstance(settings, dict):
+            return bool(settings.get('enabled', True))
+        return bool(settings)
+
     def generate_code(self, template_name, output_path, **kwargs):
         """
         Generate code using a template and write it to an output file.
 
+        In incremental mode the output is left untouched when the template
+        closure, the merged context and the library version all match what the
+        manifest recorded for it. The manifest is written every
+        'incremental.save_interval' outputs rather than after each one; call
+        flush() when done. With 'output.streaming' enabled in the config,
+        the template is rendered chunk by chunk straight into the file. The file
+        is written to a temporary file and renamed into place, so it is never
+        left half-written.
+
         Args:
             template_name (str): Name of the template to use.
             output_path (str): Path where the generated code will be written.
             **kwargs: Additional context data for the template.
 
+        Returns:
+            bool: True if the file was written, False if it was skipped as up to date.
+
         Raises:
             TemplateError: If there's an error with the template.
             OutputError: If there's an error writing the output file.
         """
+        prepared = False
+        context = kwargs
+        if self.validate:
+            context, prepared = self._validate_inputs(template_name, output_path, **kwargs), True
+        writer = BatchFileWriter(self.fsync, self.buffer_size)
+        generated = self._generate(template_name, output_path, context, writer=writer, prepared=prepared)
+        writer.commit()
+        if generated and self.manifest is not None:
+            self.manifest.save_if_due()
+        if generated:
+            print(f"Generated code saved to {output_path}")
+            for hook_name, error in self.hooks.run_batch([output_path]):
+                raise OutputError(f"Batch hook '{hook_name}' failed for '{output_path}': {str(error)}")
+        return generated
+
+    def _generate(self, template_name, output_path, context, checksums=None, stream=None, writer=None,
+                  prepared=False):
+        """
+        Render and write a single output, honouring the incremental manifest.
+
+        With ``prepared`` the context was already merged and passed through the
+        pre_render hooks, as validation does.
+        """
+        instrumentation = self.instrumentation
+        timer = instrumentation.start(template_name, output_path) if instrumentation is not None else None
         try:
             # Merge kwargs with any template-specific config
-            context = {**self.config.get('templates', {}).get(template_name, {}), **kwargs}
-            
-            # Render the template
-            rendered_content = self.template_manager.render_template(template_name, context)
-            
-            # Ensure the output directory exists and write the file
-            ensure_directory(os.path.dirname(output_path))
-            write_file(output_path, rendered_content)
+            if not prepared:
+                context = self.hooks.pre_render(self._merge_context(template_name, context), output_path)
+            if timer is not None:
+                timer.lap('config_merge')
+
+            fingerprint = None
+            if writer is None or writer.writes_to_filesystem:
+                fingerprint = self._fingerprint(template_name, context, checksums)
+            if fingerprint is not None and self.manifest.is_up_to_date(output_path, fingerprint):
+                if timer is not None:
+                    timer.lap('fingerprint')
+                    instrumentation.finish(timer, skipped=True)
+                return False
+            if timer is not None:
+                if fingerprint is not None:
+                    timer.lap('fingerprint')
+                timer.template_cached = self.template_manager.is_template_cached(template_name)
+                self.template_manager.get_template(template_name)
+                timer.lap('template_lookup')
             
-            print(f"Generated code saved to {output_path}")
+            if writer is None:
+                writer = BatchFileWriter(buffer_size=self.buffer_size)
+            if stream is None:
+                stream = self.stream_output
+            # post_render hooks need the whole output, so they turn streaming off.
+            post_render = self.hooks.has('post_render', output_path)
+            if stream and not post_render:
+                # Render straight into the file, keeping memory flat for large outputs.
+                # Rendering and writing are interleaved, so both count as 'write'.
+                nbytes = writer.write_chunks(output_path, self.template_manager.stream_template(template_name, context))
+            else:
+                # Render the template and write it atomically
+                rendered_content, render_cached = self.template_manager.render_with_stats(template_name, context)
+                if timer is not None:
+                    timer.render_cached = render_cached
+                    timer.lap('render')
+                if post_render:
+                    rendered_content = self.hooks.post_render(rendered_content, output_path)
+                    if timer is not None:
+                        timer.lap('hooks')
+                nbytes = writer.write(output_path, rendered_content)
+
+            if fingerprint is not None:
+                self.manifest.record(output_path, fingerprint)
+            if timer is not None:
+                timer.lap('write')
+                instrumentation.finish(timer, nbytes)
+
+            return True
         
+        except RenderBudgetExceeded:
+            raise
         except TemplateError as e:
             raise TemplateError(f"Error with template '{template_name}': {str(e)}")
         except IOError as e:
             raise OutputError(f"Error writing to output file '{output_path}': {str(e)}")
 
-    def generate_multiple(self, generation_configs):
+    def generate_multiple(self, generation_configs, workers=None, executor=None, fsync=None, sink=None,
+                          validate=None):
         """
         Generate multiple code files based on a list of configurations.
 
+        Items are generated serially unless ``workers`` or ``executor`` ask for a
+        thread or process pool. Process workers build their Jinja environment once
+        and reuse it for every item they receive. A failing item does not stop the
+        batch: errors are collected per item and results keep the order of
+        ``generation_configs``. Outputs go through one BatchFileWriter, which
+        creates each directory once and writes every file atomically.
+
         Args:
             generation_configs (list): List of dictionaries, each containing 'template_name', 'output_path', and 'context'.
+                                       An optional 'stream' flag overrides the
+                                       'output.streaming' config for that item.
+            workers (int, optional): Number of pool workers. Defaults to the CPU count
+                                     when a pool backend is selected.
+            executor (optional): 'serial', 'thread', 'process' or a
+                                 concurrent.futures.Executor instance. Defaults to
+                                 'thread' when workers > 1 and 'serial' otherwise.
+            fsync (bool, optional): Flush all outputs and their directories to disk
+                                    at the end of the batch. Defaults to 'output.fsync'
+                                    from the config.
+            sink (OutputSink, optional): Write the outputs to a MemorySink, ZipSink or
+                                         TarSink instead of the filesystem. The
+                                         incremental manifest is not consulted and
+                                         the sink is left open for further batches.
+            validate (bool, optional): Check every item against its template's
+                                       required variables before anything is
+                                       rendered. Defaults to the 'validation' config.
+
+        Returns:
+            BatchResult: Per-item results in submission order, with a timing summary.
+                         Call ``raise_for_errors()`` on it to raise on failed items.
 
         Raises:
-            TemplateError: If there's an error with any template.
-            OutputError: If there's an error writing any output file.
-        """
-        for config in generation_configs:
-            self.generate_code(
-                config['template_name'],
-                config['output_path'],
-                **config.get('context', {})
-            )
+            ValueError: If the executor or worker count is invalid.
+            ValidationError: If validation is on and any item is invalid; every
+                             problem is listed and nothing is generated.
+        """
+        backend, workers, pool = resolve_executor(executor, workers)
+        # Validation builds every context; they are rendered as they are.
+        contexts = [None] * len(generation_configs)
+        if self.validate if validate is None else validate:
+            contexts = self.create_validator().check(generation_configs)
+        start = time.perf_counter()
+        # Template closure checksums, computed once per template for the whole batch.
+        checksums = {}
+        if sink is not None:
+            writer = sink
+        else:
+            writer = BatchFileWriter(self.fsync if fsync is None else fsync, self.buffer_size)
+
+        if backend == 'serial' or not generation_configs:
+            results = [self._generate_item(index, config, contexts[index], checksums, writer)
+                       for index, config in enumerate(generation_configs)]
+        else:
+            owns_pool = pool is None
+            if owns_pool:
+                pool = create_executor(backend, workers)
+            try:
+                if backend == 'process':
+                    results = self._generate_in_processes(pool, workers, generation_configs, checksums, writer,
+                                                          contexts)
+                else:
+                    results = list(pool.map(partial(self._generate_item, checksums=checksums, writer=writer),
+                                            range(len(generation_configs)), generation_configs, contexts))
+            finally:
+                if owns_pool:
+                    pool.shutdown()
+
+        writer.commit()
+        stale = self._finish_batch(generation_configs, checksums) if writer.writes_to_filesystem else []
+        hook_errors = self._run_batch_hooks(results, writer)
+        return BatchResult(results, backend, workers, time.perf_counter() - start, stale, writer.stats(),
+                           hook_errors)
+
+    def render_many(self, template_name, contexts, output_pattern=None, sink=None, fsync=None):
+        """
+        Render one template for many contexts.
+
+        The compiled template is fetched and the template-specific config is
+        merged once for the whole run, rather than once per item as in
+        generate_multiple(). Context transforms and the pre_render and
+        post_render hooks are applied to every context. Nothing is printed
+        per item.
+
+        Without ``output_pattern`` the outputs are streamed back to the caller;
+        they have no path, so hooks registered with a pattern do not apply.
+        With it, each output is written to the path the pattern gives for its
+        context through one BatchFileWriter (or ``sink``). Incremental mode is
+        honoured as in generate_multiple(), and a failing item does not stop
+        the run.
+
+        Args:
+            template_name (str): Name of the template to use.
+            contexts (iterable): Context dictionaries, consumed lazily.
+            output_pattern (str or callable, optional): Output path per context,
+                either a format string such as 'app/crud/{model_name_snake}.py'
+                filled from the merged context, or a function taking the merged
+                context and returning the path.
+            sink (OutputSink, optional): Write to a MemorySink, ZipSink or TarSink
+                                         instead of the filesystem.
+            fsync (bool, optional): Flush all outputs to disk at the end of the run.
+                                    Defaults to 'output.fsync' from the config.
+
+        Returns:
+            iterator or BatchResult: (context, output) pairs without
+                ``output_pattern``; otherwise the per-item results in input order.
+
+        Raises:
+            TemplateError: If the template is not found, or, when streaming, if
+                           rendering a context fails. Streamed runs raise
+                           when the first pair is requested.
+        """
+        shared_context = self._template_config(template_name)
+        if output_pattern is None:
+            return self._stream_many(template_name, contexts, shared_context)
+        return self._write_many(template_name, contexts, shared_context, output_pattern, sink, fsync)
+
+    def _stream_many(self, template_name, contexts, shared_context):
+        """Render one template per context and yield (context, output) pairs."""
+        render = self.template_manager.get_renderer(template_name)
+        post_render = self.hooks.has('post_render')
+        for context in contexts:
+            merged = self.hooks.pre_render(self._transform_context(template_name, {**shared_context, **context}))
+            output = render(merged)
+            if post_render:
+                output = self.hooks.post_render(output)
+            yield context, output
+
+    def _write_many(self, template_name, contexts, shared_context, output_pattern, sink, fsync):
+        """Render one template per context and write each output to its patterned path."""
+        start = time.perf_counter()
+        render = self.template_manager.get_renderer(template_name)
+        output_path_for = output_pattern if callable(output_pattern) else output_pattern.format_map
+        writer = sink if sink is not None else BatchFileWriter(self.fsync if fsync is None else fsync,
+                                                                self.buffer_size)
+        incremental = self.manifest is not None and writer.writes_to_filesystem
+        instrumentation = self.instrumentation
+        checksums = {}
+        results = []
+        output_paths = []
+        for index, context in enumerate(contexts):
+            item_start = time.perf_counter()
+            output_path = None
+            timer = None
+            try:
+                context = self._transform_context(template_name, {**shared_context, **context})
+                output_path = output_path_for(context)
+                output_paths.append(output_path)
+                context = self.hooks.pre_render(context, output_path)
+                if instrumentation is not None:
+                    timer = instrumentation.start(template_name, output_path)
+                    timer.lap('config_merge')
+                fingerprint = self._fingerprint(template_name, context, checksums) if incremental else None
+                if fingerprint is not None and self.manifest.is_up_to_date(output_path, fingerprint):
+                    if timer is not None:
+                        timer.lap('fingerprint')
+                        instrumentation.finish(timer, skipped=True)
+                    results.append(GenerationResult(index, template_name, output_path,
+                                                    duration=time.perf_counter() - item_start, skipped=True))
+                    continue
+                if timer is not None and fingerprint is not None:
+                    timer.lap('fingerprint')
+                output = render(context)
+                if timer is not None:
+                    timer.lap('render')
+                if self.hooks.has('post_render', output_path):
+                    output = self.hooks.post_render(output, output_path)
+                    if timer is not None:
+                        timer.lap('hooks')
+                nbytes = writer.write(output_path, output)
+                if fingerprint is not None:
+                    self.manifest.record(output_path, fingerprint)
+                if timer is not None:
+                    timer.lap('write')
+                    instrumentation.finish(timer, nbytes)
+                results.append(GenerationResult(index, template_name, output_path,
+                                                duration=time.perf_counter() - item_start,
+                                                bytes_written=nbytes))
+            except Exception as e:
+                results.append(GenerationResult(index, template_name, output_path, e,
+                                                time.perf_counter() - item_start))
+
+        writer.commit()
+        stale = []
+        if incremental:
+            stale = self._finish_batch([{'output_path': path} for path in output_paths], checksums)
+        hook_errors = self._run_batch_hooks(results, writer)
+        return BatchResult(results, 'serial', 1, time.perf_counter() - start, stale, writer.stats(), hook_errors)
+
+    def _run_batch_hooks(self, results, writer):
+        """Run the batch hooks on the outputs a run wrote to disk and return their errors."""
+        if not writer.writes_to_filesystem or not self.hooks.has('batch'):
+            return []
+        return self.hooks.run_batch([result.output_path for result in results if result.status == 'generated'])
+
+    def _finish_batch(self, generation_configs, checksums):
+        """Save the incremental manifest after a batch and return its stale outputs."""
+        if self.manifest is None:
+            return []
+        stale = self.manifest.find_stale(
+            partial(self._current_checksum, checksums),
+            library_version(),
+            exclude=[config['output_path'] for config in generation_configs if config.get('output_path')],
+        )
+        self.manifest.save()
+        return stale
+
+    def _generate_in_processes(self, pool, workers, generation_configs, checksums, writer, contexts):
+        """Dispatch the items that need regenerating to a process pool."""
+        results = [None] * len(generation_configs)
+        fingerprints = {}
+        items = []
+        # Workers write straight to disk; for other sinks they send the output back.
+        return_content = not writer.writes_to_filesystem
+        # post_render hooks run in the workers when they can be pickled, and
+        # otherwise in this process on the output the workers send back.
+        worker_hooks = self.hooks if self.hooks.has('post_render') else None
+        parent_hooks = None
+        if worker_hooks is not None and not _picklable(worker_hooks):
+            worker_hooks, parent_hooks, return_content = None, self.hooks, True
+        for index, config in enumerate(generation_configs):
+            template_name = config['template_name']
+            output_path = config['output_path']
+            try:
+                context = contexts[index]
+                if context is None:
+                    context = self.hooks.pre_render(self._merge_context(template_name, config.get('context', {})),
+                                                    output_path)
+                fingerprint = None if return_content else self._fingerprint(template_name, context, checksums)
+            except Exception as e:
+                results[index] = GenerationResult(index, template_name, output_path, e)
+                continue
+            if fingerprint is not None and self.manifest.is_up_to_date(output_path, fingerprint):
+                results[index] = GenerationResult(index, template_name, output_path, skipped=True)
+                continue
+            fingerprints[index] = fingerprint
+            stream = config.get('stream', self.stream_output)
+            items.append((index, template_name, output_path, context,
+                          self.buffer_size if stream else None, return_content))
+
+        if items:
+            chunksize = max(1, len(items) // (workers * 4))
+            worker = partial(generate_in_worker, worker_spec(self.template_manager), hooks=worker_hooks)
+            for result in pool.map(worker, items, chunksize=chunksize):
+                results[result.index] = result
+                for hook_name, seconds in (result.hook_times or {}).items():
+                    self.hooks.record(hook_name, seconds)
+                if result.ok and return_content:
+                    try:
+                        if parent_hooks is not None:
+                            result.content = parent_hooks.post_render(result.content, result.output_path)
+                        result.bytes_written = writer.write(result.output_path, result.content)
+                    except Exception as e:
+                        result.error = e
+                    result.content = None
+                elif result.ok:
+                    writer.register(result.output_path, result.bytes_written)
+                    if fingerprints[result.index] is not None:
+                        self.manifest.record(result.output_path, fingerprints[result.index])
+                if result.ok and self.instrumentation is not None:
+                    # Workers are not instrumented; their time is reported as one phase.
+                    timer = self.instrumentation.start(result.template_name, result.output_path)
+                    timer.phases['worker'] = result.duration
+                    self.instrumentation.finish(timer, result.bytes_written)
+        return results
+
+    def _generate_item(self, index, config, context=None, checksums=None, writer=None):
+        """Generate one item of a batch, capturing any error in the result."""
+        template_name = config.get('template_name')
+        output_path = config.get('output_path')
+        start = time.perf_counter()
+        error = None
+        generated = False
+        try:
+            prepared = context is not None
+            if not prepared:
+                context = config.get('context', {})
+            generated = self._generate(template_name, output_path, context, checksums, config.get('stream'),
+                                       writer, prepared)
+        except Exception as e:
+            error = e
+        return GenerationResult(index, template_name, output_path, error,
+                                time.perf_counter() - start, skipped=error is None and not generated)
+
+    def enable_incremental(self, manifest_path=None, save_interval=DEFAULT_SAVE_INTERVAL):
+        """
+        Turn on incremental generation.
+
+        Outputs whose template closure, merged context and library version are
+        unchanged since the last run are skipped instead of being rewritten.
+
+        Args:
+            manifest_path (str, optional): Path of the manifest file. Defaults to
+                                           '.codegen-manifest.json' next to the config file.
+            save_interval (int): Number of generate_code() outputs after which the
+                                 manifest is written; generate_multiple() always
+                                 writes it at the end of the batch.
+
+        Returns:
+            GenerationManifest: The manifest in use.
+        """
+        if manifest_path is None:
+            manifest_path = os.path.join(os.path.dirname(os.path.abspath(self.config_path)),
+                                         DEFAULT_MANIFEST_NAME)
+        self.flush()
+        self.manifest = GenerationManifest(manifest_path, save_interval)
+        return self.manifest
+
+    def disable_incremental(self):
+        """Turn off incremental generation; every output is regenerated."""
+        self.flush()
+        self.manifest = None
+
+    def flush(self):
+        """
+        Write the incremental manifest records generate_code() has not saved yet.
+
+        Outputs whose records are lost, e.g. because the process exits first,
+        are only regenerated on the next run.
+
+        Returns:
+            bool: True if the manifest was written.
+        """
+        if self.manifest is None:
+            return False
+        return self.manifest.flush()
+
+    def enable_instrumentation(self, stats=None):
+        """
+        Record per-phase timings, output sizes and cache hits of every output.
+
+        Args:
+            stats (GenerationStats, optional): Collector to record into. A new one
+                                               is created if omitted.
+
+        Returns:
+            GenerationStats: The collector in use.
+        """
+        self.instrumentation = stats if stats is not None else GenerationStats()
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Stop recording generation statistics."""
+        self.instrumentation = None
+
+    def add_hook(self, stage, func, name=None, pattern=None):
+        """
+        Register a hook run around the generation of every output.
+
+        'pre_render' hooks receive the merged context and may update it or
+        return a new one. 'post_render' hooks receive the rendered text and
+        return the text to write; they must be picklable to run in process-pool
+        workers, and are otherwise run in this process. 'batch' hooks receive
+        the paths of all outputs a run wrote, once the run is on disk; their
+        failures are reported in BatchResult.hook_errors. See HookPipeline.
+
+        Args:
+            stage (str): 'pre_render', 'post_render' or 'batch'.
+            func (callable): The hook function.
+            name (str, optional): Name for its timings in ``self.hooks.timings()``.
+            pattern (str, optional): Only run the hook for outputs matching this glob, e.g. '*.py'.
+
+        Returns:
+            Hook: The registered hook; pass it to ``self.hooks.remove()`` to unregister it.
+        """
+        return self.hooks.add(stage, func, name, pattern)
+
+    def instrumentation_report(self, limit=10):
+        """
+        Format the recorded statistics, including the hottest profiled templates.
+
+        Args:
+            limit (int): Maximum number of templates per section.
+
+        Returns:
+            str: The report, or an empty string if instrumentation is off.
+        """
+        if self.instrumentation is None:
+            return ''
+        template_files = None
+        if self.instrumentation.profile_stats is not None:
+            template_files = self.build_dependency_graph().template_files
+        return self.instrumentation.format_report(template_files, limit)
+
+    def build_dependency_graph(self):
+        """
+        Build the dependency graph of this generator's templates, config and manifest.
+
+        Returns:
+            DependencyGraph: Graph answering which outputs a set of changed files affects.
+        """
+        return DependencyGraph(self.template_manager, self.config, self.config_path, self.manifest)
+
+    def _fingerprint(self, template_name, context, checksums=None):
+        """Fingerprint the inputs of an output, or return None outside incremental mode."""
+        if self.manifest is None:
+            return None
+        if checksums is None:
+            checksums = {}
+        if template_name not in checksums:
+            checksums[template_name] = self.template_manager.get_template_checksum(template_name)
+        return GenerationManifest.fingerprint(template_name, checksums[template_name],
+                                              context, library_version())
+
+    def _current_checksum(self, checksums, template_name):
+        """Get the current closure checksum of a template, or None if it is gone."""
+        if template_name not in checksums:
+            try:
+                checksums[template_name] = self.template_manager.get_template_checksum(template_name)
+            except CodeGenLibError:
+                checksums[template_name] = None
+        return checksums[template_name]
+
+    def _merge_context(self, template_name, context):
+        """Merge the template-specific config with the given context and derive identifiers."""
+        return self._transform_context(template_name, {**self._template_config(template_name), **context})
+
+    def _template_config(self, template_name):
+        """
+        Get the template-specific config as plain dicts and lists.
+
+        Templates must see lists from the config as lists, not as the tuples of
+        the frozen snapshot. Each section is thawed once per snapshot.
+        """
+        config = self.config
+        if self._template_configs_for is not config:
+            self._template_configs_for, self._template_configs = config, {}
+        section = self._template_configs.get(template_name)
+        if section is None:
+            section = thaw((config.get('templates') or {}).get(template_name) or {})
+            self._template_configs[template_name] = section
+        return section
 
     def list_available_templates(self):
         """
@@ -148,30 +735,50 @@ class CodeGenerator:
         """
         self.template_manager.add_global(name, value)
 
+    def create_validator(self):
+        """
+        Create a validator checking items against their templates' required variables.
+
+        Items are checked with the context they would be rendered with: the
+        template-specific config, the context transforms and the pre_render hooks
+        are applied first.
+
+        Returns:
+            ManifestValidator: A validator for one pass over a manifest.
+        """
+        def merge_context(template_name, context, output_path):
+            return self.hooks.pre_render(self._merge_context(template_name, context), output_path)
+        return ManifestValidator(self.template_manager, self.config_manager, merge_context)
+
+    def validate_manifest(self, generation_configs):
+        """
+        Check a whole manifest without rendering anything.
+
+        Args:
+            generation_configs (list): generate_multiple() items.
+
+        Returns:
+            list: Every ValidationIssue found, in manifest order; empty if the manifest is valid.
+        """
+        return self.create_validator().validate(generation_configs)
+
     def _validate_inputs(self, template_name, output_path, **kwargs):
-        if not isinstance(template_name, str) or not template_name:
-            raise ValueError("template_name must be a non-empty string")
-        
-        if not isinstance(output_path, str) or not output_path:
-            raise ValueError("output_path must be a non-empty string")
-        
-        output_dir = os.path.dirname(output_path)
-        if not os.path.exists(output_dir):
-            raise OutputError(f"Output directory does not exist: {output_dir}")
-        
-        if os.path.exists(output_path):
-            raise OutputError(f"Output file already exists: {output_path}")
-        
-        required_kwargs = self.config_manager.get_required_kwargs(template_name)
-        for kwarg in required_kwargs:
-            if kwarg not in kwargs:
-                raise ValueError(f"Missing required argument: {kwarg}")
-    
-    def _transform_context(self, context):
-        """Apply any necessary transformations to the context."""
-        if 'model_name' in context:
-            context['model_name_snake'] = camel_to_snake(context['model_name'])
-        return context
+        """
+        Raise ValidationError if the arguments of generate_code() miss required variables.
+
+        Returns:
+            dict: The merged context, ready to render.
+        """
+        return self.create_validator().check([{'template_name': template_name, 'output_path': output_path,
+                                               'context': kwargs}])[0]
+
+    def _transform_context(self, template_name, context):
+        """Apply the template's configured context transforms to a merged context, in place."""
+        return self.context_transformer.transform(template_name, context)
+
     def generate_framework_config(self, framework, output_path, **kwargs):
-        template_name = f"framework_configs/{framework}_config"
-        self.generate_code(template_name, output_path, **kwargs)
\ No newline at end of file
+        self.generate_code(self._framework_config_template(framework), output_path, **kwargs)
+
+    def _framework_config_template(self, framework):
+        """Get the name of the configuration template of a framework, e.g. 'flask'."""
+        return FRAMEWORK_CONFIG_TEMPLATES.get(framework) or FRAMEWORK_CONFIG_TEMPLATE.format(framework=framework)
\ No newline at end of file
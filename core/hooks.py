@@ -0,0 +1,325 @@
+import fnmatch
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from .exceptions import OutputError
+
+# Stages a hook can be registered for, in pipeline order.
+HOOK_STAGES = ('pre_render', 'post_render', 'batch')
+
+# Number of files handed to one run of a command hook.
+DEFAULT_COMMAND_CHUNK_SIZE = 200
+
+
+class Hook:
+    """A function registered for one stage of the hook pipeline."""
+
+    __slots__ = ('stage', 'func', 'name', 'pattern')
+
+    def __init__(self, stage, func, name, pattern=None):
+        """
+        Initialize the Hook.
+
+        Args:
+            stage (str): One of HOOK_STAGES.
+            func (callable): The hook function.
+            name (str): Name the hook's timings are recorded under.
+            pattern (str, optional): Glob the output path must match, e.g. '*.py'.
+        """
+        self.stage = stage
+        self.func = func
+        self.name = name
+        self.pattern = pattern
+
+    def matches(self, output_path):
+        """bool: True if the hook applies to an output path."""
+        if self.pattern is None:
+            return True
+        return output_path is not None and (fnmatch.fnmatch(output_path, self.pattern)
+                                            or fnmatch.fnmatch(os.path.basename(output_path), self.pattern))
+
+    def __repr__(self):
+        return f"Hook({self.stage!r}, {self.name!r}, pattern={self.pattern!r})"
+
+
+class HookPipeline:
+    """
+    Hooks run around the rendering of generated outputs.
+
+    There are three stages:
+
+    * ``pre_render`` hooks are called with the merged context of an output
+      and may update it in place or return a new one.
+    * ``post_render`` hooks are called with the rendered text of an output,
+      in memory, and return the text to write.
+    * ``batch`` hooks are called once per run with the paths of every output
+      that was written, after all of them are on disk. This is where a
+      formatter or linter can process the whole run in one go.
+
+    Hooks run in registration order. A hook restricted to a glob pattern only
+    sees outputs whose path, or file name, matches it. The time spent in each
+    hook is recorded; see timings().
+    """
+
+    def __init__(self):
+        """Initialize an empty HookPipeline."""
+        self.hooks = {stage: [] for stage in HOOK_STAGES}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, func, name=None, pattern=None):
+        """
+        Register a hook.
+
+        Args:
+            stage (str): 'pre_render', 'post_render' or 'batch'.
+            func (callable): The hook function.
+            name (str, optional): Name for its timings; defaults to the function's name.
+            pattern (str, optional): Only run the hook for outputs matching this glob.
+
+        Returns:
+            Hook: The registered hook.
+
+        Raises:
+            ValueError: If the stage is unknown or the function is not callable.
+        """
+        if stage not in HOOK_STAGES:
+            raise ValueError(f"Invalid hook stage '{stage}'. Choose from {HOOK_STAGES}")
+        if not callable(func):
+            raise ValueError("A hook must be callable")
+        hook = Hook(stage, func, name or getattr(func, '__name__', repr(func)), pattern)
+        self.hooks[stage].append(hook)
+        return hook
+
+    def remove(self, hook):
+        """
+        Unregister a hook.
+
+        Args:
+            hook (Hook): A hook returned by add().
+        """
+        self.hooks[hook.stage].remove(hook)
+
+    def has(self, stage, output_path=None):
+        """
+        Check whether any hook of a stage applies.
+
+        Args:
+            stage (str): One of HOOK_STAGES.
+            output_path (str, optional): Only count hooks applying to this output.
+
+        Returns:
+            bool: True if at least one hook would run.
+        """
+        hooks = self.hooks[stage]
+        if output_path is None:
+            return bool(hooks)
+        return any(hook.matches(output_path) for hook in hooks)
+
+    def pre_render(self, context, output_path=None):
+        """
+        Run the pre_render hooks on the merged context of an output.
+
+        Args:
+            context (dict): The merged context.
+            output_path (str, optional): Path of the output.
+
+        Returns:
+            dict: The context to render with.
+        """
+        for hook in self.hooks['pre_render']:
+            if hook.matches(output_path):
+                start = time.perf_counter()
+                try:
+                    result = hook.func(context)
+                except Exception:
+                    self.record(hook.name, time.perf_counter() - start, failed=True)
+                    raise
+                self.record(hook.name, time.perf_counter() - start)
+                if result is not None:
+                    context = result
+        return context
+
+    def post_render(self, content, output_path=None):
+        """
+        Run the post_render hooks on the rendered text of an output.
+
+        Args:
+            content (str): The rendered text.
+            output_path (str, optional): Path of the output.
+
+        Returns:
+            str: The text to write.
+        """
+        content, times = self.apply_post_render(content, output_path)
+        for name, seconds in times.items():
+            self.record(name, seconds)
+        return content
+
+    def apply_post_render(self, content, output_path=None):
+        """
+        Run the post_render hooks without recording their timings.
+
+        Used where the timings have to be sent elsewhere first, as from a
+        process-pool worker back to the parent.
+
+        Returns:
+            tuple: (text to write, {hook name: seconds}).
+        """
+        times = {}
+        for hook in self.hooks['post_render']:
+            if hook.matches(output_path):
+                start = time.perf_counter()
+                try:
+                    content = hook.func(content)
+                finally:
+                    times[hook.name] = times.get(hook.name, 0.0) + time.perf_counter() - start
+                if not isinstance(content, str):
+                    raise OutputError(f"post_render hook '{hook.name}' returned {type(content).__name__}, "
+                                      f"not str")
+        return content, times
+
+    def run_batch(self, output_paths):
+        """
+        Run the batch hooks on the outputs of a run.
+
+        Every batch hook runs, even if an earlier one fails.
+
+        Args:
+            output_paths (list): Paths of the outputs that were written.
+
+        Returns:
+            list: (hook name, exception) pairs of the hooks that failed.
+        """
+        errors = []
+        for hook in self.hooks['batch']:
+            paths = [path for path in output_paths if hook.matches(path)]
+            if not paths:
+                continue
+            start = time.perf_counter()
+            failed = False
+            try:
+                hook.func(paths)
+            except Exception as e:
+                failed = True
+                errors.append((hook.name, e))
+            self.record(hook.name, time.perf_counter() - start, len(paths), failed)
+        return errors
+
+    def record(self, name, seconds, outputs=1, failed=False):
+        """
+        Record the time a hook took.
+
+        Args:
+            name (str): Name of the hook.
+            seconds (float): Time spent in the hook.
+            outputs (int): Number of outputs the call handled.
+            failed (bool): Whether the call raised.
+        """
+        with self._lock:
+            entry = self._timings.get(name)
+            if entry is None:
+                entry = self._timings[name] = {'calls': 0, 'outputs': 0, 'seconds': 0.0, 'errors': 0}
+            entry['calls'] += 1
+            entry['outputs'] += outputs
+            entry['seconds'] += seconds
+            entry['errors'] += failed
+
+    def timings(self):
+        """
+        Get the time spent in each hook so far.
+
+        Returns:
+            dict: Per hook name, 'calls', 'outputs' handled, total 'seconds' and 'errors'.
+        """
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._timings.items()}
+
+    def reset_timings(self):
+        """Forget the recorded timings."""
+        with self._lock:
+            self._timings = {}
+
+    def __bool__(self):
+        return any(self.hooks.values())
+
+    def __getstate__(self):
+        # Sent to process-pool workers, which report timings with their results.
+        return {'hooks': self.hooks}
+
+    def __setstate__(self, state):
+        self.hooks = state['hooks']
+        self._timings = {}
+        self._lock = threading.Lock()
+
+
+class _Header:
+    # A class rather than a closure, so the hook can be sent to process workers.
+
+    def __init__(self, header):
+        self.header = header
+        self.__name__ = 'header'
+
+    def __call__(self, content):
+        return content if content.startswith(self.header) else self.header + content
+
+
+def header_hook(header):
+    """
+    Build a post_render hook that prepends a header, such as a license notice.
+
+    Outputs that already start with the header are left as they are.
+
+    Args:
+        header (str): The header text, including its trailing newline(s).
+
+    Returns:
+        callable: The hook.
+    """
+    return _Header(header)
+
+
+def command_hook(command, workers=None, chunk_size=DEFAULT_COMMAND_CHUNK_SIZE):
+    """
+    Build a batch hook that runs a command over the written files.
+
+    The paths are split into chunks of ``chunk_size`` and each chunk is
+    appended to the command, e.g. ``['black', '-q']`` or ``['isort']``. The
+    chunks run in parallel on ``workers`` threads, so a formatter is started
+    a handful of times per run instead of once per file.
+
+    Args:
+        command (list): The command and its arguments.
+        workers (int, optional): Number of commands run at once; defaults to os.cpu_count().
+        chunk_size (int): Maximum number of paths per command.
+
+    Returns:
+        callable: The hook.
+
+    Raises:
+        OutputError: From the hook, if a command exits with a non-zero status.
+    """
+    command = list(command)
+    workers = workers or os.cpu_count() or 1
+
+    def run(chunk):
+        completed = subprocess.run(command + chunk, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   universal_newlines=True)
+        if completed.returncode != 0:
+            raise OutputError(f"Command {' '.join(command)} failed with status {completed.returncode}: "
+                              f"{completed.stderr.strip() or completed.stdout.strip()}")
+
+    def run_command(paths):
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+        if len(chunks) == 1 or workers == 1:
+            for chunk in chunks:
+                run(chunk)
+            return
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            for _ in pool.map(run, chunks):
+                pass
+
+    run_command.__name__ = os.path.basename(command[0])
+    return run_command
@@ -0,0 +1,267 @@
+import contextlib
+import os
+import threading
+import time
+
+# Phases timed for every generated output, in pipeline order.
+PHASES = ('config_merge', 'fingerprint', 'template_lookup', 'render', 'hooks', 'write')
+
+
+class PhaseTimer:
+    """Times the phases of a single generation; created by GenerationStats.start()."""
+
+    __slots__ = ('template_name', 'output_path', 'phases', 'template_cached', 'render_cached', '_last')
+
+    def __init__(self, template_name, output_path):
+        self.template_name = template_name
+        self.output_path = output_path
+        self.phases = {}
+        self.template_cached = False
+        self.render_cached = False
+        self._last = time.perf_counter()
+
+    def lap(self, phase):
+        """
+        Close the current phase, charging the time since the previous lap to it.
+
+        Args:
+            phase (str): Name of the phase that just finished.
+        """
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+
+class GenerationStats:
+    """
+    Collects per-phase timings, output sizes and cache hits of generated outputs.
+
+    Assign an instance to ``CodeGenerator.instrumentation`` (or call
+    ``CodeGenerator.enable_instrumentation()``) to start recording. Every output
+    is timed through the config merge, fingerprint, template lookup, render and
+    write phases; listeners are called with the record of each output as it
+    finishes. While instrumentation is off the generator only checks for None.
+
+    Inside ``profile()``, cProfile and optionally tracemalloc run as well, and
+    ``hottest_templates()`` attributes the captured time and memory to the
+    template files that were executing.
+    """
+
+    def __init__(self):
+        """Initialize an empty GenerationStats."""
+        self.templates = {}
+        self.outputs = 0
+        self.listeners = []
+        self.profile_stats = None
+        self.memory_snapshot = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """
+        Register a callback for finished outputs.
+
+        Args:
+            callback (callable): Called with the record dict of each output, holding
+                                 'template_name', 'output_path', 'phases', 'bytes',
+                                 'template_cached', 'render_cached' and 'skipped'.
+        """
+        self.listeners.append(callback)
+
+    def start(self, template_name, output_path):
+        """
+        Start timing one output.
+
+        Args:
+            template_name (str): Template the output is rendered from.
+            output_path (str): Path of the output.
+
+        Returns:
+            PhaseTimer: Timer whose lap() closes each phase.
+        """
+        return PhaseTimer(template_name, output_path)
+
+    def finish(self, timer, nbytes=0, skipped=False):
+        """
+        Record a finished output and notify the listeners.
+
+        Args:
+            timer (PhaseTimer): The timer returned by start().
+            nbytes (int): Number of bytes written for the output.
+            skipped (bool): Whether the output was skipped as up to date.
+
+        Returns:
+            dict: The record of the output.
+        """
+        record = {
+            'template_name': timer.template_name,
+            'output_path': timer.output_path,
+            'phases': timer.phases,
+            'bytes': nbytes,
+            'template_cached': timer.template_cached,
+            'render_cached': timer.render_cached,
+            'skipped': skipped,
+        }
+        with self._lock:
+            self.outputs += 1
+            totals = self.templates.get(timer.template_name)
+            if totals is None:
+                totals = self.templates[timer.template_name] = {
+                    'outputs': 0, 'skipped': 0, 'bytes': 0,
+                    'template_cache_hits': 0, 'render_cache_hits': 0, 'phases': {},
+                }
+            totals['outputs'] += 1
+            totals['skipped'] += skipped
+            totals['bytes'] += nbytes
+            totals['template_cache_hits'] += timer.template_cached
+            totals['render_cache_hits'] += timer.render_cached
+            for phase, seconds in timer.phases.items():
+                totals['phases'][phase] = totals['phases'].get(phase, 0.0) + seconds
+        for listener in self.listeners:
+            listener(record)
+        return record
+
+    def phase_totals(self):
+        """
+        Sum the time spent in each phase over all templates.
+
+        Returns:
+            dict: Seconds per phase, in pipeline order.
+        """
+        totals = {}
+        with self._lock:
+            for template_totals in self.templates.values():
+                for phase, seconds in template_totals['phases'].items():
+                    totals[phase] = totals.get(phase, 0.0) + seconds
+        return {phase: totals[phase] for phase in sorted(totals, key=_phase_order)}
+
+    def summary(self):
+        """
+        Summarize everything recorded so far.
+
+        Returns:
+            dict: Output count, bytes, per-phase totals and per-template figures.
+        """
+        phases = self.phase_totals()
+        with self._lock:
+            return {
+                'outputs': self.outputs,
+                'bytes': sum(totals['bytes'] for totals in self.templates.values()),
+                'phases': phases,
+                'templates': {name: dict(totals, phases=dict(totals['phases']))
+                              for name, totals in self.templates.items()},
+            }
+
+    def reset(self):
+        """Forget everything recorded so far. Listeners are kept."""
+        with self._lock:
+            self.templates = {}
+            self.outputs = 0
+        self.profile_stats = None
+        self.memory_snapshot = None
+
+    @contextlib.contextmanager
+    def profile(self, memory=False):
+        """
+        Run cProfile, and optionally tracemalloc, while the block executes.
+
+        Profiling covers the calling thread; use the serial backend for a
+        complete picture. Results are kept in ``profile_stats`` and
+        ``memory_snapshot`` and summarized by hottest_templates().
+
+        Args:
+            memory (bool): Also trace memory allocations with tracemalloc.
+        """
+        # Profiling modules are only needed in capture mode.
+        import cProfile
+        import pstats
+        import tracemalloc
+        profiler = cProfile.Profile()
+        started_tracing = memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        profiler.enable()
+        try:
+            yield self
+        finally:
+            profiler.disable()
+            self.profile_stats = pstats.Stats(profiler)
+            if memory:
+                self.memory_snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def hottest_templates(self, template_files, limit=10):
+        """
+        Rank templates by the time and memory captured while profiling.
+
+        Jinja2 compiles each template into code whose filename is the template's
+        source file, so profiler entries and allocations can be attributed to
+        the template that was executing.
+
+        Args:
+            template_files (dict): Mapping of template file path to template name,
+                                   e.g. DependencyGraph.template_files.
+            limit (int): Maximum number of templates to report.
+
+        Returns:
+            list: Dicts with 'template_name', 'calls', 'seconds' (time spent in the
+                  template's own code) and 'allocated_bytes', hottest first.
+        """
+        if self.profile_stats is None:
+            return []
+        files = {os.path.abspath(path): name for path, name in template_files.items()}
+        hot = {}
+        for (filename, _, _), (_, calls, own_time, _, _) in self.profile_stats.stats.items():
+            template_name = files.get(os.path.abspath(filename))
+            if template_name is None:
+                continue
+            entry = hot.setdefault(template_name, {'template_name': template_name, 'calls': 0,
+                                                   'seconds': 0.0, 'allocated_bytes': 0})
+            entry['calls'] += calls
+            entry['seconds'] += own_time
+        if self.memory_snapshot is not None:
+            for statistic in self.memory_snapshot.statistics('filename'):
+                template_name = files.get(os.path.abspath(statistic.traceback[0].filename))
+                if template_name is not None:
+                    entry = hot.setdefault(template_name, {'template_name': template_name, 'calls': 0,
+                                                           'seconds': 0.0, 'allocated_bytes': 0})
+                    entry['allocated_bytes'] += statistic.size
+        return sorted(hot.values(), key=lambda entry: (entry['seconds'], entry['allocated_bytes']),
+                      reverse=True)[:limit]
+
+    def format_report(self, template_files=None, limit=10):
+        """
+        Format the recorded figures as a human-readable report.
+
+        Args:
+            template_files (dict, optional): Template file to name mapping; when
+                                             given, the profiled hottest templates
+                                             are listed as well.
+            limit (int): Maximum number of templates per section.
+
+        Returns:
+            str: The report.
+        """
+        summary = self.summary()
+        lines = [f"{summary['outputs']} output(s), {summary['bytes']} bytes"]
+        for phase, seconds in summary['phases'].items():
+            lines.append(f"  {phase:<16}{seconds * 1000:>12.2f} ms")
+        ranked = sorted(summary['templates'].items(), key=lambda item: sum(item[1]['phases'].values()),
+                        reverse=True)[:limit]
+        for template_name, totals in ranked:
+            lines.append(f"{template_name}: {totals['outputs']} output(s), {totals['bytes']} bytes, "
+                         f"{sum(totals['phases'].values()) * 1000:.2f} ms, "
+                         f"{totals['template_cache_hits']} template / "
+                         f"{totals['render_cache_hits']} render cache hit(s)")
+        if template_files is not None:
+            hottest = self.hottest_templates(template_files, limit)
+            if hottest:
+                lines.append('Hottest templates (profiled):')
+            for entry in hottest:
+                lines.append(f"  {entry['template_name']}: {entry['seconds'] * 1000:.2f} ms in "
+                             f"{entry['calls']} call(s), {entry['allocated_bytes']} bytes allocated")
+        return '\n'.join(lines)
+
+
+def _phase_order(phase):
+    return (PHASES.index(phase) if phase in PHASES else len(PHASES), phase)
@@ -0,0 +1,190 @@
+import json
+import os
+import tempfile
+from .exceptions import ConfigError
+from ..utils.hashing import hash_context
+
+MANIFEST_FORMAT_VERSION = 1
+DEFAULT_MANIFEST_NAME = '.codegen-manifest.json'
+# Number of new records after which save_if_due() writes the manifest.
+DEFAULT_SAVE_INTERVAL = 100
+
+
+def library_version():
+    """Return the installed code_gen_lib version."""
+    from .. import __version__
+    return __version__
+
+
+class GenerationManifest:
+    """
+    Record of the inputs every generated output was produced from.
+
+    For each output path the manifest stores the template name, a checksum of
+    the template closure (the template plus everything it includes, extends or
+    imports), a hash of the merged context and the library version. An output
+    only needs to be regenerated when one of those changes or the file is gone.
+    """
+
+    def __init__(self, path, save_interval=DEFAULT_SAVE_INTERVAL):
+        """
+        Initialize the GenerationManifest, loading it from disk if it exists.
+
+        Args:
+            path (str): Path of the manifest file.
+            save_interval (int): Number of unsaved records after which
+                                 save_if_due() writes the manifest.
+
+        Raises:
+            ConfigError: If the manifest file exists but cannot be parsed.
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self.entries = {}
+        self.pending = 0
+        self.load()
+
+    def load(self):
+        """
+        Load the manifest from disk, replacing the in-memory entries.
+
+        Raises:
+            ConfigError: If the manifest file exists but cannot be parsed.
+        """
+        self.pending = 0
+        if not os.path.exists(self.path):
+            self.entries = {}
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ConfigError(f"Error reading generation manifest '{self.path}': {str(e)}")
+        if data.get('format_version') != MANIFEST_FORMAT_VERSION:
+            # Entries written by another format version cannot be trusted.
+            self.entries = {}
+            return
+        self.entries = data.get('outputs', {})
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format_version': MANIFEST_FORMAT_VERSION, 'outputs': self.entries},
+                          f, indent=2)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.pending = 0
+
+    def flush(self):
+        """
+        Write the manifest to disk if it has unsaved records.
+
+        Returns:
+            bool: True if the manifest was written.
+        """
+        if not self.pending:
+            return False
+        self.save()
+        return True
+
+    def save_if_due(self):
+        """
+        Write the manifest once ``save_interval`` records are unsaved.
+
+        Single-output generation calls this instead of save(), so that a loop
+        over many outputs does not rewrite the whole manifest for each one.
+
+        Returns:
+            bool: True if the manifest was written.
+        """
+        if self.pending < self.save_interval:
+            return False
+        self.save()
+        return True
+
+    @staticmethod
+    def fingerprint(template_name, template_checksum, context, library_version):
+        """
+        Build the fingerprint of one output's inputs.
+
+        Args:
+            template_name (str): Name of the template.
+            template_checksum (str): Checksum of the template closure.
+            context (dict): The merged template context.
+            library_version (str): Version of code_gen_lib.
+
+        Returns:
+            dict: The fingerprint, as stored in the manifest.
+        """
+        return {
+            'template': template_name,
+            'template_checksum': template_checksum,
+            'context_hash': hash_context(context),
+            'library_version': library_version,
+        }
+
+    def is_up_to_date(self, output_path, fingerprint):
+        """
+        Check whether an output was generated from exactly these inputs.
+
+        Args:
+            output_path (str): Path of the output.
+            fingerprint (dict): Fingerprint of the current inputs.
+
+        Returns:
+            bool: True if the output exists and its recorded fingerprint matches.
+        """
+        return self.entries.get(self._key(output_path)) == fingerprint and os.path.exists(output_path)
+
+    def record(self, output_path, fingerprint):
+        """
+        Record the fingerprint of a freshly generated output.
+
+        Args:
+            output_path (str): Path of the output.
+            fingerprint (dict): Fingerprint of the inputs it was generated from.
+        """
+        self.entries[self._key(output_path)] = fingerprint
+        self.pending += 1
+
+    def find_stale(self, template_checksum, library_version, exclude=()):
+        """
+        Find recorded outputs whose template or library version has changed.
+
+        Contexts are not stored, so only the template closure and the library
+        version can be re-checked for outputs that were not part of a run.
+
+        Args:
+            template_checksum (callable): Returns the current checksum for a
+                                          template name, or None if it is gone.
+            library_version (str): Current version of code_gen_lib.
+            exclude (iterable): Output paths to leave out, e.g. those just handled.
+
+        Returns:
+            list: Output paths that are out of date, in manifest order.
+        """
+        excluded = {self._key(path) for path in exclude}
+        checksums = {}
+        stale = []
+        for output_path, entry in self.entries.items():
+            if output_path in excluded:
+                continue
+            template_name = entry.get('template')
+            if template_name not in checksums:
+                checksums[template_name] = template_checksum(template_name)
+            if (checksums[template_name] != entry.get('template_checksum')
+                    or entry.get('library_version') != library_version
+                    or not os.path.exists(output_path)):
+                stale.append(output_path)
+        return stale
+
+    @staticmethod
+    def _key(output_path):
+        return os.path.normpath(output_path)
@@ -0,0 +1,386 @@
+import hashlib
+import os
+import pickle
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from .exceptions import BatchGenerationError, OutputError, TemplateError
+from .template_manager import TemplateManager
+from ..utils.file_operations import BatchFileWriter
+
+EXECUTOR_BACKENDS = ('serial', 'thread', 'process')
+
+# Template managers built inside process-pool workers, keyed by worker spec id.
+# Each worker process compiles its Jinja environment once and reuses it for
+# every item it is handed.
+_WORKER_TEMPLATE_MANAGERS = {}
+# Output writer of the current worker process; directories are created once per worker.
+_worker_writer = None
+
+
+class GenerationResult:
+    """Outcome of a single item of a batch generation run."""
+
+    def __init__(self, index, template_name, output_path, error=None, duration=0.0, skipped=False,
+                 bytes_written=0, content=None, hook_times=None):
+        """
+        Initialize the GenerationResult.
+
+        Args:
+            index (int): Position of the item in the submitted batch.
+            template_name (str): Name of the template that was rendered.
+            output_path (str): Path the output was written to.
+            error (Exception, optional): Error raised while generating the item.
+            duration (float): Time spent on the item, in seconds.
+            skipped (bool): True if the output was up to date and left untouched.
+            bytes_written (int): Size of the written output, when known.
+            content (str, optional): Rendered output sent back by a process worker
+                                     when the parent writes to a non-file sink.
+            hook_times (dict, optional): Seconds spent in each post_render hook,
+                                         reported by process workers.
+        """
+        self.index = index
+        self.template_name = template_name
+        self.output_path = output_path
+        self.error = error
+        self.duration = duration
+        self.skipped = skipped
+        self.bytes_written = bytes_written
+        self.content = content
+        self.hook_times = hook_times
+
+    @property
+    def ok(self):
+        """bool: True if the item was handled without errors."""
+        return self.error is None
+
+    @property
+    def status(self):
+        """str: 'generated', 'skipped' or 'failed'."""
+        if self.error is not None:
+            return 'failed'
+        return 'skipped' if self.skipped else 'generated'
+
+    def __repr__(self):
+        status = self.status if self.ok else f'error={self.error!r}'
+        return f"GenerationResult({self.index}, {self.output_path!r}, {status})"
+
+
+class BatchResult:
+    """Ordered results and timing summary of a batch generation run."""
+
+    def __init__(self, results, backend='serial', workers=1, wall_time=0.0, stale=None, write_stats=None,
+                 hook_errors=None):
+        """
+        Initialize the BatchResult.
+
+        Args:
+            results (list): GenerationResult objects, in submission order.
+            backend (str): Name of the execution backend that was used.
+            workers (int): Number of workers the backend ran with.
+            wall_time (float): Elapsed time of the whole batch, in seconds.
+            stale (list, optional): Output paths recorded in the incremental
+                                    manifest that were not part of the batch but
+                                    are out of date.
+            write_stats (dict, optional): Statistics of the batch's output writer.
+            hook_errors (list, optional): (hook name, error) pairs of the batch
+                                          hooks that failed.
+        """
+        self.results = results
+        self.backend = backend
+        self.workers = workers
+        self.wall_time = wall_time
+        self.stale = stale or []
+        self.write_stats = write_stats or {}
+        self.hook_errors = hook_errors or []
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def succeeded(self):
+        """list: Results of the items that were generated successfully."""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def generated(self):
+        """list: Results of the items whose output was written."""
+        return [result for result in self.results if result.status == 'generated']
+
+    @property
+    def skipped(self):
+        """list: Results of the items skipped because their inputs were unchanged."""
+        return [result for result in self.results if result.status == 'skipped']
+
+    @property
+    def failed(self):
+        """list: Results of the items that raised an error."""
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def errors(self):
+        """list: (output_path, error) pairs for every failed item, then for every failed batch hook."""
+        return ([(result.output_path, result.error) for result in self.failed]
+                + [(f"batch hook '{name}'", error) for name, error in self.hook_errors])
+
+    def summary(self):
+        """
+        Summarize the timings of the batch.
+
+        Returns:
+            dict: Item counts, wall time, accumulated per-item time, throughput
+                  and the output writer statistics.
+        """
+        durations = [result.duration for result in self.results]
+        busy_time = sum(durations)
+        return {
+            **self.write_stats,
+            'backend': self.backend,
+            'workers': self.workers,
+            'total': len(self.results),
+            'succeeded': len(self.succeeded),
+            'generated': len(self.generated),
+            'skipped': len(self.skipped),
+            'failed': len(self.failed),
+            'stale': len(self.stale),
+            'hook_errors': len(self.hook_errors),
+            'wall_time': self.wall_time,
+            'busy_time': busy_time,
+            'mean_item_time': busy_time / len(durations) if durations else 0.0,
+            'max_item_time': max(durations) if durations else 0.0,
+            'items_per_second': len(durations) / self.wall_time if self.wall_time else 0.0,
+        }
+
+    def raise_for_errors(self):
+        """
+        Raise if any item or batch hook of the batch failed.
+
+        Raises:
+            BatchGenerationError: If at least one item or batch hook failed.
+        """
+        if self.failed or self.hook_errors:
+            raise BatchGenerationError(self.errors)
+
+
+def resolve_executor(executor=None, workers=None):
+    """
+    Work out which backend and worker count a batch should run with.
+
+    Args:
+        executor: 'serial', 'thread', 'process', a concurrent.futures.Executor
+                  instance, or None to pick a backend from ``workers``.
+        workers (int, optional): Number of workers. Defaults to os.cpu_count()
+                                 when a pool backend is requested.
+
+    Returns:
+        tuple: (backend name, worker count, executor instance or None).
+
+    Raises:
+        ValueError: If the backend name or worker count is invalid.
+    """
+    if isinstance(executor, BoundedExecutor):
+        return executor.backend, workers or executor.workers, executor
+    if isinstance(executor, Executor):
+        backend = 'process' if isinstance(executor, ProcessPoolExecutor) else 'thread'
+        return backend, workers or getattr(executor, '_max_workers', 1), executor
+
+    if executor is None:
+        executor = 'thread' if workers and workers > 1 else 'serial'
+    if executor not in EXECUTOR_BACKENDS:
+        raise ValueError(f"Invalid executor '{executor}'. Choose from {EXECUTOR_BACKENDS}")
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be a positive integer")
+
+    if executor == 'serial':
+        return executor, 1, None
+    return executor, workers or os.cpu_count() or 1, None
+
+
+def create_executor(backend, workers):
+    """
+    Create a pool executor for the given backend.
+
+    Args:
+        backend (str): 'thread' or 'process'.
+        workers (int): Number of workers in the pool.
+
+    Returns:
+        concurrent.futures.Executor: The new executor.
+    """
+    if backend == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+class BoundedExecutor(Executor):
+    """
+    View of a shared pool that keeps at most ``limit`` of its tasks in the pool.
+
+    ``map()`` submits the next item only when an earlier one has finished, so a
+    large batch cannot fill the shared pool's queue ahead of other callers.
+    With a ``chunksize`` above 1, items are submitted in chunks of that size,
+    and the limit counts chunks. Results are still returned in submission order.
+    """
+
+    def __init__(self, pool, limit):
+        """
+        Initialize the BoundedExecutor.
+
+        Args:
+            pool (concurrent.futures.Executor): The shared thread or process pool.
+            limit (int): Maximum number of tasks submitted through this view at once.
+        """
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        self.pool = pool
+        self.limit = limit
+        self.backend = 'process' if isinstance(pool, ProcessPoolExecutor) else 'thread'
+        self.workers = min(limit, getattr(pool, '_max_workers', limit))
+
+    def submit(self, fn, *args, **kwargs):
+        return self.pool.submit(fn, *args, **kwargs)
+
+    def map(self, fn, *iterables, timeout=None, chunksize=1):
+        items = zip(*iterables)
+        if chunksize <= 1:
+            return self._map(fn, items, timeout)
+        chunks = iter(lambda: (tuple(islice(items, chunksize)),), ((),))
+        return (result for results in self._map(partial(_apply_chunk, fn), chunks, timeout)
+                for result in results)
+
+    def _map(self, fn, items, timeout):
+        futures = deque()
+        try:
+            for args in items:
+                if len(futures) >= self.limit:
+                    yield futures.popleft().result(timeout)
+                futures.append(self.pool.submit(fn, *args))
+            while futures:
+                yield futures.popleft().result(timeout)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def shutdown(self, wait=True, **kwargs):
+        """The shared pool is owned by its creator and is left running."""
+
+
+def _apply_chunk(fn, chunk):
+    return [fn(*args) for args in chunk]
+
+
+def worker_spec(template_manager):
+    """
+    Describe a TemplateManager so that process workers can rebuild it.
+
+    The spec carries an id computed here from its pickled content, so that
+    workers can look up the manager they built for it without pickling it again
+    for every item.
+
+    Args:
+        template_manager (TemplateManager): The manager used by the parent process.
+
+    Returns:
+        tuple: (spec id, (template_dirs, bytecode cache, render cache limits,
+                custom filters, custom globals, template bundle, render budget)).
+    """
+    template_dirs = template_manager.template_dirs
+    if template_dirs is not None and not isinstance(template_dirs, str):
+        template_dirs = tuple(template_dirs)
+    render_cache = template_manager.render_cache
+    description = (
+        template_dirs,
+        template_manager.bytecode_cache,
+        (render_cache.max_entries, render_cache.max_bytes) if render_cache is not None else None,
+        tuple(template_manager.custom_filters.items()),
+        tuple(template_manager.custom_globals.items()),
+        template_manager.bundle,
+        template_manager.render_budget,
+    )
+    # Custom globals may be unhashable, so the id is taken from the pickled description.
+    return hashlib.sha256(pickle.dumps(description)).hexdigest(), description
+
+
+def _worker_template_manager(spec):
+    key, description = spec
+    template_manager = _WORKER_TEMPLATE_MANAGERS.get(key)
+    if template_manager is None:
+        template_dirs, bytecode_cache, render_cache_limits, filters, globals_, bundle, render_budget = description
+        if template_dirs is not None and not isinstance(template_dirs, str):
+            template_dirs = list(template_dirs)
+        template_manager = TemplateManager(template_dirs, bytecode_cache, bundle=bundle)
+        if render_cache_limits is not None:
+            template_manager.enable_render_cache(*render_cache_limits)
+        template_manager.set_render_budget(render_budget)
+        for name, filter_func in filters:
+            template_manager.add_filter(name, filter_func)
+        for name, value in globals_:
+            template_manager.add_global(name, value)
+        _WORKER_TEMPLATE_MANAGERS[key] = template_manager
+    return template_manager
+
+
+def _portable_error(error):
+    # Errors travel back to the parent process, so they have to survive pickling.
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return TemplateError(f"{type(error).__name__}: {error}")
+
+
+def generate_in_worker(spec, item, hooks=None):
+    """
+    Render and write one item inside a process-pool worker.
+
+    Args:
+        spec (tuple): Worker spec produced by worker_spec().
+        item (tuple): (index, template_name, output_path, context, buffer_size,
+                      return_content), where context is already merged with the
+                      template-specific config, buffer_size is None unless the
+                      output is streamed, and return_content asks for the output
+                      to be returned instead of written.
+        hooks (HookPipeline, optional): Hooks whose post_render stage is applied
+                                        to the output before it is written.
+
+    Returns:
+        GenerationResult: The outcome of the item. Errors are captured, not raised.
+    """
+    global _worker_writer
+    if _worker_writer is None:
+        _worker_writer = BatchFileWriter()
+
+    index, template_name, output_path, context, buffer_size, return_content = item
+    start = time.perf_counter()
+    error = None
+    written = 0
+    content = None
+    hook_times = None
+    try:
+        template_manager = _worker_template_manager(spec)
+        post_render = hooks is not None and hooks.has('post_render', output_path)
+        if return_content or post_render:
+            content = template_manager.render_template(template_name, context)
+            if post_render:
+                content, hook_times = hooks.apply_post_render(content, output_path)
+            if not return_content:
+                written = _worker_writer.write(output_path, content)
+                content = None
+        elif buffer_size is not None:
+            _worker_writer.buffer_size = buffer_size
+            written = _worker_writer.write_chunks(
+                output_path, template_manager.stream_template(template_name, context))
+        else:
+            written = _worker_writer.write(output_path, template_manager.render_template(template_name, context))
+    except OSError as e:
+        # Reported like CodeGenerator._generate() reports write errors.
+        error = OutputError(f"Error writing to output file '{output_path}': {str(e)}")
+    except Exception as e:
+        error = _portable_error(e)
+    return GenerationResult(index, template_name, output_path, error, time.perf_counter() - start,
+                            bytes_written=written, content=content, hook_times=hook_times)
@@ -0,0 +1,154 @@
+import json
+import sys
+import threading
+from collections import OrderedDict
+from ..utils.hashing import hash_text
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Value types whose rendering is fully determined by their JSON form.
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+class _Unfingerprintable(Exception):
+    pass
+
+
+def _canonical(value):
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return value
+    if value_type is list or value_type is tuple:
+        # Lists and tuples render differently ('[1]' vs '(1,)'), so they are tagged.
+        return ['L' if value_type is list else 'T', [_canonical(item) for item in value]]
+    if isinstance(value, dict) and value_type.__repr__ is dict.__repr__:
+        if not all(type(key) is str for key in value):
+            raise _Unfingerprintable()
+        return ['D', {key: _canonical(item) for key, item in value.items()}]
+    # Callables, custom objects, sets and anything else whose rendering cannot be
+    # derived from a stable representation.
+    raise _Unfingerprintable()
+
+
+def context_fingerprint(context):
+    """
+    Compute a stable fingerprint of a template context for render caching.
+
+    Only plain data (strings, numbers, booleans, None, lists, tuples and dicts
+    with string keys) can be fingerprinted. Contexts holding callables or other
+    objects get no fingerprint, because equal-looking objects may render
+    differently.
+
+    Args:
+        context (dict): The template context.
+
+    Returns:
+        str: The fingerprint, or None if the context cannot be fingerprinted.
+    """
+    try:
+        canonical = _canonical(context)
+    except (_Unfingerprintable, RecursionError):
+        return None
+    return hash_text(json.dumps(canonical, sort_keys=True, separators=(',', ':')))
+
+
+class RenderCache:
+    """
+    Thread-safe LRU cache of rendered template output.
+
+    The cache is bounded both by number of entries and by the approximate memory
+    used by the cached strings. Hits, misses and bypasses (contexts that could
+    not be fingerprinted) are counted.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the RenderCache.
+
+        Args:
+            max_entries (int): Maximum number of cached renders.
+            max_bytes (int): Maximum approximate memory used by cached output.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Look up a cached render and mark it as recently used.
+
+        Args:
+            key (tuple): The cache key.
+
+        Returns:
+            str: The cached output, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, output):
+        """
+        Store a render, evicting the least recently used entries over the caps.
+
+        Outputs larger than max_bytes on their own are not cached.
+
+        Args:
+            key (tuple): The cache key.
+            output (str): The rendered output.
+        """
+        size = sys.getsizeof(output)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[1]
+            self._entries[key] = (output, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def record_bypass(self):
+        """Count a render that skipped the cache."""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        """Remove every cached render. Counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Report the cache counters.
+
+        Returns:
+            dict: Entries, memory used, hits, misses, bypasses and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self):
+        return len(self._entries)
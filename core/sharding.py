@@ -0,0 +1,403 @@
+import hashlib
+import heapq
+import json
+import os
+import tempfile
+from .exceptions import ShardingError
+from ..utils.hashing import hash_context, hash_text
+
+SHARD_RESULT_FORMAT_VERSION = 1
+BALANCE_STRATEGIES = ('hash', 'cost')
+
+# Relative cost of templates missing from the cost table, when the table is empty.
+DEFAULT_TEMPLATE_COST = 1.0
+
+
+def shard_key(output_path, root=None):
+    """
+    Get the key an output is sharded by.
+
+    The key is the normalized output path, relative to ``root`` when given and
+    with '/' separators, so every node computes the same key for an output
+    wherever its checkout lives.
+
+    Args:
+        output_path (str): Path of the output.
+        root (str, optional): Directory output paths are made relative to.
+
+    Returns:
+        str: The shard key.
+    """
+    if root is not None:
+        output_path = os.path.relpath(os.path.abspath(output_path), os.path.abspath(root))
+    return os.path.normpath(output_path).replace(os.sep, '/')
+
+
+def manifest_digest(outputs, root=None):
+    """
+    Compute a digest of a list of generation items.
+
+    Shards of the same manifest carry the same digest, which lets the merge step
+    reject results produced from different manifests.
+
+    Args:
+        outputs (list): generate_multiple() items.
+        root (str, optional): Directory output paths are made relative to.
+
+    Returns:
+        str: The hex-encoded digest.
+    """
+    return hash_context([[item['template_name'], shard_key(item['output_path'], root), item.get('context', {})]
+                         for item in outputs])
+
+
+def template_costs(stats):
+    """
+    Derive per-template costs from the figures of an instrumented run.
+
+    Args:
+        stats (GenerationStats or dict): Instrumentation of a previous run, or
+            the 'template_costs' of a merged shard result.
+
+    Returns:
+        dict: Mean seconds per output of each template.
+    """
+    if isinstance(stats, dict):
+        return dict(stats)
+    costs = {}
+    for template_name, totals in stats.summary()['templates'].items():
+        if totals['outputs']:
+            costs[template_name] = sum(totals['phases'].values()) / totals['outputs']
+    return costs
+
+
+class ShardPlan:
+    """
+    Deterministic assignment of generation items to shards.
+
+    With the 'hash' strategy an item goes to the shard given by a stable hash
+    of its output path. With the 'cost' strategy items are balanced by the
+    expected cost of their templates: the most expensive outputs are placed
+    first, each on the least loaded shard. Ties are broken by output path, so
+    every node that plans the same manifest with the same costs gets the same
+    plan. Items writing the same output path always land on the same shard.
+    """
+
+    def __init__(self, outputs, shard_count, balance='hash', costs=None, root=None):
+        """
+        Initialize the ShardPlan.
+
+        Args:
+            outputs (list): generate_multiple() items.
+            shard_count (int): Number of shards.
+            balance (str): 'hash' or 'cost'.
+            costs (dict, optional): Relative cost per template name, used by the
+                'cost' strategy. Unknown templates cost the mean of the known ones.
+            root (str, optional): Directory output paths are made relative to.
+
+        Raises:
+            ValueError: If the shard count or strategy is invalid.
+        """
+        if not isinstance(shard_count, int) or shard_count < 1:
+            raise ValueError("shard_count must be a positive integer")
+        if balance not in BALANCE_STRATEGIES:
+            raise ValueError(f"Invalid balance strategy '{balance}'. Choose from {BALANCE_STRATEGIES}")
+        self.shard_count = shard_count
+        self.balance = balance
+        self.root = root
+        self.total = len(outputs)
+        self.digest = manifest_digest(outputs, root)
+
+        groups = {}
+        for index, item in enumerate(outputs):
+            groups.setdefault(shard_key(item['output_path'], root), []).append(index)
+        self.conflicts = _find_conflicts(outputs, groups)
+
+        assignment = [[] for _ in range(shard_count)]
+        self.loads = [0.0] * shard_count
+        if balance == 'hash':
+            for key, indices in groups.items():
+                shard = int(hash_text(key)[:16], 16) % shard_count
+                assignment[shard].extend(indices)
+                self.loads[shard] += len(indices)
+        else:
+            costs = costs or {}
+            default_cost = sum(costs.values()) / len(costs) if costs else DEFAULT_TEMPLATE_COST
+            weighted = sorted(
+                ((sum(costs.get(outputs[index]['template_name'], default_cost) for index in indices), key, indices)
+                 for key, indices in groups.items()),
+                key=lambda group: (-group[0], group[1]))
+            heap = [(0.0, shard) for shard in range(shard_count)]
+            for cost, _, indices in weighted:
+                load, shard = heapq.heappop(heap)
+                assignment[shard].extend(indices)
+                heapq.heappush(heap, (load + cost, shard))
+            for load, shard in heap:
+                self.loads[shard] = load
+        self.shards = [tuple(sorted(indices)) for indices in assignment]
+
+    def items(self, outputs, shard_index):
+        """
+        Get the items of one shard.
+
+        Args:
+            outputs (list): The items the plan was made from.
+            shard_index (int): Index of the shard, from 0.
+
+        Returns:
+            list: (index in the manifest, item) pairs, in manifest order.
+
+        Raises:
+            ValueError: If the shard index is out of range.
+        """
+        if not 0 <= shard_index < self.shard_count:
+            raise ValueError(f"shard_index must be between 0 and {self.shard_count - 1}")
+        return [(index, outputs[index]) for index in self.shards[shard_index]]
+
+
+def _find_conflicts(outputs, groups):
+    # Several items may name the same output; they conflict unless they would
+    # produce the same file from the same template and context.
+    conflicts = []
+    for key, indices in groups.items():
+        if len(indices) > 1:
+            inputs = {(outputs[index]['template_name'], hash_context(outputs[index].get('context', {})))
+                      for index in indices}
+            if len(inputs) > 1:
+                conflicts.append({'output_path': key, 'indices': list(indices)})
+    return sorted(conflicts, key=lambda conflict: conflict['output_path'])
+
+
+def plan_shards(outputs, shard_count, balance='hash', costs=None, root=None):
+    """
+    Assign generation items to shards.
+
+    Args:
+        outputs (list): generate_multiple() items.
+        shard_count (int): Number of shards.
+        balance (str): 'hash' or 'cost'; see ShardPlan.
+        costs (dict, optional): Relative cost per template name.
+        root (str, optional): Directory output paths are made relative to.
+
+    Returns:
+        ShardPlan: The plan.
+    """
+    return ShardPlan(outputs, shard_count, balance, costs, root)
+
+
+def generate_shard(generator, outputs, shard_index, shard_count, result_path=None, balance='hash', costs=None,
+                   root=None, workers=None, executor=None):
+    """
+    Generate one shard of a manifest and record its result.
+
+    Every shard plans the whole manifest and generates only its own items, so
+    shards can run in separate processes or on separate machines. Items that
+    conflict with another item writing the same output path are not generated
+    and are reported as failed, on whichever shard they land.
+
+    Args:
+        generator (CodeGenerator): The generator to run the shard with.
+        outputs (list): generate_multiple() items of the whole manifest.
+        shard_index (int): Index of this shard, from 0.
+        shard_count (int): Number of shards.
+        result_path (str, optional): File the shard result is written to, as JSON.
+        balance (str): 'hash' or 'cost'; every shard must use the same strategy.
+        costs (dict, optional): Relative cost per template name, for 'cost'.
+        root (str, optional): Directory output paths are recorded relative to.
+        workers (int, optional): As for generate_multiple().
+        executor (optional): As for generate_multiple().
+
+    Returns:
+        dict: The shard result; see merge_shard_results().
+    """
+    plan = plan_shards(outputs, shard_count, balance, costs, root)
+    conflicting = {index for conflict in plan.conflicts for index in conflict['indices']}
+    items = plan.items(outputs, shard_index)
+    runnable = [(index, item) for index, item in items if index not in conflicting]
+    batch = generator.generate_multiple([item for _, item in runnable], workers=workers, executor=executor)
+
+    results = {index: result for (index, _), result in zip(runnable, batch.results)}
+    records = []
+    for index, item in items:
+        result = results.get(index)
+        record = {
+            'index': index,
+            'template_name': item['template_name'],
+            'output_path': shard_key(item['output_path'], root),
+            'context_hash': hash_context(item.get('context', {})),
+            'status': 'failed',
+            'error': f"Conflicting output: {shard_key(item['output_path'], root)} is written by several items",
+            'content_hash': None,
+            'duration': 0.0,
+        }
+        if result is not None:
+            record.update(status=result.status, duration=result.duration,
+                          error=str(result.error) if result.error is not None else None)
+            if result.error is None:
+                record['content_hash'] = _file_hash(item['output_path'])
+        records.append(record)
+
+    shard_result = {
+        'format_version': SHARD_RESULT_FORMAT_VERSION,
+        'digest': plan.digest,
+        'total': plan.total,
+        'shard_index': shard_index,
+        'shard_count': shard_count,
+        'balance': balance,
+        'conflicts': plan.conflicts,
+        'hook_errors': [{'hook': name, 'error': str(error)} for name, error in batch.hook_errors],
+        'wall_time': batch.wall_time,
+        'outputs': records,
+    }
+    if result_path is not None:
+        _write_json(result_path, shard_result)
+    return shard_result
+
+
+def _file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def load_shard_result(path):
+    """
+    Load a shard result written by generate_shard().
+
+    Args:
+        path (str): Path of the result file.
+
+    Returns:
+        dict: The shard result.
+
+    Raises:
+        ShardingError: If the file cannot be read or has another format version.
+    """
+    try:
+        with open(path, 'r') as f:
+            shard_result = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ShardingError(f"Cannot read shard result {path}: {e}")
+    if not isinstance(shard_result, dict) or shard_result.get('format_version') != SHARD_RESULT_FORMAT_VERSION:
+        raise ShardingError(f"Shard result {path} has an unsupported format")
+    return shard_result
+
+
+def merge_shard_results(shard_results, target=None):
+    """
+    Combine the results of every shard of a manifest.
+
+    The merge checks that all results come from the same manifest and shard
+    count, that every shard is present once and that every item of the manifest
+    was handled exactly once. Outputs written by several items with different
+    inputs or contents are reported as conflicts.
+
+    Apart from 'shards', which holds per-shard timings, batch hook errors and
+    the template costs observed, the merged result does not depend on how many shards were used or
+    how items were balanced.
+
+    Args:
+        shard_results (list): Shard result dicts, or paths of shard result files.
+        target (str, optional): File the merged result is written to, as JSON.
+
+    Returns:
+        dict: 'ok', 'digest', 'total', 'summary', 'conflicts', 'outputs' (one
+              entry per item, in manifest order) and 'shards'.
+
+    Raises:
+        ShardingError: If shards are missing, duplicated or from different
+            manifests, or if items are missing or handled more than once.
+    """
+    shard_results = [load_shard_result(result) if isinstance(result, str) else result
+                     for result in shard_results]
+    if not shard_results:
+        raise ShardingError("No shard results to merge")
+    first = shard_results[0]
+    for shard_result in shard_results:
+        for field in ('digest', 'total', 'shard_count'):
+            if shard_result[field] != first[field]:
+                raise ShardingError(f"Shard results disagree on '{field}': "
+                                    f"{shard_result[field]!r} != {first[field]!r}")
+
+    shard_indices = sorted(shard_result['shard_index'] for shard_result in shard_results)
+    missing_shards = sorted(set(range(first['shard_count'])) - set(shard_indices))
+    duplicate_shards = sorted({index for index in shard_indices if shard_indices.count(index) > 1})
+    if missing_shards or duplicate_shards:
+        raise ShardingError(f"Incomplete shard results: missing shards {missing_shards}, "
+                            f"duplicate shards {duplicate_shards}")
+
+    records = {}
+    duplicate_items = set()
+    for shard_result in shard_results:
+        for record in shard_result['outputs']:
+            if record['index'] in records:
+                duplicate_items.add(record['index'])
+            records[record['index']] = record
+    missing_items = sorted(set(range(first['total'])) - set(records))
+    if missing_items or duplicate_items:
+        raise ShardingError(f"Shards do not cover the manifest exactly once: "
+                            f"{len(missing_items)} item(s) missing {missing_items[:10]}, "
+                            f"{len(duplicate_items)} item(s) handled more than once {sorted(duplicate_items)[:10]}")
+
+    outputs = []
+    costs = {}
+    by_path = {}
+    for index in range(first['total']):
+        record = dict(records[index])
+        duration = record.pop('duration', 0.0)
+        if record['status'] == 'generated':
+            cost = costs.setdefault(record['template_name'], [0.0, 0])
+            cost[0] += duration
+            cost[1] += 1
+        by_path.setdefault(record['output_path'], []).append(record)
+        outputs.append(record)
+
+    conflicts = {conflict['output_path']: conflict for shard_result in shard_results
+                 for conflict in shard_result['conflicts']}
+    for output_path, path_records in by_path.items():
+        signatures = {(record['template_name'], record['context_hash'], record['content_hash'])
+                      for record in path_records}
+        if len(signatures) > 1 and output_path not in conflicts:
+            conflicts[output_path] = {'output_path': output_path,
+                                      'indices': [record['index'] for record in path_records]}
+
+    summary = {status: sum(record['status'] == status for record in outputs)
+               for status in ('generated', 'skipped', 'failed')}
+    hook_errors = [dict(hook_error, shard_index=shard_result['shard_index'])
+                   for shard_result in shard_results for hook_error in shard_result.get('hook_errors', [])]
+    merged = {
+        'ok': not summary['failed'] and not conflicts and not hook_errors,
+        'digest': first['digest'],
+        'total': first['total'],
+        'summary': summary,
+        'conflicts': [conflicts[output_path] for output_path in sorted(conflicts)],
+        'outputs': outputs,
+        'shards': {
+            'count': first['shard_count'],
+            'balance': first.get('balance'),
+            'results': [{'shard_index': shard_result['shard_index'], 'outputs': len(shard_result['outputs']),
+                         'wall_time': shard_result['wall_time']}
+                        for shard_result in sorted(shard_results, key=lambda result: result['shard_index'])],
+            'template_costs': {name: total / count for name, (total, count) in sorted(costs.items())},
+            'hook_errors': hook_errors,
+        },
+    }
+    if target is not None:
+        _write_json(target, merged)
+    return merged
+
+
+def _write_json(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
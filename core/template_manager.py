@@ -1,27 +1,63 @@
 
 import os
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-from .exceptions import TemplateError
+import weakref
+from jinja2 import TemplateNotFound, meta
+from .environment_registry import create_environment, environment_registry
+from .exceptions import RenderBudgetExceeded, TemplateError
+from .validation import analyze_template
+from .render_cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, RenderCache, context_fingerprint
+from ..utils.file_operations import DEFAULT_BUFFER_SIZE, write_chunks
+from ..templates.index import TemplateIndex
+from ..utils.hashing import hash_text
 
 class TemplateManager:
-    def __init__(self, template_dirs=None):
+    def __init__(self, template_dirs=None, bytecode_cache=None, enable_async=False, shared_environment=True,
+                 bundle=None):
         """
         Initialize the TemplateManager.
 
         Args:
             template_dirs (list): List of directories to search for templates.
                                   If None, uses the default 'templates' directory.
+            bytecode_cache (jinja2.BytecodeCache, optional): Cache for compiled
+                                  templates, e.g. a PersistentBytecodeCache.
+            enable_async (bool): Compile templates for asynchronous rendering with
+                                  render_template_async().
+            shared_environment (bool): Use the process-wide environment for these
+                                  directories and options, sharing compiled
+                                  templates with other managers. The manager
+                                  switches to a private environment the first
+                                  time a filter or global is added.
+            bundle (TemplateBundle, optional): Precompiled templates built with
+                                  build_bundle(), loaded without parsing their
+                                  sources. Templates missing from the bundle or
+                                  edited since it was built load from source.
+
+        Raises:
+            TemplateError: If the bundle cannot be used with these options.
         """
         if template_dirs is None:
             # Use the default 'templates' directory relative to this file
             template_dirs = [os.path.join(os.path.dirname(__file__), '..', 'templates')]
-        
-        self.env = Environment(
-            loader=FileSystemLoader(template_dirs),
-            autoescape=False,
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+
+        self.template_dirs = template_dirs
+        self.bytecode_cache = bytecode_cache
+        self.bundle = bundle
+        self.custom_filters = {}
+        self.custom_globals = {}
+        self.render_cache = None
+        self.render_budget = None
+        # Per compiled template: (source checksum, referenced template names).
+        self._template_info = weakref.WeakKeyDictionary()
+        # Per compiled template: the TemplateVariables of its syntax tree.
+        self._template_variables = weakref.WeakKeyDictionary()
+        self.enable_async = enable_async
+        if shared_environment:
+            self.env = environment_registry.get_environment(template_dirs, bytecode_cache, enable_async, bundle)
+        else:
+            self.env = create_environment(template_dirs, bytecode_cache, enable_async, bundle)
+        self.shared_environment = shared_environment
+        self.index = TemplateIndex(template_dirs, environment=self.env)
 
     def get_template(self, template_name):
         """
@@ -41,26 +77,382 @@ class TemplateManager:
         except TemplateNotFound:
             raise TemplateError(f"Template not found: {template_name}")
 
-    def render_template(self, template_name, context):
+    def get_template_source(self, template_name):
+        """
+        Get the source code of a template.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            str: The template source.
+
+        Raises:
+            TemplateError: If the template is not found.
+        """
+        try:
+            source, _, _ = self.env.loader.get_source(self.env, template_name)
+        except TemplateNotFound:
+            raise TemplateError(f"Template not found: {template_name}")
+        return source
+
+    def get_template_dependencies(self, template_name):
+        """
+        Get the templates a template includes, extends or imports.
+
+        Only references with a constant name can be resolved; dynamic ones are
+        ignored.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            list: Names of the directly referenced templates.
+
+        Raises:
+            TemplateError: If the template is not found or cannot be parsed.
+        """
+        source = self.get_template_source(template_name)
+        try:
+            ast = self.env.parse(source, template_name)
+        except Exception as e:
+            raise TemplateError(f"Error parsing template {template_name}: {str(e)}")
+        return [name for name in meta.find_referenced_templates(ast) if name is not None]
+
+    def get_template_variables(self, template_name):
+        """
+        Get the context variables a template reads.
+
+        The template is parsed once; the result is cached until the compiled
+        template is reloaded.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            TemplateVariables: Its required and optional variables, and the
+                templates it includes or extends.
+
+        Raises:
+            TemplateError: If the template is not found or cannot be parsed.
+        """
+        try:
+            template = self.get_template(template_name)
+            variables = self._template_variables.get(template)
+            if variables is None:
+                ast = self.env.parse(self.get_template_source(template_name), template_name)
+        except TemplateError:
+            raise
+        except Exception as e:
+            raise TemplateError(f"Error parsing template {template_name}: {str(e)}")
+        if variables is None:
+            variables = self._template_variables[template] = analyze_template(ast)
+        return variables
+
+    def get_template_checksum(self, template_name, _seen=None):
+        """
+        Compute a checksum over a template and everything it references.
+
+        The checksum covers the template source and, recursively, the sources of
+        the templates it includes, extends or imports, so a change to a shared
+        macro file changes the checksum of every template that uses it.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            str: Hex-encoded checksum of the template closure.
+
+        Raises:
+            TemplateError: If the template or one of its dependencies is not found.
+        """
+        seen = set() if _seen is None else _seen
+        seen.add(template_name)
+        parts = [template_name, hash_text(self.get_template_source(template_name))]
+        for dependency in sorted(set(self.get_template_dependencies(template_name))):
+            if dependency not in seen:
+                parts.append(self.get_template_checksum(dependency, seen))
+        return hash_text('\n'.join(parts))
+
+    def render_template(self, template_name, context, budget=None):
         """
         Render a template with the given context.
 
         Args:
             template_name (str): Name of the template to render.
             context (dict): Context data to use in rendering.
+            budget (RenderBudget, optional): Limits for this render. Defaults to
+                                             the budget set with set_render_budget().
+
+        Returns:
+            str: The rendered template as a string.
+
+        Raises:
+            TemplateError: If there's an error during template rendering.
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        return self.render_with_stats(template_name, context, budget)[0]
+
+    def render_with_stats(self, template_name, context, budget=None):
+        """
+        Render a template and report whether the output came from the render cache.
+
+        Args:
+            template_name (str): Name of the template to render.
+            context (dict): Context data to use in rendering.
+            budget (RenderBudget, optional): Limits for this render. Defaults to
+                                             the budget set with set_render_budget().
+
+        Returns:
+            tuple: (rendered output, True if it was served from the render cache).
+
+        Raises:
+            TemplateError: If there's an error during template rendering.
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        template = self.get_template(template_name)
+        if budget is None:
+            budget = self.render_budget
+        cache_key = None
+        if self.render_cache is not None:
+            cache_key = self._render_cache_key(template_name, template, context)
+            if cache_key is None:
+                self.render_cache.record_bypass()
+            else:
+                cached = self.render_cache.get(cache_key)
+                if cached is not None:
+                    return cached, True
+        try:
+            if budget is None:
+                rendered = template.render(context)
+            else:
+                rendered = budget.track(template_name).render(template.generate(context))
+        except RenderBudgetExceeded:
+            raise
+        except Exception as e:
+            raise TemplateError(f"Error rendering template {template_name}: {str(e)}")
+        if cache_key is not None:
+            self.render_cache.put(cache_key, rendered)
+        return rendered, False
+
+    def get_renderer(self, template_name, shared_context=None):
+        """
+        Bind a template for rendering many contexts.
+
+        The compiled template is looked up once; the returned function lays each
+        context over ``shared_context`` and renders it directly, without the
+        per-call lookup and render cache bookkeeping of render_template(). The
+        render budget in effect when the renderer is created applies to every
+        render.
+
+        Args:
+            template_name (str): Name of the template to render.
+            shared_context (dict, optional): Values common to every render;
+                                             per-call contexts take precedence.
+
+        Returns:
+            callable: Function taking a context dict and returning the rendered
+                      string. It raises TemplateError if rendering fails, and
+                      RenderBudgetExceeded if a render exceeds its budget.
+
+        Raises:
+            TemplateError: If the template is not found.
+        """
+        template = self.get_template(template_name)
+        shared_context = dict(shared_context or {})
+        # Template.render() minus its argument handling; new_context() copies
+        # the variables, so contexts are passed through untouched.
+        new_context = template.new_context
+        render_func = template.root_render_func
+        concat = self.env.concat
+        budget = self.render_budget
+
+        def render(context):
+            variables = {**shared_context, **context} if shared_context else context
+            try:
+                if budget is None:
+                    return concat(render_func(new_context(variables)))
+                return budget.track(template_name).render(template.generate(variables))
+            except RenderBudgetExceeded:
+                raise
+            except Exception as e:
+                raise TemplateError(f"Error rendering template {template_name}: {str(e)}")
+        return render
+
+    def render_many(self, template_name, contexts, shared_context=None):
+        """
+        Render one template once per context.
+
+        Args:
+            template_name (str): Name of the template to render.
+            contexts (iterable): Context dictionaries, consumed lazily.
+            shared_context (dict, optional): Values common to every render;
+                                             per-item contexts take precedence.
+
+        Yields:
+            tuple: (context, output) for each context, in order.
+
+        Raises:
+            TemplateError: If the template is not found, or if rendering a
+                           context fails.
+        """
+        render = self.get_renderer(template_name, shared_context)
+        for context in contexts:
+            yield context, render(context)
+
+    def set_render_budget(self, budget):
+        """
+        Limit every render of this manager.
+
+        Renders served from the render cache do not count against the budget.
+
+        Args:
+            budget (RenderBudget): The limits, or None to remove them.
+        """
+        self.render_budget = budget
+
+    def enable_render_cache(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Memoize render_template() results.
+
+        Renders are keyed by template name, the checksum of the template and
+        everything it includes, extends or imports, and a stable hash of the
+        context. Contexts holding callables or other non-plain data bypass the
+        cache, as does every render while a callable custom global is registered.
+
+        Args:
+            max_entries (int): Maximum number of cached renders.
+            max_bytes (int): Maximum approximate memory used by cached output.
+
+        Returns:
+            RenderCache: The cache, exposing hit/miss counters through stats().
+        """
+        self.render_cache = RenderCache(max_entries, max_bytes)
+        return self.render_cache
+
+    def disable_render_cache(self):
+        """Stop memoizing render_template() results and drop the cache."""
+        self.render_cache = None
+
+    def _render_cache_key(self, template_name, template, context):
+        if any(callable(value) for value in self.custom_globals.values()):
+            return None
+        fingerprint = context_fingerprint(context)
+        if fingerprint is None:
+            return None
+        try:
+            checksum = self._closure_checksum(template, set())
+        except Exception:
+            return None
+        return (template_name, checksum, fingerprint)
+
+    def _closure_checksum(self, template, seen):
+        # Checksums and dependencies are computed once per compiled template
+        # object; Jinja hands out a new object when a source file changes, and
+        # dependencies are re-fetched so that edited includes are noticed.
+        info = self._template_info.get(template)
+        if info is None:
+            info = (hash_text(self.get_template_source(template.name)),
+                    sorted(set(self.get_template_dependencies(template.name))))
+            self._template_info[template] = info
+        seen.add(template.name)
+        parts = [info[0]]
+        for dependency in info[1]:
+            if dependency not in seen:
+                parts.append(self._closure_checksum(self.get_template(dependency), seen))
+        return hash_text('\n'.join(parts)) if len(parts) > 1 else parts[0]
+
+    async def render_template_async(self, template_name, context, budget=None, template=None):
+        """
+        Render a template with the given context without blocking the event loop.
+
+        Requires a TemplateManager created with enable_async=True.
+
+        Args:
+            template_name (str): Name of the template to render.
+            context (dict): Context data to use in rendering.
+            budget (RenderBudget, optional): Limits for this render. Defaults to
+                                             the budget set with set_render_budget().
+            template (jinja2.Template, optional): The template, if it was already
+                                             looked up, e.g. in an executor.
 
         Returns:
             str: The rendered template as a string.
 
         Raises:
             TemplateError: If there's an error during template rendering.
+            RenderBudgetExceeded: If the render exceeds its budget.
+        """
+        if template is None:
+            template = self.get_template(template_name)
+        if budget is None:
+            budget = self.render_budget
+        try:
+            if budget is None:
+                return await template.render_async(context)
+            tracker = budget.track(template_name)
+            return self.env.concat([chunk async for chunk in tracker.generate_async(template.generate_async(context))])
+        except RenderBudgetExceeded:
+            raise
+        except Exception as e:
+            raise TemplateError(f"Error rendering template {template_name}: {str(e)}")
+
+    def stream_template(self, template_name, context, budget=None):
+        """
+        Render a template incrementally.
+
+        Args:
+            template_name (str): Name of the template to render.
+            context (dict): Context data to use in rendering.
+            budget (RenderBudget, optional): Limits for this render, enforced as
+                                             chunks are produced. Defaults to the
+                                             budget set with set_render_budget().
+
+        Returns:
+            iterator: The rendered output, as a sequence of string chunks.
+
+        Raises:
+            TemplateError: If the template is not found, or while iterating if
+                           there's an error during rendering.
+            RenderBudgetExceeded: While iterating, if the render exceeds its budget.
         """
         template = self.get_template(template_name)
+        if budget is None:
+            budget = self.render_budget
+        return self._generate_chunks(template, template_name, context, budget)
+
+    def _generate_chunks(self, template, template_name, context, budget=None):
         try:
-            return template.render(context)
+            if budget is None:
+                yield from template.generate(context)
+            else:
+                yield from budget.track(template_name).generate(template.generate(context))
+        except RenderBudgetExceeded:
+            raise
         except Exception as e:
             raise TemplateError(f"Error rendering template {template_name}: {str(e)}")
 
+    def render_template_to_file(self, template_name, context, output_path,
+                                buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Render a template straight into a file without building the output in memory.
+
+        Args:
+            template_name (str): Name of the template to render.
+            context (dict): Context data to use in rendering.
+            output_path (str): Path of the file to write.
+            buffer_size (int): Size of the write buffer in bytes.
+
+        Returns:
+            int: The number of characters written.
+
+        Raises:
+            TemplateError: If there's an error during template rendering. The
+                           partially written file is removed.
+            IOError: If the file cannot be written to.
+        """
+        return write_chunks(output_path, self.stream_template(template_name, context), buffer_size)
+
     def add_filter(self, name, filter_func):
         """
         Add a custom filter to the Jinja2 environment.
@@ -69,7 +461,11 @@ class TemplateManager:
             name (str): Name of the filter.
             filter_func (callable): Function to use as the filter.
         """
+        self._make_environment_private()
         self.env.filters[name] = filter_func
+        self.custom_filters[name] = filter_func
+        if self.render_cache is not None:
+            self.render_cache.clear()
 
     def add_global(self, name, value):
         """
@@ -79,21 +475,65 @@ class TemplateManager:
             name (str): Name of the global variable.
             value: Value of the global variable.
         """
+        self._make_environment_private()
         self.env.globals[name] = value
+        self.custom_globals[name] = value
+        if self.render_cache is not None:
+            self.render_cache.clear()
+
+    def _make_environment_private(self):
+        # Copy-on-write: customizing a shared environment would leak filters and
+        # globals into every other manager using it, so a private one is created.
+        if not self.shared_environment:
+            return
+        self.env = create_environment(self.template_dirs, self.bytecode_cache, self.enable_async, self.bundle)
+        self.index.environment = self.env
+        self.shared_environment = False
 
     def list_templates(self):
         """
         List all available templates.
 
+        The names come from an in-memory index that is only rebuilt when a
+        template directory changes; use ``self.index`` for glob and prefix
+        queries and per-template metadata.
+
         Returns:
             list: A list of available template names.
         """
-        return self.env.list_templates()
+        return self.index.names()
 
     def reload_templates(self):
         """
         Reload all templates from the file system.
-        Useful when templates have been added or modified.
+        Useful when templates have been added or modified. With a shared
+        environment, every manager using it reloads as well.
+        """
+        self.env.loader.invalidate()
+        self.index.invalidate()
+        if self.render_cache is not None:
+            self.render_cache.clear()
+
+    def is_template_cached(self, template_name):
+        """
+        Check whether a template is held compiled by the environment's loader.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            bool: True if the next lookup can reuse the compiled template.
+        """
+        return self.env.loader.is_cached(template_name)
+
+    def invalidate_templates(self, template_names):
+        """
+        Drop specific templates from the compiled-template cache.
+
+        Unlike reload_templates(), templates that did not change stay compiled.
+
+        Args:
+            template_names (iterable): Names of the templates to invalidate.
         """
-        self.env.cache.clear()
+        self.env.loader.invalidate(template_names)
 
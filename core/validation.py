@@ -0,0 +1,246 @@
+from jinja2 import nodes, meta
+from .exceptions import CodeGenLibError, ValidationError
+
+# A variable passed through one of these filters, or checked with one of these
+# tests, has a fallback and is not required.
+OPTIONAL_FILTERS = frozenset(['default', 'd'])
+OPTIONAL_TESTS = frozenset(['defined', 'undefined', 'none'])
+
+
+class TemplateVariables:
+    """Context variables a single template reads, as found in its syntax tree."""
+
+    __slots__ = ('required', 'optional', 'references')
+
+    def __init__(self, required, optional, references):
+        """
+        Initialize the TemplateVariables.
+
+        Args:
+            required (frozenset): Variables read without a fallback.
+            optional (frozenset): Variables that have a default, are tested for
+                                  being defined, or are only used as an if condition.
+            references (tuple): Templates included or extended with the same context.
+        """
+        self.required = required
+        self.optional = optional
+        self.references = references
+
+    def __repr__(self):
+        return f"TemplateVariables(required={sorted(self.required)}, optional={sorted(self.optional)})"
+
+
+def analyze_template(ast):
+    """
+    Find the context variables a parsed template reads.
+
+    Args:
+        ast (jinja2.nodes.Template): The template's syntax tree.
+
+    Returns:
+        TemplateVariables: Required and optional variables and the templates
+            that are rendered with the same context.
+    """
+    undeclared = meta.find_undeclared_variables(ast)
+    optional = set()
+    for node in ast.find_all(nodes.Filter):
+        if node.name in OPTIONAL_FILTERS and isinstance(node.node, nodes.Name):
+            optional.add(node.node.name)
+    for node in ast.find_all(nodes.Test):
+        if node.name in OPTIONAL_TESTS and isinstance(node.node, nodes.Name):
+            optional.add(node.node.name)
+    for node in ast.find_all(nodes.If):
+        # '{% if x %}' and '{% if not x %}' are false for a missing variable.
+        test = node.test.node if isinstance(node.test, nodes.Not) else node.test
+        if isinstance(test, nodes.Name):
+            optional.add(test.name)
+
+    references = []
+    for node in ast.find_all((nodes.Extends, nodes.Include)):
+        # Imports only see the context when asked to; their variables are not counted.
+        if isinstance(node.template, nodes.Const) and isinstance(node.template.value, str):
+            references.append(node.template.value)
+    optional &= undeclared
+    return TemplateVariables(frozenset(undeclared - optional), frozenset(optional), tuple(references))
+
+
+class ValidationIssue:
+    """One problem found with an item of a manifest."""
+
+    __slots__ = ('index', 'template_name', 'output_path', 'message', 'missing')
+
+    def __init__(self, index, template_name, output_path, message, missing=()):
+        """
+        Initialize the ValidationIssue.
+
+        Args:
+            index (int): Position of the item in the manifest.
+            template_name (str): Template of the item, if given.
+            output_path (str): Output path of the item, if given.
+            message (str): Description of the problem.
+            missing (tuple): Names of the missing required variables, if any.
+        """
+        self.index = index
+        self.template_name = template_name
+        self.output_path = output_path
+        self.message = message
+        self.missing = tuple(missing)
+
+    def __str__(self):
+        return f"#{self.index} {self.output_path or '<no output_path>'}: {self.message}"
+
+    def __repr__(self):
+        return f"ValidationIssue({self.index}, {self.message!r})"
+
+
+class ManifestValidator:
+    """
+    Checks generation items against what their templates need before rendering.
+
+    A template's required variables are the variables it, or any template it
+    includes or extends, reads without a fallback, plus the 'required_kwargs'
+    declared for it in the config. Variables filtered through ``default``,
+    tested with ``is defined``, or only used as an ``{% if %}`` condition are
+    optional. Template globals never need to be passed. The syntax tree of each
+    template is analyzed once and cached with the compiled template.
+    """
+
+    def __init__(self, template_manager, config_manager=None, merge_context=None):
+        """
+        Initialize the ManifestValidator.
+
+        Args:
+            template_manager (TemplateManager): Source of the templates.
+            config_manager (ConfigManager, optional): Source of 'required_kwargs'.
+            merge_context (callable, optional): Called with (template_name, context,
+                output_path) to build the context a template is rendered with.
+        """
+        self.template_manager = template_manager
+        self.config_manager = config_manager
+        self.merge_context = merge_context
+        self.contexts = []
+        self._required = {}
+
+    def required_variables(self, template_name):
+        """
+        Get the variables that must be in the context of a template.
+
+        Args:
+            template_name (str): Name of the template.
+
+        Returns:
+            frozenset: The required variable names.
+
+        Raises:
+            TemplateError: If the template or one it references cannot be loaded or parsed.
+        """
+        # Memoized per validator; a validator is used for one pass over a manifest.
+        required = self._required.get(template_name)
+        if required is None:
+            required = self._closure_variables(template_name, set())
+            if self.config_manager is not None:
+                required |= frozenset(self.config_manager.get_required_kwargs(template_name))
+            required -= frozenset(self.template_manager.env.globals)
+            self._required[template_name] = required
+        return required
+
+    def _closure_variables(self, template_name, seen):
+        seen.add(template_name)
+        variables = self.template_manager.get_template_variables(template_name)
+        required = set(variables.required)
+        for reference in variables.references:
+            if reference not in seen:
+                required |= self._closure_variables(reference, seen)
+        return frozenset(required)
+
+    def missing_variables(self, template_name, context):
+        """
+        Find the required variables a context lacks.
+
+        Args:
+            template_name (str): Name of the template.
+            context (dict): The context it would be rendered with.
+
+        Returns:
+            list: The missing variable names, sorted.
+        """
+        return sorted(name for name in self.required_variables(template_name) if name not in context)
+
+    def validate(self, generation_configs):
+        """
+        Check every item of a manifest.
+
+        The contexts built with ``merge_context`` are kept in ``self.contexts``,
+        one per item (None for items that were not merged), so that they can be
+        rendered without being built a second time.
+
+        Args:
+            generation_configs (list): generate_multiple() items.
+
+        Returns:
+            list: ValidationIssue objects, in manifest order; empty if the
+                  manifest is valid.
+        """
+        issues = []
+        template_errors = {}
+        self.contexts = [None] * len(generation_configs)
+        for index, config in enumerate(generation_configs):
+            if not isinstance(config, dict):
+                issues.append(ValidationIssue(index, None, None, "Item must be a mapping"))
+                continue
+            template_name = config.get('template_name')
+            output_path = config.get('output_path')
+            context = config.get('context', {})
+            problems = []
+            if not isinstance(template_name, str) or not template_name:
+                problems.append("'template_name' must be a non-empty string")
+            if not isinstance(output_path, str) or not output_path:
+                problems.append("'output_path' must be a non-empty string")
+            if not isinstance(context, dict):
+                problems.append("'context' must be a mapping")
+            if problems:
+                issues.extend(ValidationIssue(index, template_name, output_path, problem) for problem in problems)
+                continue
+
+            if template_name not in template_errors:
+                try:
+                    self.required_variables(template_name)
+                    template_errors[template_name] = None
+                except CodeGenLibError as e:
+                    template_errors[template_name] = str(e)
+            if template_errors[template_name] is not None:
+                issues.append(ValidationIssue(index, template_name, output_path, template_errors[template_name]))
+                continue
+
+            if self.merge_context is not None:
+                try:
+                    context = self.merge_context(template_name, context, output_path)
+                except Exception as e:
+                    issues.append(ValidationIssue(index, template_name, output_path,
+                                                  f"Cannot build the context: {type(e).__name__}: {e}"))
+                    continue
+                self.contexts[index] = context
+            missing = self.missing_variables(template_name, context)
+            if missing:
+                issues.append(ValidationIssue(index, template_name, output_path,
+                                              f"Missing required variable(s) for {template_name}: "
+                                              f"{', '.join(missing)}", missing))
+        return issues
+
+    def check(self, generation_configs):
+        """
+        Check every item of a manifest and raise if any is invalid.
+
+        Args:
+            generation_configs (list): generate_multiple() items.
+
+        Returns:
+            list: The merged context of every item, as in ``self.contexts``.
+
+        Raises:
+            ValidationError: Listing every issue found.
+        """
+        issues = self.validate(generation_configs)
+        if issues:
+            raise ValidationError(issues)
+        return self.contexts
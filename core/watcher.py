@@ -0,0 +1,160 @@
+import os
+import time
+
+# Seconds between two scans of the watched files.
+DEFAULT_POLL_INTERVAL = 0.5
+# Quiet period, in seconds, that has to pass before a burst of changes is handled.
+DEFAULT_DEBOUNCE = 0.2
+
+
+class GenerationWatcher:
+    """
+    Long-running watch mode that regenerates only the outputs affected by edits.
+
+    The template directories and the config file are polled for changes. Bursts
+    of changes are debounced into a single cycle; each cycle invalidates only
+    the affected compiled templates, regenerates the generation configs that
+    depend on them and prints its latency.
+    """
+
+    def __init__(self, generator, generation_configs, interval=DEFAULT_POLL_INTERVAL,
+                 debounce=DEFAULT_DEBOUNCE):
+        """
+        Initialize the GenerationWatcher.
+
+        Args:
+            generator (CodeGenerator): Generator used for regeneration.
+            generation_configs (list): Items as passed to generate_multiple().
+            interval (float): Seconds between two scans of the watched files.
+            debounce (float): Quiet period in seconds before changes are handled.
+        """
+        self.generator = generator
+        self.generation_configs = generation_configs
+        self.interval = interval
+        self.debounce = debounce
+        self.graph = generator.build_dependency_graph()
+        self.cycles = []
+        self._snapshot = self.scan()
+
+    def watched_paths(self):
+        """
+        List the directories and files that are watched.
+
+        Returns:
+            tuple: (template directories, config file path).
+        """
+        template_dirs = self.generator.template_manager.template_dirs
+        if isinstance(template_dirs, str):
+            template_dirs = [template_dirs]
+        return [os.path.abspath(path) for path in template_dirs], os.path.abspath(self.generator.config_path)
+
+    def scan(self):
+        """
+        Take a snapshot of the watched files.
+
+        Returns:
+            dict: Mapping of absolute file path to (mtime_ns, size).
+        """
+        template_dirs, config_path = self.watched_paths()
+        snapshot = {}
+        for template_dir in template_dirs:
+            for root, _, files in os.walk(template_dir):
+                for filename in files:
+                    self._stat_into(snapshot, os.path.join(root, filename))
+        self._stat_into(snapshot, config_path)
+        return snapshot
+
+    def poll(self):
+        """
+        Compare the watched files against the previous snapshot.
+
+        Returns:
+            set: Paths that were added, removed or modified since the last poll.
+        """
+        snapshot = self.scan()
+        previous = self._snapshot
+        self._snapshot = snapshot
+        return {path for path in set(snapshot) | set(previous) if snapshot.get(path) != previous.get(path)}
+
+    def run_cycle(self, changed_files):
+        """
+        Regenerate the outputs affected by a set of changed files.
+
+        Args:
+            changed_files (iterable): Paths of the changed files.
+
+        Returns:
+            BatchResult: Result of the regeneration, or None if nothing was affected.
+        """
+        start = time.perf_counter()
+        changed_files = set(changed_files)
+        _, config_path = self.watched_paths()
+
+        rebuilt = False
+        if config_path in changed_files:
+            self.generator.reload_config()
+            self.graph.manifest = self.generator.manifest
+            if self.graph.template_manager is not self.generator.template_manager:
+                # The reload rebuilt the template environment; analyse the templates it loads.
+                self.graph.template_manager = self.generator.template_manager
+                self.graph.build()
+                rebuilt = True
+                # The template directories may have changed; watch the new ones from here on.
+                self._snapshot = self.scan()
+        if not rebuilt and any(path not in self.graph.template_files
+                               for path in changed_files if path != config_path):
+            # Templates were added or removed; re-analyse the template tree.
+            self.graph.build()
+
+        affected_templates = self.graph.affected_templates(changed_files)
+        self.generator.template_manager.invalidate_templates(affected_templates)
+        affected_configs = [config for config in self.generation_configs
+                            if config.get('template_name') in set(affected_templates)]
+        result = self.generator.generate_multiple(affected_configs) if affected_configs else None
+
+        latency = time.perf_counter() - start
+        self.cycles.append(latency)
+        failed = len(result.failed) if result is not None else 0
+        print(f"Watch cycle: {len(changed_files)} changed file(s), "
+              f"{len(affected_configs)} output(s) regenerated, {failed} failed "
+              f"in {latency * 1000:.1f} ms")
+        return result
+
+    def watch(self, max_cycles=None, stop_event=None):
+        """
+        Poll for changes and regenerate until stopped.
+
+        Args:
+            max_cycles (int, optional): Stop after this many regeneration cycles.
+            stop_event (threading.Event, optional): Stop once the event is set.
+        """
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                if stop_event is not None and stop_event.is_set():
+                    break
+                changed = self.poll()
+                if not changed:
+                    time.sleep(self.interval)
+                    continue
+
+                # Debounce: keep collecting until the files stay quiet.
+                while True:
+                    time.sleep(self.debounce)
+                    more = self.poll()
+                    if not more:
+                        break
+                    changed |= more
+
+                self.run_cycle(changed)
+                cycles += 1
+        except KeyboardInterrupt:
+            pass
+
+    @staticmethod
+    def _stat_into(snapshot, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
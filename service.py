@@ -0,0 +1,563 @@
+"""
+Local HTTP rendering service.
+
+Tools that need generated code on demand can share one warm process instead of
+each embedding the library:
+
+    python -m code_gen_lib.service --config codegen.yaml --port 8731
+
+Endpoints (JSON in, JSON out):
+
+    POST /render     {"template_name": ..., "context": {...}}
+                     -> {"ok": true, "output": "..."}
+    POST /generate   {"template_name": ..., "output_path": ..., "context": {...}}
+                     -> {"ok": true, "generated": true}
+    POST /batch      {"outputs": [{"template_name", "output_path", "context"}, ...]}
+                     -> the result of generate_multiple(), as the CLI reports it
+    GET  /health     -> {"ok": true, "status": "ok", ...}
+    GET  /metrics    -> request counters, latencies, queue depth and pool state
+
+Requests run on a bounded thread or process pool. Admission is counted in
+outputs: at most ``workers`` outputs render at a time and at most ``max_queue``
+more wait for a worker; anything beyond that is rejected straight away with 503
+and a Retry-After header instead of piling up. A batch holds one slot per
+output, up to the whole capacity, and never has more outputs in the pool than
+the slots it holds.
+
+The service binds to 127.0.0.1 by default and has no authentication, so it is
+meant for local use only. To keep web pages the user visits from driving it,
+POST bodies must be sent as application/json, the Host header must name the
+bound address, and outputs are only written below the output root: output
+paths must be relative and may not contain '..'.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8731
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_MAX_BATCH = 10000
+# Largest request body accepted, in bytes.
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+RETRY_AFTER_SECONDS = 1
+
+ENDPOINTS = ('/render', '/generate', '/batch', '/health', '/metrics')
+# Names accepted in the Host header when the service is bound to a loopback address.
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '[::1]')
+
+
+class ServiceError(Exception):
+    """Raised for requests the service refuses, carrying the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        self.status = status
+        super().__init__(message)
+
+
+class ServiceMetrics:
+    """Thread-safe request counters and latencies per endpoint."""
+
+    def __init__(self):
+        """Initialize empty ServiceMetrics."""
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self.rejected = 0
+
+    def record(self, endpoint, status, seconds):
+        """
+        Record one handled request.
+
+        Args:
+            endpoint (str): Request path.
+            status (int): HTTP status of the response.
+            seconds (float): Time taken to handle the request.
+        """
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+            })
+            entry['requests'] += 1
+            if status >= 400:
+                entry['errors'] += 1
+            entry['total_seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            if status == HTTPStatus.SERVICE_UNAVAILABLE:
+                self.rejected += 1
+
+    def snapshot(self):
+        """
+        Get a copy of the counters.
+
+        Returns:
+            dict: Per-endpoint requests, errors, mean and max latency, and the
+                  number of rejected requests.
+        """
+        with self._lock:
+            endpoints = {}
+            for endpoint, entry in self._endpoints.items():
+                endpoints[endpoint] = dict(entry, mean_seconds=entry['total_seconds'] / entry['requests'])
+            return {'endpoints': endpoints, 'rejected': self.rejected}
+
+
+class GenerationService:
+    """
+    Warm CodeGenerator behind a bounded worker pool.
+
+    The generator, its template environment and the worker pool are created
+    once and shared by every request. With the 'process' backend, renders run
+    in worker processes that each keep their own warm environment.
+    """
+
+    def __init__(self, config_path, workers=DEFAULT_WORKERS, executor='thread', max_queue=DEFAULT_MAX_QUEUE,
+                 request_timeout=None, max_batch=DEFAULT_MAX_BATCH, warm=True, output_root=None):
+        """
+        Initialize the GenerationService.
+
+        Args:
+            config_path (str): Generator config file.
+            workers (int): Number of pool workers, and of outputs rendered at once.
+            executor (str): 'thread' or 'process'.
+            max_queue (int): Number of outputs allowed to wait for a worker.
+            request_timeout (float, optional): Seconds a request may take before
+                it is answered with 504. The work itself is not interrupted, and
+                keeps its admission slots until it finishes; use a render budget
+                to bound it.
+            max_batch (int): Maximum number of outputs in one /batch request.
+            warm (bool): Compile every template when the service starts.
+            output_root (str, optional): Directory that output paths are relative
+                to; nothing is written outside it. Defaults to the directory of
+                the config file.
+
+        Raises:
+            ValueError: If the executor or a limit is invalid.
+        """
+        from .core.generator import CodeGenerator
+        from concurrent.futures import ThreadPoolExecutor
+        from .core.parallel import create_executor
+        if executor not in ('thread', 'process'):
+            raise ValueError("executor must be 'thread' or 'process'")
+        if workers < 1 or max_queue < 0 or max_batch < 1:
+            raise ValueError("workers and max_batch must be positive and max_queue not negative")
+        self.config_path = config_path
+        if output_root is None:
+            output_root = os.path.dirname(os.path.abspath(config_path))
+        self.output_root = os.path.realpath(output_root)
+        self.generator = CodeGenerator(config_path)
+        self.backend = executor
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.request_timeout = request_timeout
+        self.capacity = workers + max_queue
+        self.pool = create_executor(executor, workers)
+        # Threads that drive /generate and /batch requests; they only wait on the
+        # pool, and admission keeps their number below the capacity.
+        self._batches = ThreadPoolExecutor(max_workers=self.capacity)
+        self.metrics = ServiceMetrics()
+        self.started = time.time()
+        self._state_lock = threading.Lock()
+        self._manifest_lock = threading.Lock()
+        self._admitted = 0
+        if warm:
+            self.warm_templates()
+
+    def warm_templates(self):
+        """
+        Compile every template of the generator's environment.
+
+        Returns:
+            int: Number of templates compiled; templates that fail to compile are skipped.
+        """
+        compiled = 0
+        template_manager = self.generator.template_manager
+        for template_name in template_manager.list_templates():
+            try:
+                template_manager.get_template(template_name)
+            except Exception:
+                continue
+            compiled += 1
+        return compiled
+
+    @contextlib.contextmanager
+    def admit(self, slots=1):
+        """
+        Hold slots of the request queue while the block runs.
+
+        Args:
+            slots (int): Number of outputs to make room for.
+
+        Raises:
+            ServiceError: 503 if the slots are not free.
+        """
+        self._reserve(slots)
+        try:
+            yield
+        finally:
+            self._release(slots)
+
+    def _reserve(self, slots):
+        with self._state_lock:
+            if self._admitted + slots > self.capacity:
+                raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE,
+                                   f"Service is saturated: {self._admitted} of {self.capacity} slots "
+                                   f"({self.workers} workers, {self.max_queue} queued) are taken")
+            self._admitted += slots
+
+    def _release(self, slots):
+        with self._state_lock:
+            self._admitted -= slots
+
+    def _submit(self, slots, executor, func, *args):
+        """Admit a job, run it on an executor and wait for it; its slots are freed when it ends."""
+        self._reserve(slots)
+        try:
+            future = executor.submit(func, *args)
+        except BaseException:
+            self._release(slots)
+            raise
+        future.add_done_callback(lambda _: self._release(slots))
+        return self._wait(future)
+
+    def render(self, request):
+        """
+        Render a template and return its output.
+
+        Args:
+            request (dict): 'template_name' and optional 'context'.
+
+        Returns:
+            dict: {'ok': True, 'output': str}.
+        """
+        template_name = _require(request, 'template_name')
+        context = self.generator._merge_context(template_name, _context(request))
+        if self.backend == 'process':
+            from .core.parallel import generate_in_worker, worker_spec
+            spec = worker_spec(self.generator.template_manager)
+            result = self._submit(1, self.pool, generate_in_worker, spec,
+                                  (0, template_name, None, context, None, True))
+            if result.error is not None:
+                raise result.error
+            output = result.content
+        else:
+            output = self._submit(1, self.pool, self.generator.template_manager.render_template,
+                                  template_name, context)
+        return {'ok': True, 'output': output}
+
+    def generate(self, request):
+        """
+        Generate one output file.
+
+        Args:
+            request (dict): 'template_name', 'output_path' and optional 'context'.
+
+        Returns:
+            dict: {'ok': True, 'generated': bool}; 'generated' is False when the
+                  output was skipped as up to date.
+        """
+        item = {
+            'template_name': _require(request, 'template_name'),
+            'output_path': self.resolve_output_path(_require(request, 'output_path')),
+            'context': _context(request),
+        }
+        batch = self._run_batch([item])
+        result = batch.results[0]
+        if result.error is not None:
+            raise result.error
+        batch.raise_for_errors()
+        return {'ok': True, 'generated': not result.skipped}
+
+    def batch(self, request):
+        """
+        Generate a batch of outputs on the worker pool.
+
+        Args:
+            request (dict): 'outputs', a list of generate_multiple() items.
+
+        Returns:
+            dict: The batch result, as produced by cli.batch_to_dict().
+        """
+        from .cli import batch_to_dict
+        outputs = request.get('outputs')
+        if not isinstance(outputs, list) or not all(isinstance(item, dict) for item in outputs):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "'outputs' must be a list of objects")
+        if len(outputs) > self.max_batch:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"Batch of {len(outputs)} outputs exceeds the limit of {self.max_batch}")
+        outputs = [dict(item, output_path=self.resolve_output_path(_require(item, 'output_path')))
+                   for item in outputs]
+        return batch_to_dict(self._run_batch(outputs))
+
+    def resolve_output_path(self, output_path):
+        """
+        Resolve a requested output path below the output root.
+
+        Args:
+            output_path (str): Path relative to the output root.
+
+        Returns:
+            str: The absolute path to write to.
+
+        Raises:
+            ServiceError: 403 if the path is absolute, contains '..', or
+                          resolves outside the output root, e.g. through a symlink.
+        """
+        parts = output_path.replace('\\', '/').split('/')
+        if os.path.isabs(output_path) or output_path.startswith(('/', '\\')) or '..' in parts:
+            raise ServiceError(HTTPStatus.FORBIDDEN,
+                               f"Output path '{output_path}' must be relative to the output root, without '..'")
+        resolved = os.path.realpath(os.path.join(self.output_root, output_path))
+        if os.path.commonpath([self.output_root, resolved]) != self.output_root or resolved == self.output_root:
+            raise ServiceError(HTTPStatus.FORBIDDEN, f"Output path '{output_path}' is outside the output root")
+        return resolved
+
+    def _run_batch(self, outputs):
+        # One slot per output, up to the whole capacity; the batch never has
+        # more outputs in the shared pool than the slots it holds.
+        slots = max(1, min(len(outputs), self.capacity))
+        return self._submit(slots, self._batches, self._generate_batch, outputs, slots)
+
+    def _generate_batch(self, outputs, slots):
+        from .core.parallel import BoundedExecutor
+        pool = BoundedExecutor(self.pool, slots)
+        if self.generator.manifest is None:
+            return self.generator.generate_multiple(outputs, executor=pool)
+        # Concurrent runs would interleave their manifest records and report
+        # each other's outputs as stale.
+        with self._manifest_lock:
+            return self.generator.generate_multiple(outputs, executor=pool)
+
+    def _wait(self, future):
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        try:
+            return future.result(timeout=self.request_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT,
+                               f"Request did not finish within {self.request_timeout} seconds")
+
+    def health(self):
+        """
+        Report that the service is up.
+
+        Returns:
+            dict: Status, process id and uptime.
+        """
+        return {'ok': True, 'status': 'ok', 'pid': os.getpid(), 'uptime': time.time() - self.started}
+
+    def metrics_snapshot(self):
+        """
+        Report the service's counters and pool state.
+
+        Returns:
+            dict: Request metrics, in-flight and queued requests, pool settings and,
+                  when enabled, render cache statistics.
+        """
+        with self._state_lock:
+            admitted = self._admitted
+        snapshot = self.metrics.snapshot()
+        snapshot.update({
+            'ok': True,
+            'backend': self.backend,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'in_flight': min(admitted, self.workers),
+            'queued': max(0, admitted - self.workers),
+            'uptime': time.time() - self.started,
+        })
+        render_cache = self.generator.template_manager.render_cache
+        if render_cache is not None:
+            snapshot['render_cache'] = render_cache.stats()
+        return snapshot
+
+    def close(self):
+        """Shut the worker pool down."""
+        self._batches.shutdown(wait=True)
+        self.pool.shutdown(wait=True)
+
+
+def _require(request, key):
+    value = request.get(key)
+    if not isinstance(value, str) or not value:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a non-empty string")
+    return value
+
+
+def _context(request):
+    context = request.get('context', {})
+    if not isinstance(context, dict):
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "'context' must be an object")
+    return context
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+
+    server_version = 'code_gen_lib'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        service = self.server.service
+        if not self._host_allowed():
+            return
+        if self.path == '/health':
+            self._respond(HTTPStatus.OK, service.health())
+        elif self.path == '/metrics':
+            self._respond(HTTPStatus.OK, service.metrics_snapshot())
+        else:
+            self._respond_error(HTTPStatus.NOT_FOUND if self.path not in ENDPOINTS
+                                else HTTPStatus.METHOD_NOT_ALLOWED, f"GET {self.path} is not supported")
+
+    def do_POST(self):
+        from .core.exceptions import CodeGenLibError
+        service = self.server.service
+        handler = {'/render': service.render, '/generate': service.generate, '/batch': service.batch}.get(self.path)
+        start = time.perf_counter()
+        status = HTTPStatus.OK
+        if not self._host_allowed():
+            return
+        try:
+            request = self._read_json()
+            if handler is None:
+                raise ServiceError(HTTPStatus.NOT_FOUND if self.path not in ENDPOINTS
+                                   else HTTPStatus.METHOD_NOT_ALLOWED, f"POST {self.path} is not supported")
+            response = handler(request)
+        except ServiceError as e:
+            status, response = e.status, {'ok': False, 'error': str(e)}
+        except (CodeGenLibError, ValueError) as e:
+            status, response = HTTPStatus.UNPROCESSABLE_ENTITY, {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        service.metrics.record(self.path, status, time.perf_counter() - start)
+        self._respond(status, response)
+
+    def _host_allowed(self):
+        # A page on another site can reach a local port by DNS rebinding, but
+        # the browser still sends that site's name as the Host.
+        if self.headers.get('Host', '').lower() in self.server.allowed_hosts:
+            return True
+        self._respond_error(HTTPStatus.FORBIDDEN, f"Host '{self.headers.get('Host')}' is not served here")
+        return False
+
+    def _read_json(self):
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            # Browsers send text/plain and form bodies cross-site without asking.
+            raise ServiceError(HTTPStatus.UNSUPPORTED_MEDIA_TYPE, "Requests must be sent as application/json")
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_REQUEST_BYTES:
+            raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large")
+        body = self.rfile.read(length) if length else b'{}'
+        try:
+            request = json.loads(body)
+        except ValueError as e:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"Request body is not valid JSON: {e}")
+        if not isinstance(request, dict):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "Request body must be a JSON object")
+        return request
+
+    def _respond_error(self, status, message):
+        self._respond(status, {'ok': False, 'error': message})
+
+    def _respond(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header('Retry-After', str(RETRY_AFTER_SECONDS))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class GenerationHTTPServer(ThreadingHTTPServer):
+    """HTTP server exposing a GenerationService."""
+
+    daemon_threads = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT, verbose=False, allowed_hosts=()):
+        """
+        Initialize the GenerationHTTPServer and bind its socket.
+
+        Args:
+            service (GenerationService): The service to expose.
+            host (str): Address to bind to.
+            port (int): Port to bind to; 0 picks a free port.
+            verbose (bool): Log every request to stderr.
+            allowed_hosts (iterable): Further names accepted in the Host header,
+                besides the bound address (and 'localhost' for loopback addresses).
+        """
+        self.service = service
+        self.verbose = verbose
+        super().__init__((host, port), _ServiceHandler)
+        bound_host, bound_port = self.server_address[:2]
+        names = {host, bound_host, *allowed_hosts}
+        if bound_host in LOOPBACK_HOSTS:
+            names.update(LOOPBACK_HOSTS)
+        self.allowed_hosts = frozenset(f"{name}:{bound_port}".lower() for name in names)
+
+    @property
+    def url(self):
+        """str: Base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def server_close(self):
+        super().server_close()
+        self.service.close()
+
+
+def main(argv=None):
+    """
+    Run the HTTP service until interrupted.
+
+    Args:
+        argv (list, optional): Arguments; defaults to sys.argv[1:].
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(prog='code_gen_lib.service', description='Serve code generation over HTTP.')
+    parser.add_argument('--config', required=True, help='generator config')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='address to bind to')
+    parser.add_argument('--allowed-host', action='append', default=[], dest='allowed_hosts',
+                        help='further name accepted in the Host header (repeatable)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help='port to listen on')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='number of pool workers')
+    parser.add_argument('--executor', choices=('thread', 'process'), default='thread', help='worker pool backend')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help='requests allowed to wait for a worker before 503s are returned')
+    parser.add_argument('--timeout', type=float, help='seconds before a request is answered with 504')
+    parser.add_argument('--output-root', help="directory output paths are relative to (default: the config's)")
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args(argv)
+
+    service = GenerationService(args.config, args.workers, args.executor, args.max_queue, args.timeout,
+                                output_root=args.output_root)
+    server = GenerationHTTPServer(service, args.host, args.port, args.verbose, args.allowed_hosts)
+    print(f"[code_gen_lib] serving on {server.url} with {args.workers} {args.executor} workers",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
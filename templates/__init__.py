@@ -1,6 +1,7 @@
 
 import os
 from typing import List, Dict
+from .index import TemplateIndex
 
 # Define the base path for templates
 TEMPLATE_BASE_PATH = os.path.dirname(os.path.abspath(__file__))
@@ -8,6 +9,9 @@ TEMPLATE_BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 # Define subfolders
 TEMPLATE_FOLDERS = ['database', 'framework_configs', 'crud']
 
+# Index of the packaged templates, created by get_template_index()
+_template_index = None
+
 def get_template_path(folder: str, template_name: str) -> str:
     """
     Get the full path for a specific template.
@@ -21,16 +25,31 @@ def get_template_path(folder: str, template_name: str) -> str:
     
     return os.path.join(TEMPLATE_BASE_PATH, folder, template_name)
 
+def get_template_index() -> TemplateIndex:
+    """
+    Get the shared index of the packaged templates.
+
+    The index is built on first use and rebuilt only when a template folder changes.
+
+    :return: The TemplateIndex over TEMPLATE_BASE_PATH
+    """
+    global _template_index
+    if _template_index is None:
+        _template_index = TemplateIndex(TEMPLATE_BASE_PATH, extensions=('.py', '.jinja2'))
+    return _template_index
+
 def list_templates() -> Dict[str, List[str]]:
     """
     List all available templates in each subfolder.
     
     :return: A dictionary with folder names as keys and lists of template names as values
     """
+    index = get_template_index()
     templates = {}
     for folder in TEMPLATE_FOLDERS:
-        folder_path = os.path.join(TEMPLATE_BASE_PATH, folder)
-        templates[folder] = [f for f in os.listdir(folder_path) if f.endswith('.py') or f.endswith('.jinja2')]
+        prefix = folder + '/'
+        templates[folder] = [name[len(prefix):] for name in index.iter_templates(prefix=prefix)
+                             if '/' not in name[len(prefix):]]
     return templates
 
 def read_template(folder: str, template_name: str) -> str:
@@ -64,4 +83,5 @@ def get_templates_info():
     }
 
 # Make key functions and variables available when importing the package
-__all__ = ['get_template_path', 'list_templates', 'read_template', 'get_templates_info', 'TEMPLATE_FOLDERS']
\ No newline at end of file
+__all__ = ['get_template_path', 'list_templates', 'read_template', 'get_templates_info', 'TEMPLATE_FOLDERS',
+           'get_template_index', 'TemplateIndex']
\ No newline at end of file
@@ -0,0 +1,222 @@
+import bisect
+import fnmatch
+import itertools
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from ..utils.hashing import hash_text
+
+
+class TemplateIndex:
+    """
+    In-memory index of the template files found under one or more directories.
+
+    The directory tree is walked once; later queries only stat the directories
+    that were seen, and the tree is walked again when one of their mtimes
+    changed (a file or subdirectory was added, removed or renamed). Per-file
+    metadata is computed on first request and cached until the file changes.
+
+    Names follow Jinja2's FileSystemLoader: paths relative to the template
+    directory with '/' separators. When a name exists in several directories,
+    the first directory wins.
+    """
+
+    def __init__(self, template_dirs, extensions: Optional[Sequence[str]] = None,
+                 environment=None):
+        """
+        :param template_dirs: Directory, or list of directories, to index
+        :param extensions: Only index files with one of these suffixes; all files if None
+        :param environment: Jinja2 environment used to parse templates for their
+                            required variables; a default one is created on first use
+        """
+        if isinstance(template_dirs, (str, os.PathLike)):
+            template_dirs = [template_dirs]
+        self.template_dirs = [os.fspath(path) for path in template_dirs]
+        self.extensions = tuple(extensions) if extensions else None
+        self.environment = environment
+        self._paths = None
+        self._names = []
+        self._dir_mtimes = {}
+        self._metadata = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Rebuild the index if the directory tree changed since it was built.
+
+        :param force: Rebuild even if no directory mtime changed
+        :return: True if the index was rebuilt
+        """
+        with self._lock:
+            if not force and self._paths is not None and not self._is_stale():
+                return False
+            self._build()
+            return True
+
+    def invalidate(self) -> None:
+        """Drop the index and all cached metadata; the next query rebuilds it."""
+        with self._lock:
+            self._paths = None
+            self._names = []
+            self._dir_mtimes = {}
+            self._metadata = {}
+
+    def names(self) -> List[str]:
+        """
+        List every indexed template name.
+
+        :return: Sorted list of template names
+        """
+        self.refresh()
+        return list(self._names)
+
+    def __contains__(self, name) -> bool:
+        self.refresh()
+        return name in self._paths
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.iter_templates()
+
+    def iter_templates(self, pattern: Optional[str] = None, prefix: Optional[str] = None) -> Iterator[str]:
+        """
+        Lazily iterate over template names, optionally filtered.
+
+        The iteration runs over the index as it was when iteration started.
+
+        :param pattern: Shell-style glob the name must match, e.g. 'crud/*.jinja2'
+        :param prefix: Prefix the name must start with, e.g. 'framework_configs/'
+        :return: Iterator of template names in sorted order
+        """
+        self.refresh()
+        names = self._names
+        start = bisect.bisect_left(names, prefix) if prefix else 0
+        for name in itertools.islice(names, start, None):
+            if prefix and not name.startswith(prefix):
+                break
+            if pattern is None or fnmatch.fnmatchcase(name, pattern):
+                yield name
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Find the template names matching a shell-style glob.
+
+        :param pattern: Glob such as 'framework_configs/*_config.py.jinja2'
+        :return: Sorted list of matching names
+        """
+        return list(self.iter_templates(pattern=pattern))
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """
+        Find the template names starting with a prefix.
+
+        :param prefix: Prefix such as 'database/'
+        :return: Sorted list of matching names
+        """
+        return list(self.iter_templates(prefix=prefix))
+
+    def path(self, name: str) -> str:
+        """
+        Get the file a template name resolves to.
+
+        :param name: Template name
+        :return: Absolute path of the template file
+        :raises KeyError: If the template is not indexed
+        """
+        self.refresh()
+        return self._paths[name]
+
+    def metadata(self, name: str, required_variables: bool = True) -> Dict:
+        """
+        Get the metadata of a template.
+
+        :param name: Template name
+        :param required_variables: Also parse the template for the variables it uses
+        :return: Dictionary with 'name', 'path', 'size', 'mtime_ns', 'checksum' and,
+                 if requested, 'required_variables' (sorted list)
+        :raises KeyError: If the template is not indexed
+        """
+        path = self.path(name)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._metadata.get(name)
+        if cached is not None and cached[0] == (path,) + key and \
+                (not required_variables or 'required_variables' in cached[1]):
+            return dict(cached[1])
+
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        info = {
+            'name': name,
+            'path': path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'checksum': hash_text(source),
+        }
+        if required_variables:
+            info['required_variables'] = self._required_variables(source, name, path)
+        with self._lock:
+            self._metadata[name] = ((path,) + key, info)
+        return dict(info)
+
+    def iter_metadata(self, pattern: Optional[str] = None, prefix: Optional[str] = None,
+                      required_variables: bool = True) -> Iterator[Dict]:
+        """
+        Lazily iterate over template metadata; files are only read as items are consumed.
+
+        :param pattern: Shell-style glob the name must match
+        :param prefix: Prefix the name must start with
+        :param required_variables: Also parse each template for the variables it uses
+        :return: Iterator of metadata dictionaries, as returned by metadata()
+        """
+        for name in self.iter_templates(pattern, prefix):
+            yield self.metadata(name, required_variables)
+
+    def _required_variables(self, source, name, path):
+        # Jinja2 is only imported when variables are actually requested.
+        from jinja2 import Environment, meta
+        if self.environment is None:
+            self.environment = Environment()
+        ast = self.environment.parse(source, name, path)
+        return sorted(meta.find_undeclared_variables(ast))
+
+    def _is_stale(self):
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                if mtime is not None:
+                    return True
+        return False
+
+    def _build(self):
+        paths = {}
+        dir_mtimes = {}
+        for template_dir in self.template_dirs:
+            template_dir = os.path.abspath(template_dir)
+            try:
+                dir_mtimes[template_dir] = os.stat(template_dir).st_mtime_ns
+            except OSError:
+                # Missing directories are watched so that creating them is noticed.
+                dir_mtimes[template_dir] = None
+                continue
+            for dirpath, _, filenames in os.walk(template_dir, followlinks=False):
+                if dirpath != template_dir:
+                    dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+                for filename in filenames:
+                    if self.extensions and not filename.endswith(self.extensions):
+                        continue
+                    file_path = os.path.join(dirpath, filename)
+                    name = os.path.relpath(file_path, template_dir).replace(os.sep, '/')
+                    paths.setdefault(name, file_path)
+        self._paths = paths
+        self._names = sorted(paths)
+        self._dir_mtimes = dir_mtimes
+        self._metadata = {name: entry for name, entry in self._metadata.items()
+                          if paths.get(name) == entry[0][0]}
@@ -0,0 +1,96 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import yaml
+from code_gen_lib.core.async_generator import AsyncCodeGenerator
+
+
+class TestAsyncCodeGenerator(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'templates': {}}, f)
+        self.generator = AsyncCodeGenerator(self.config_path, max_concurrency=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def output_path(self, name):
+        return os.path.join(self.temp_dir, 'out', name)
+
+    async def test_generate_code(self):
+        output_path = self.output_path('connection.py')
+        generated = await self.generator.generate_code(
+            'database/connection.py.jinja2', output_path, database_url='sqlite:///app.db')
+        self.assertTrue(generated)
+        with open(output_path) as f:
+            self.assertIn('sqlite:///app.db', f.read())
+
+    async def test_gather_many_generations(self):
+        await asyncio.gather(*(
+            self.generator.generate_code('database/connection.py.jinja2',
+                                         self.output_path(f'connection_{i}.py'),
+                                         database_url=f'sqlite:///{i}.db')
+            for i in range(20)
+        ))
+        self.assertEqual(len(os.listdir(os.path.join(self.temp_dir, 'out'))), 20)
+
+    async def test_generate_multiple_collects_errors(self):
+        configs = [
+            {'template_name': 'database/connection.py.jinja2',
+             'output_path': self.output_path('a.py'), 'context': {'database_url': 'x'}},
+            {'template_name': 'missing.jinja2', 'output_path': self.output_path('b.py')},
+        ]
+        result = await self.generator.generate_multiple(configs)
+        self.assertEqual(result.backend, 'async')
+        self.assertEqual([r.status for r in result], ['generated', 'failed'])
+
+
+    async def test_generate_framework_config(self):
+        output_path = self.output_path('config.py')
+        await self.generator.generate_framework_config('flask', output_path, secret_key='s3cret')
+        with open(output_path) as f:
+            self.assertIn('s3cret', f.read())
+
+    async def test_render_many_uses_the_wrapped_generator(self):
+        outputs = list(self.generator.render_many('database/connection.py.jinja2', [{'database_url': 'x.db'}]))
+        self.assertIn('x.db', outputs[0][1])
+
+    async def test_generate_multiple_on_a_pool(self):
+        configs = [{'template_name': 'database/connection.py.jinja2',
+                    'output_path': self.output_path(f'{i}.py'), 'context': {'database_url': 'x'}}
+                   for i in range(4)]
+        result = await self.generator.generate_multiple(configs, workers=2, executor='thread', fsync=False)
+        self.assertEqual((result.backend, len(result.generated)), ('thread', 4))
+
+    async def test_filters_reach_the_async_environment(self):
+        self.generator.add_global_variable('database_url', 'from-global.db')
+        output_path = self.output_path('global.py')
+        await self.generator.generate_code('database/connection.py.jinja2', output_path)
+        with open(output_path) as f:
+            self.assertIn('from-global.db', f.read())
+
+
+class TestAsyncGeneratorLoops(unittest.TestCase):
+
+    def test_generator_is_reused_across_event_loops(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        config_path = os.path.join(temp_dir, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.dump({}, f)
+        # Built before any loop is running, then used from two loops.
+        generator = AsyncCodeGenerator(config_path, max_concurrency=2)
+        for run in range(2):
+            configs = [{'template_name': 'database/connection.py.jinja2',
+                        'output_path': os.path.join(temp_dir, f'{run}_{i}.py'), 'context': {'database_url': 'x'}}
+                       for i in range(4)]
+            result = asyncio.run(generator.generate_multiple(configs))
+            self.assertEqual(len(result.generated), 4)
+
+if __name__ == '__main__':
+    unittest.main()
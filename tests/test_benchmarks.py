@@ -0,0 +1,38 @@
+import unittest
+from code_gen_lib.benchmarks.bench_generation import (build_workload, compare_to_baseline, run_benchmarks,
+                                                      shipped_templates)
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_workload_covers_shipped_templates(self):
+        templates = shipped_templates()
+        self.assertIn('crud/crud_operations.py.jinja2', templates)
+        self.assertIn('framework_configs/django_settings.py.jinja2', templates)
+        workload = build_workload(len(templates), templates)
+        self.assertEqual([template_name for template_name, _ in workload], templates)
+
+    def test_smoke_run(self):
+        report = run_benchmarks(scales=[3], repeat=1, workers=2, backends=['serial', 'thread'])
+        names = [record['name'] for record in report['results']]
+        self.assertEqual(names, ['render.cold', 'render.warm', 'render.many', 'write.write_file', 'write.batch_writer',
+                                 'generate.serial', 'generate.thread'])
+        self.assertEqual(report['environment']['workers'], 2)
+
+    def test_rejects_out_of_range_scale(self):
+        with self.assertRaises(ValueError):
+            run_benchmarks(scales=[200000])
+
+    def test_compare_to_baseline(self):
+        baseline = {'results': [{'name': 'render.warm', 'scale': 10, 'seconds': 1.0},
+                                {'name': 'generate.serial', 'scale': 10, 'seconds': 1.0}]}
+        report = {'results': [{'name': 'render.warm', 'scale': 10, 'seconds': 1.1},
+                              {'name': 'generate.serial', 'scale': 10, 'seconds': 1.5},
+                              {'name': 'generate.thread', 'scale': 10, 'seconds': 0.5}]}
+        comparison = compare_to_baseline(report, baseline, tolerance=0.2)
+        self.assertEqual([(entry['name'], entry['regressed']) for entry in comparison],
+                         [('render.warm', False), ('generate.serial', True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
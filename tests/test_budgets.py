@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import os
+import pickle
+import shutil
+import tempfile
+import yaml
+from code_gen_lib.core.budgets import RenderBudget, create_render_budget
+from code_gen_lib.core.exceptions import ConfigError, RenderBudgetExceeded, TemplateError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestRenderBudgets(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(self.template_dir)
+        self.write_template('loop.py', 'header\n{% for i in range(count) %}{{ i }},{% endfor %}')
+        self.write_template('silent.py', 'x\n{% for i in range(count) %}{% endfor %}')
+        self.write_template('nested.py', '{% for i in range(3) %}{% for j in range(3) %}.{% endfor %}{% endfor %}')
+        self.template_manager = TemplateManager(self.template_dir, shared_environment=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_unbudgeted_render_is_unchanged(self):
+        self.assertEqual(self.template_manager.render_template('loop.py', {'count': 3}), 'header\n0,1,2,')
+
+    def test_loop_iteration_cap(self):
+        # 3 outer and 9 inner iterations.
+        budget = RenderBudget(max_loop_iterations=12)
+        self.assertEqual(self.template_manager.render_template('nested.py', {}, budget), '.' * 9)
+        with self.assertRaises(RenderBudgetExceeded) as raised:
+            self.template_manager.render_template('silent.py', {'count': 10 ** 9}, budget)
+        error = raised.exception
+        self.assertIsInstance(error, TemplateError)
+        self.assertEqual(error.limit, 'max_loop_iterations')
+        self.assertEqual(error.diagnostics['loop_iterations'], 13)
+        self.assertEqual(error.diagnostics['lineno'], 2)
+        self.assertEqual(error.diagnostics['partial_output'], 'x\n')
+
+    def test_timeout_interrupts_silent_loops(self):
+        self.template_manager.set_render_budget(RenderBudget(timeout=0.05))
+        with self.assertRaises(RenderBudgetExceeded) as raised:
+            self.template_manager.render_template('silent.py', {'count': 10 ** 9})
+        self.assertEqual(raised.exception.limit, 'timeout')
+        self.assertLess(raised.exception.diagnostics['elapsed'], 5)
+
+    def test_output_cap_is_enforced_while_streaming(self):
+        budget = RenderBudget(max_output_bytes=100)
+        chunks = self.template_manager.stream_template('loop.py', {'count': 10 ** 9}, budget)
+        with self.assertRaises(RenderBudgetExceeded) as raised:
+            for _ in chunks:
+                pass
+        self.assertEqual(raised.exception.limit, 'max_output_bytes')
+        self.assertGreater(raised.exception.diagnostics['output_bytes'], 100)
+        self.assertRegex(raised.exception.diagnostics['partial_output'], r'^[0-9,]+$')
+
+    def test_async_render_is_budgeted(self):
+        manager = TemplateManager(self.template_dir, enable_async=True, shared_environment=False)
+        budget = RenderBudget(max_loop_iterations=5)
+        self.assertEqual(asyncio.run(manager.render_template_async('loop.py', {'count': 2}, budget)), 'header\n0,1,')
+        with self.assertRaises(RenderBudgetExceeded):
+            asyncio.run(manager.render_template_async('loop.py', {'count': 100}, budget))
+
+    def test_error_survives_pickling(self):
+        with self.assertRaises(RenderBudgetExceeded) as raised:
+            self.template_manager.render_template('loop.py', {'count': 100}, RenderBudget(max_loop_iterations=1))
+        copy = pickle.loads(pickle.dumps(raised.exception))
+        self.assertEqual(copy.limit, 'max_loop_iterations')
+        self.assertEqual(str(copy), str(raised.exception))
+
+    def test_config_section(self):
+        self.assertIsNone(create_render_budget(None))
+        with self.assertRaises(ConfigError):
+            create_render_budget({'timeout': -1})
+        with self.assertRaises(ConfigError):
+            create_render_budget({'max_bytes': 1})
+
+        config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.dump({'template_dirs': [self.template_dir], 'render_budget': {'max_loop_iterations': 5}}, f)
+        generator = CodeGenerator(config_path)
+        configs = [{'template_name': 'loop.py', 'output_path': os.path.join(self.temp_dir, 'out', f'{count}.py'),
+                    'context': {'count': count}} for count in (3, 50)]
+        result = generator.generate_multiple(configs, workers=2, executor='process')
+        self.assertEqual([r.ok for r in result], [True, False])
+        self.assertIsInstance(result.results[1].error, RenderBudgetExceeded)
+
+
+if __name__ == '__main__':
+    unittest.main()
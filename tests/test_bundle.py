@@ -0,0 +1,87 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import contextlib
+import yaml
+from code_gen_lib.cli import main
+from code_gen_lib.core.bundle import TemplateBundle, build_bundle
+from code_gen_lib.core.exceptions import TemplateError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestTemplateBundle(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(os.path.join(self.template_dir, 'models'))
+        self.write_template('models/model.py', 'class {{ name }}: pass')
+        self.write_template('filtered.py', '{{ name | shout }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_zip_bundle_serves_compiled_templates(self):
+        bundle = build_bundle(self.template_dir, os.path.join(self.temp_dir, 'bundle.zip'))
+        # Filters registered at runtime cannot be compiled ahead of time.
+        self.assertEqual(sorted(bundle.templates), ['models/model.py'])
+        self.assertIn('filtered.py', bundle.skipped)
+
+        manager = TemplateManager(self.template_dir, bundle=bundle, shared_environment=False)
+        self.assertTrue(manager.env.loader.is_bundled('models/model.py'))
+        self.assertEqual(manager.render_template('models/model.py', {'name': 'User'}), 'class User: pass')
+        self.assertEqual(manager.get_template('models/model.py').filename.rsplit('.', 1)[-1], 'py')
+
+    def test_edited_sources_override_the_bundle(self):
+        bundle = build_bundle(self.template_dir, os.path.join(self.temp_dir, 'bundle'))
+        self.write_template('models/model.py', 'class {{ name }}(Base): pass')
+        self.assertEqual(bundle.stale_templates(self.template_dir), ['models/model.py'])
+
+        manager = TemplateManager(self.template_dir, bundle=bundle, shared_environment=False)
+        self.assertFalse(manager.env.loader.is_bundled('models/model.py'))
+        self.assertEqual(manager.render_template('models/model.py', {'name': 'User'}), 'class User(Base): pass')
+
+    def test_bundle_works_without_sources(self):
+        bundle_path = os.path.join(self.temp_dir, 'bundle.zip')
+        build_bundle(self.template_dir, bundle_path)
+        shutil.rmtree(self.template_dir)
+        manager = TemplateManager(self.template_dir, bundle=TemplateBundle(bundle_path), shared_environment=False)
+        self.assertEqual(manager.render_template('models/model.py', {'name': 'User'}), 'class User: pass')
+
+    def test_incompatible_bundle_is_rejected(self):
+        bundle = build_bundle(self.template_dir, os.path.join(self.temp_dir, 'bundle.zip'))
+        bundle.manifest['jinja2_version'] = '0.0'
+        self.assertIn('Jinja2 0.0', bundle.incompatibility())
+        with self.assertRaises(TemplateError):
+            TemplateManager(self.template_dir, bundle=bundle, shared_environment=False)
+        with self.assertRaises(TemplateError):
+            TemplateManager(self.template_dir, enable_async=True,
+                            bundle=TemplateBundle(bundle.path), shared_environment=False)
+
+    def test_generator_loads_bundle_from_config(self):
+        bundle_path = os.path.join(self.temp_dir, 'bundle.zip')
+        config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.dump({'template_dirs': [self.template_dir], 'bundle': bundle_path}, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(['bundle', 'build', bundle_path, '--config', config_path]), 0)
+            self.assertEqual(main(['bundle', 'check', bundle_path, '--config', config_path]), 1)
+
+        generator = CodeGenerator(config_path)
+        self.assertEqual(generator.template_manager.bundle.path, bundle_path)
+        output_path = os.path.join(self.temp_dir, 'out', 'user.py')
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.generate_code('models/model.py', output_path, name='User')
+        with open(output_path) as f:
+            self.assertEqual(f.read(), 'class User: pass')
+
+
+if __name__ == '__main__':
+    unittest.main()
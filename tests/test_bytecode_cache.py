@@ -0,0 +1,60 @@
+import unittest
+import os
+import shutil
+import tempfile
+from code_gen_lib.core.bytecode_cache import PersistentBytecodeCache, create_bytecode_cache
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestPersistentBytecodeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.template_dir = tempfile.mkdtemp()
+        self.cache_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.template_dir, 'hello.jinja2'), 'w') as f:
+            f.write('Hello {{ name }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.template_dir)
+        shutil.rmtree(self.cache_dir)
+
+    def render(self, cache):
+        template_manager = TemplateManager(self.template_dir, bytecode_cache=cache)
+        return template_manager.render_template('hello.jinja2', {'name': 'World'})
+
+    def test_bytecode_is_persisted_and_reused(self):
+        cache = PersistentBytecodeCache(self.cache_dir)
+        self.assertEqual(self.render(cache), 'Hello World')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertEqual(self.render(PersistentBytecodeCache(self.cache_dir)), 'Hello World')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_changed_source_gets_new_entry(self):
+        cache = PersistentBytecodeCache(self.cache_dir)
+        self.render(cache)
+        with open(os.path.join(self.template_dir, 'hello.jinja2'), 'w') as f:
+            f.write('Bye {{ name }}')
+        self.assertEqual(self.render(cache), 'Bye World')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_size_cap_evicts_entries(self):
+        cache = PersistentBytecodeCache(self.cache_dir, max_size=1)
+        self.render(cache)
+        self.assertEqual(cache.size(), 0)
+
+    def test_clear(self):
+        cache = PersistentBytecodeCache(self.cache_dir)
+        self.render(cache)
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_create_from_config(self):
+        self.assertIsNone(create_bytecode_cache(None))
+        self.assertIsNone(create_bytecode_cache({'enabled': False}))
+        cache = create_bytecode_cache({'directory': self.cache_dir, 'max_size': 1024})
+        self.assertEqual(cache.directory, os.path.abspath(self.cache_dir))
+        self.assertEqual(cache.max_size, 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from code_gen_lib.cli import CLIError, GenerationServer, load_manifest, main, send_request
+
+
+class TestCommandLine(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.temp_dir, 'codegen.yaml'), 'w') as f:
+            f.write('templates:\n  database/connection.py.jinja2:\n    database_url: sqlite:///app.db\n')
+        self.manifest_path = os.path.join(self.temp_dir, 'batch.json')
+        with open(self.manifest_path, 'w') as f:
+            json.dump({'config': 'codegen.yaml', 'outputs': [
+                {'template_name': 'database/connection.py.jinja2', 'output_path': 'out/db.py'},
+                {'template_name': 'missing.jinja2', 'output_path': 'out/missing.py'},
+            ]}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_main(self, *argv):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(io.StringIO()):
+            status = main(list(argv))
+        return status, stdout.getvalue()
+
+    def test_load_manifest_resolves_paths(self):
+        request = load_manifest(self.manifest_path)
+        self.assertEqual(request['config'], os.path.join(self.temp_dir, 'codegen.yaml'))
+        self.assertEqual(request['outputs'][0]['output_path'], os.path.join(self.temp_dir, 'out', 'db.py'))
+
+    def test_invalid_manifest(self):
+        with open(self.manifest_path, 'w') as f:
+            json.dump({'outputs': [{'template_name': 'x'}]}, f)
+        with self.assertRaises(CLIError):
+            load_manifest(self.manifest_path, 'codegen.yaml')
+
+    def test_generate_in_process(self):
+        status, output = self.run_main('generate', self.manifest_path, '--json')
+        self.assertEqual(status, 1)
+        response = json.loads(output)
+        self.assertEqual([r['status'] for r in response['results']], ['generated', 'failed'])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'out', 'db.py')))
+
+    def test_generate_prints_a_line_per_output(self):
+        status, output = self.run_main('generate', self.manifest_path)
+        self.assertEqual(status, 1)
+        self.assertIn(f"Generated {os.path.join(self.temp_dir, 'out', 'db.py')}\n", output)
+        self.assertNotIn('Generated', self.run_main('generate', self.manifest_path, '--quiet')[1])
+
+    def test_generate_through_server(self):
+        socket_path = os.path.join(self.temp_dir, 'codegen.sock')
+        server = GenerationServer(socket_path, log=io.StringIO())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            self.assertTrue(send_request(socket_path, {'command': 'ping'})['ok'])
+            request = load_manifest(self.manifest_path)
+            first = send_request(socket_path, request)
+            second = send_request(socket_path, request)
+            self.assertEqual(first['summary']['generated'], 1)
+            self.assertEqual(second['summary']['failed'], 1)
+            self.assertEqual(send_request(socket_path, {'command': 'ping'})['generators'], 1)
+            self.assertFalse(send_request(socket_path, {'command': 'bogus'})['ok'])
+        finally:
+            send_request(socket_path, {'command': 'shutdown'})
+            thread.join(5)
+            server.server_close()
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
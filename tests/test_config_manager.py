@@ -2,7 +2,7 @@ import unittest
 import os
 import tempfile
 import yaml
-from code_gen_lib.core.config_manager import ConfigManager
+from code_gen_lib.core.config_manager import ConfigManager, load_config_snapshot, thaw
 
 class TestConfigManager(unittest.TestCase):
 
@@ -84,5 +84,19 @@ class TestConfigManager(unittest.TestCase):
 
         os.remove(invalid_config_file)
 
+    def test_snapshot_is_cached(self):
+        self.assertIs(load_config_snapshot(self.config_file), self.config_manager.config)
+
+    def test_snapshot_is_reloaded_after_change(self):
+        with open(self.config_file, 'w') as f:
+            yaml.dump({'database': {'host': 'db.internal'}}, f)
+        os.utime(self.config_file, ns=(0, 0))
+        self.assertEqual(load_config_snapshot(self.config_file)['database']['host'], 'db.internal')
+
+    def test_snapshot_is_read_only(self):
+        with self.assertRaises(TypeError):
+            self.config_manager.config['database']['host'] = 'changed'
+        self.assertEqual(thaw(self.config_manager.config), self.config_data)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
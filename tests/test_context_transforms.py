@@ -0,0 +1,124 @@
+import unittest
+import os
+import shutil
+import tempfile
+import yaml
+from code_gen_lib.core.context_transforms import ContextTransformer, derive_many
+from code_gen_lib.core.exceptions import ConfigError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.utils.string_utils import camel_to_snake, pluralize, snake_to_camel, snake_to_pascal
+
+
+class TestNameConversions(unittest.TestCase):
+
+    def test_camel_to_snake_keeps_acronyms_together(self):
+        cases = {
+            'User': 'user',
+            'UserProfile': 'user_profile',
+            'userName': 'user_name',
+            'HTTPServer': 'http_server',
+            'getHTTPResponseCode': 'get_http_response_code',
+            'UserID': 'user_id',
+            'UserIDs': 'user_ids',
+            'Model2Name': 'model2_name',
+            'already_snake': 'already_snake',
+        }
+        for name, expected in cases.items():
+            self.assertEqual(camel_to_snake(name), expected, name)
+
+    def test_snake_to_camel_and_pascal(self):
+        self.assertEqual(snake_to_camel('user_profile_id'), 'userProfileId')
+        self.assertEqual(snake_to_pascal('user_profile'), 'UserProfile')
+
+    def test_pluralize_keeps_style(self):
+        cases = {
+            'User': 'Users',
+            'UserCategory': 'UserCategories',
+            'day': 'days',
+            'Address': 'Addresses',
+            'sales_person': 'sales_people',
+            'SalesPerson': 'SalesPeople',
+            'metadata': 'metadata',
+            'URL': 'URLs',
+            'Status': 'Statuses',
+            'Statuses': 'Statuses',
+            'URLs': 'URLs',
+            'urls': 'urls',
+            'user_categories': 'user_categories',
+            'people': 'people',
+            'Alias': 'Aliases',
+        }
+        for name, expected in cases.items():
+            self.assertEqual(pluralize(name), expected, name)
+
+    def test_derive_many(self):
+        names = ['UserProfile', 'OrderItem'] * 1000
+        self.assertEqual(derive_many(names, 'table')[:2], ['user_profiles', 'order_items'])
+        self.assertEqual(len(derive_many(names, str.lower)), 2000)
+        with self.assertRaises(ConfigError):
+            derive_many(names, 'unknown')
+
+
+class TestContextTransformer(unittest.TestCase):
+
+    def test_defaults_and_per_template_rules(self):
+        transformer = ContextTransformer({
+            'models.py': {'table_name': 'table(model_name)', 'class_name': 'pascal(table_name)'},
+        })
+        self.assertEqual(transformer.transform('other.py', {'model_name': 'OrderItem'}),
+                         {'model_name': 'OrderItem', 'model_name_snake': 'order_item'})
+        context = transformer.transform('models.py', {'model_name': 'OrderItem', 'model_name_snake': 'custom'})
+        self.assertEqual(context['model_name_snake'], 'custom')
+        self.assertEqual(context['table_name'], 'order_items')
+        self.assertEqual(context['class_name'], 'OrderItems')
+        self.assertEqual(transformer.transform('models.py', {}), {})
+
+    def test_non_string_sources_are_skipped(self):
+        transformer = ContextTransformer({'models.py': {'table_name': 'table(model_name)'}})
+        for model_name in (None, 42, ['User']):
+            self.assertEqual(transformer.transform('models.py', {'model_name': model_name}),
+                             {'model_name': model_name})
+
+    def test_disabled_and_invalid_settings(self):
+        self.assertEqual(ContextTransformer(False).transform('any.py', {'model_name': 'User'}),
+                         {'model_name': 'User'})
+        for settings in ({'*': {'x': 'snake'}}, {'*': {'x': 'shout(model_name)'}}, ['snake']):
+            with self.assertRaises(ConfigError):
+                ContextTransformer(settings)
+
+
+class TestGeneratorTransforms(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'context_transforms': {
+                'crud/crud_operations.py.jinja2': {'table_name': 'table(model_name)'},
+            }}, f)
+        self.generator = CodeGenerator(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_crud_template_needs_only_the_model_name(self):
+        output_path = os.path.join(self.temp_dir, 'crud', 'user_profile.py')
+        result = self.generator.generate_multiple([{
+            'template_name': 'crud/crud_operations.py.jinja2',
+            'output_path': output_path,
+            'context': {'model_name': 'UserProfile'},
+        }])
+        result.raise_for_errors()
+        with open(output_path) as f:
+            self.assertIn('def create_user_profile(', f.read())
+
+    def test_render_many_derives_output_paths(self):
+        pattern = os.path.join(self.temp_dir, 'crud', '{table_name}.py')
+        result = self.generator.render_many('crud/crud_operations.py.jinja2',
+                                            [{'model_name': 'HTTPRequest'}], pattern)
+        result.raise_for_errors()
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'crud', 'http_requests.py')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import shutil
+import tempfile
+import yaml
+from code_gen_lib.core.dependency_graph import DependencyGraph
+from code_gen_lib.core.manifest import GenerationManifest
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestDependencyGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        os.mkdir(self.template_dir)
+        self.create_template('macros.jinja2', '{% macro field(name) %}{{ name }}{% endmacro %}')
+        self.create_template('base.jinja2', '{% import "macros.jinja2" as m %}{% block body %}{% endblock %}')
+        self.create_template('model.jinja2', '{% extends "base.jinja2" %}{% block body %}{{ model_name }}{% endblock %}')
+        self.create_template('settings.jinja2', '{{ debug }}')
+
+        self.config = {'templates': {'settings.jinja2': {'debug': True}}}
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump(self.config, f)
+
+        self.manifest = GenerationManifest(os.path.join(self.temp_dir, 'manifest.json'))
+        self.manifest.record('out/user.py', {'template': 'model.jinja2'})
+        self.manifest.record('out/settings.py', {'template': 'settings.jinja2'})
+
+        self.graph = DependencyGraph(TemplateManager(self.template_dir), self.config,
+                                     self.config_path, self.manifest)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(content)
+
+    def test_macro_change_propagates_in_order(self):
+        changed = [os.path.join(self.template_dir, 'macros.jinja2')]
+        self.assertEqual(self.graph.affected_templates(changed),
+                         ['macros.jinja2', 'base.jinja2', 'model.jinja2'])
+        self.assertEqual(self.graph.affected_outputs(changed), ['out/user.py'])
+
+    def test_unrelated_template_change(self):
+        changed = [os.path.join(self.template_dir, 'settings.jinja2')]
+        self.assertEqual(self.graph.affected_outputs(changed), ['out/settings.py'])
+
+    def test_config_change_affects_only_changed_sections(self):
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'templates': {'settings.jinja2': {'debug': False}}}, f)
+        self.assertEqual(self.graph.affected_outputs([self.config_path]), ['out/settings.py'])
+
+    def test_select_configs(self):
+        configs = [
+            {'template_name': 'settings.jinja2', 'output_path': 'a'},
+            {'template_name': 'model.jinja2', 'output_path': 'b'},
+        ]
+        changed = [os.path.join(self.template_dir, 'base.jinja2')]
+        self.assertEqual(self.graph.select_configs(configs, changed), [configs[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
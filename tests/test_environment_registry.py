@@ -0,0 +1,74 @@
+import unittest
+import os
+import shutil
+import tempfile
+from code_gen_lib.core.environment_registry import EnvironmentRegistry
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestEnvironmentRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.temp_dir, 'model.jinja2'), 'w') as f:
+            f.write('class {{ name | shout }}: pass')
+        with open(os.path.join(self.temp_dir, 'plain.jinja2'), 'w') as f:
+            f.write('{{ name }}')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_environments_are_keyed_by_dirs_and_options(self):
+        registry = EnvironmentRegistry()
+        env = registry.get_environment(self.temp_dir)
+        self.assertIs(registry.get_environment([os.path.join(self.temp_dir, '.')]), env)
+        self.assertIsNot(registry.get_environment(self.temp_dir, enable_async=True), env)
+        self.assertEqual(len(registry), 2)
+
+    def test_managers_share_compiled_templates(self):
+        first = TemplateManager(self.temp_dir)
+        second = TemplateManager(self.temp_dir)
+        self.assertIs(first.env, second.env)
+        self.assertIs(first.get_template('plain.jinja2'), second.get_template('plain.jinja2'))
+
+    def test_customizing_switches_to_private_environment(self):
+        shared = TemplateManager(self.temp_dir)
+        custom = TemplateManager(self.temp_dir)
+        custom.add_filter('shout', str.upper)
+        self.assertIsNot(custom.env, shared.env)
+        self.assertNotIn('shout', shared.env.filters)
+        self.assertEqual(custom.render_template('model.jinja2', {'name': 'user'}), 'class USER: pass')
+
+    def test_invalidate(self):
+        registry = EnvironmentRegistry()
+        env = registry.get_environment(self.temp_dir)
+        env.get_template('plain.jinja2')
+        self.assertEqual(registry.invalidate(self.temp_dir), 1)
+        self.assertEqual(env.loader.templates, {})
+        self.assertEqual(registry.invalidate('/nonexistent'), 0)
+
+    def test_registry_is_bounded(self):
+        registry = EnvironmentRegistry(max_environments=2)
+        first = registry.get_environment(self.temp_dir)
+        second = registry.get_environment(self.temp_dir, enable_async=True)
+        self.assertIs(registry.get_environment(self.temp_dir), first)
+        registry.get_environment(os.path.join(self.temp_dir, 'other'))
+        self.assertEqual(len(registry), 2)
+        # The least recently used environment was dropped.
+        self.assertIsNot(registry.get_environment(self.temp_dir, enable_async=True), second)
+
+    def test_templates_are_invalidated_by_name(self):
+        with open(os.path.join(self.temp_dir, 'other.jinja2'), 'w') as f:
+            f.write('{{ other }}')
+        manager = TemplateManager(self.temp_dir, shared_environment=False)
+        plain = manager.get_template('plain.jinja2')
+        manager.get_template('other.jinja2')
+        self.assertTrue(manager.is_template_cached('plain.jinja2'))
+        manager.invalidate_templates(['plain.jinja2'])
+        self.assertFalse(manager.is_template_cached('plain.jinja2'))
+        self.assertTrue(manager.is_template_cached('other.jinja2'))
+        self.assertIsNot(manager.get_template('plain.jinja2'), plain)
+
+
+if __name__ == '__main__':
+    unittest.main()
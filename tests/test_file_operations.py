@@ -0,0 +1,58 @@
+import unittest
+import os
+import shutil
+import stat
+import tempfile
+from code_gen_lib.utils.file_operations import BatchFileWriter
+
+
+class TestBatchFileWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_directories_are_created_once(self):
+        writer = BatchFileWriter()
+        for i in range(5):
+            writer.write(os.path.join(self.temp_dir, 'out', f'{i}.py'), 'x = 1\n')
+        stats = writer.stats()
+        self.assertEqual(stats['files_written'], 5)
+        self.assertEqual(stats['bytes_written'], 30)
+        self.assertEqual(stats['directories_created'], 1)
+        self.assertEqual(stats['makedirs_calls'], 1)
+
+    def test_failed_write_keeps_previous_content(self):
+        path = os.path.join(self.temp_dir, 'out.py')
+        writer = BatchFileWriter()
+        writer.write(path, 'old')
+
+        def chunks():
+            yield 'new'
+            raise RuntimeError('render failed')
+
+        with self.assertRaises(RuntimeError):
+            writer.write_chunks(path, chunks())
+        with open(path) as f:
+            self.assertEqual(f.read(), 'old')
+        self.assertEqual(os.listdir(self.temp_dir), ['out.py'])
+
+    def test_written_files_get_regular_permissions(self):
+        path = os.path.join(self.temp_dir, 'out.py')
+        BatchFileWriter().write(path, 'x')
+        umask = os.umask(0)
+        os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o666 & ~umask)
+
+    def test_grouped_fsync_on_commit(self):
+        with BatchFileWriter(fsync=True) as writer:
+            writer.write(os.path.join(self.temp_dir, 'a.py'), 'a')
+            writer.write(os.path.join(self.temp_dir, 'b.py'), 'b')
+        # Both files, then their directory once.
+        self.assertEqual(writer.stats()['fsync_calls'], 3 if os.name == 'posix' else 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
 
 import unittest
 import os
+import shutil
+import tempfile
+import yaml
+from concurrent.futures import ThreadPoolExecutor
+from code_gen_lib.core.exceptions import BatchGenerationError, CodeGenLibError
 from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.parallel import BoundedExecutor, worker_spec
 
 class TestCodeGenerator(unittest.TestCase):
     def setUp(self):
@@ -25,5 +31,259 @@ class TestCodeGenerator(unittest.TestCase):
         self.assertIn('name', content)
         self.assertIn('email', content)
 
+
+class TestGenerateMultiple(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'templates': {}}, f)
+        self.generator = CodeGenerator(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def make_configs(self, count):
+        return [
+            {
+                'template_name': 'database/connection.py.jinja2',
+                'output_path': os.path.join(self.temp_dir, 'out', f'connection_{i}.py'),
+                'context': {'database_url': f'sqlite:///db_{i}.sqlite'},
+            }
+            for i in range(count)
+        ]
+
+    def test_serial_results_are_ordered(self):
+        result = self.generator.generate_multiple(self.make_configs(3))
+        self.assertEqual(result.backend, 'serial')
+        self.assertEqual([r.index for r in result], [0, 1, 2])
+        self.assertEqual(result.failed, [])
+
+    def test_errors_are_collected_per_item(self):
+        configs = self.make_configs(3)
+        configs[1]['template_name'] = 'missing.jinja2'
+        result = self.generator.generate_multiple(configs, workers=2)
+        self.assertEqual([r.ok for r in result], [True, False, True])
+        self.assertTrue(os.path.exists(configs[2]['output_path']))
+        with self.assertRaises(BatchGenerationError):
+            result.raise_for_errors()
+
+    def test_process_backend(self):
+        configs = self.make_configs(4)
+        result = self.generator.generate_multiple(configs, workers=2, executor='process')
+        self.assertEqual(result.backend, 'process')
+        self.assertEqual([r.output_path for r in result], [c['output_path'] for c in configs])
+        with open(configs[3]['output_path']) as f:
+            self.assertIn('sqlite:///db_3.sqlite', f.read())
+        summary = result.summary()
+        self.assertEqual(summary['succeeded'], 4)
+        self.assertEqual(summary['failed'], 0)
+
+    def test_worker_spec_id_follows_the_manager(self):
+        manager = self.generator.template_manager
+        spec_id = worker_spec(manager)[0]
+        self.assertEqual(worker_spec(manager)[0], spec_id)
+        manager.add_global('project', 'demo')
+        self.assertNotEqual(worker_spec(manager)[0], spec_id)
+
+
+class TestBoundedExecutor(unittest.TestCase):
+
+    def test_map_honours_chunksize(self):
+        with ThreadPoolExecutor(2) as pool:
+            executor = BoundedExecutor(pool, 2)
+            for chunksize in (1, 3, 20):
+                self.assertEqual(list(executor.map(pow, range(10), [2] * 10, chunksize=chunksize)),
+                                 [i * i for i in range(10)])
+
+
+class TestRenderMany(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'templates': {'database/connection.py.jinja2': {'database_url': 'sqlite:///shared.db'}}}, f)
+        self.generator = CodeGenerator(self.config_path)
+        self.contexts = [{'name': f'db_{i}', 'database_url': f'sqlite:///{i}.db'} for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_streams_context_output_pairs(self):
+        pairs = list(self.generator.render_many('database/connection.py.jinja2', iter(self.contexts + [{}])))
+        self.assertEqual([context for context, _ in pairs], self.contexts + [{}])
+        self.assertIn('sqlite:///1.db', pairs[1][1])
+        # The template-specific config is the shared base of every context.
+        self.assertIn('sqlite:///shared.db', pairs[3][1])
+
+    def test_writes_outputs_to_pattern(self):
+        pattern = os.path.join(self.temp_dir, 'out', '{name}.py')
+        contexts = self.contexts + [{'database_url': 'sqlite:///nameless.db'}]
+        result = self.generator.render_many('database/connection.py.jinja2', contexts, pattern)
+        self.assertEqual([r.ok for r in result], [True, True, True, False])
+        self.assertEqual(result.write_stats['files_written'], 3)
+        with open(os.path.join(self.temp_dir, 'out', 'db_2.py')) as f:
+            self.assertIn('sqlite:///2.db', f.read())
+
+    def test_missing_template_raises(self):
+        with self.assertRaises(CodeGenLibError):
+            self.generator.render_many('missing.jinja2', self.contexts, lambda context: 'unused.py')
+
+
+class TestTemplateConfig(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(template_dir)
+        with open(os.path.join(template_dir, 'fields.jinja2'), 'w') as f:
+            f.write('{{ fields }} {{ (fields + ["extra"])|join(",") }}')
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'template_dirs': [template_dir],
+                       'templates': {'fields.jinja2': {'fields': ['id', 'name']}}}, f)
+        self.generator = CodeGenerator(self.config_path)
+        self.expected = "['id', 'name'] id,name,extra"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_lists_from_the_config_render_as_lists(self):
+        output_path = os.path.join(self.temp_dir, 'out', 'single.txt')
+        self.generator.generate_code('fields.jinja2', output_path)
+        self.assertEqual(self.read(output_path), self.expected)
+        [(_, output)] = self.generator.render_many('fields.jinja2', [{}])
+        self.assertEqual(output, self.expected)
+
+    def test_process_workers_get_lists(self):
+        configs = [{'template_name': 'fields.jinja2', 'output_path': os.path.join(self.temp_dir, 'out', f'{i}.txt')}
+                   for i in range(2)]
+        self.generator.generate_multiple(configs, workers=2, executor='process').raise_for_errors()
+        self.assertEqual(self.read(configs[1]['output_path']), self.expected)
+
+
+class TestFrameworkConfig(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({}, f)
+        self.generator = CodeGenerator(self.config_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_generate_framework_config(self):
+        for framework in ('flask', 'django'):
+            output_path = os.path.join(self.temp_dir, f'{framework}.py')
+            self.generator.generate_framework_config(framework, output_path, secret_key='s3cret')
+            with open(output_path) as f:
+                self.assertIn('s3cret', f.read())
+
+class TestIncrementalGeneration(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'incremental': True}, f)
+        self.output_path = os.path.join(self.temp_dir, 'out', 'connection.py')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def generate(self, url):
+        generator = CodeGenerator(self.config_path)
+        return generator.generate_multiple([{
+            'template_name': 'database/connection.py.jinja2',
+            'output_path': self.output_path,
+            'context': {'database_url': url},
+        }])
+
+    def test_unchanged_inputs_are_skipped(self):
+        first = self.generate('sqlite:///a.db')
+        self.assertEqual(len(first.generated), 1)
+        mtime = os.path.getmtime(self.output_path)
+
+        second = self.generate('sqlite:///a.db')
+        self.assertEqual(len(second.skipped), 1)
+        self.assertEqual(os.path.getmtime(self.output_path), mtime)
+
+    def test_changed_context_is_regenerated(self):
+        self.generate('sqlite:///a.db')
+        result = self.generate('sqlite:///b.db')
+        self.assertEqual(len(result.generated), 1)
+
+    def test_generate_code_saves_the_manifest_in_batches(self):
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'incremental': {'save_interval': 3}}, f)
+        generator = CodeGenerator(self.config_path)
+        manifest_path = generator.manifest.path
+        paths = [os.path.join(self.temp_dir, 'out', f'connection_{i}.py') for i in range(4)]
+        for index, path in enumerate(paths):
+            generator.generate_code('database/connection.py.jinja2', path, database_url='sqlite:///a.db')
+            self.assertEqual(os.path.exists(manifest_path), index >= 2)
+        self.assertEqual(generator.manifest.pending, 1)
+        self.assertTrue(generator.flush())
+        self.assertFalse(generator.flush())
+        skipped = CodeGenerator(self.config_path).generate_code('database/connection.py.jinja2', paths[3],
+                                                                database_url='sqlite:///a.db')
+        self.assertFalse(skipped)
+
+    def test_outputs_missing_from_batch_are_reported_stale(self):
+        self.generate('sqlite:///a.db')
+        os.remove(self.output_path)
+        result = CodeGenerator(self.config_path).generate_multiple([])
+        self.assertEqual(result.stale, [os.path.normpath(self.output_path)])
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({}, f)
+        self.generator = CodeGenerator(self.config_path)
+        self.configs = [{
+            'template_name': 'database/connection.py.jinja2',
+            'output_path': os.path.join(self.temp_dir, 'out', f'connection_{index}.py'),
+            'context': {'database_url': f'sqlite:///{index}.db'},
+        } for index in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.generator.instrumentation)
+        self.assertEqual(self.generator.instrumentation_report(), '')
+
+    def test_records_phases_bytes_and_cache_hits(self):
+        records = []
+        # Templates may already be compiled in the shared environment.
+        self.generator.template_manager.reload_templates()
+        stats = self.generator.enable_instrumentation()
+        stats.add_listener(records.append)
+        self.generator.generate_multiple(self.configs)
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(list(records[0]['phases']), ['config_merge', 'template_lookup', 'render', 'write'])
+        self.assertFalse(records[0]['template_cached'])
+        self.assertTrue(records[1]['template_cached'])
+        totals = stats.summary()['templates']['database/connection.py.jinja2']
+        self.assertEqual(totals['outputs'], 3)
+        self.assertEqual(totals['template_cache_hits'], 2)
+        self.assertEqual(totals['bytes'], sum(os.path.getsize(c['output_path']) for c in self.configs))
+
+    def test_profile_reports_hottest_templates(self):
+        stats = self.generator.enable_instrumentation()
+        with stats.profile(memory=True):
+            self.generator.generate_multiple(self.configs)
+        hottest = stats.hottest_templates(self.generator.build_dependency_graph().template_files)
+        self.assertEqual(hottest[0]['template_name'], 'database/connection.py.jinja2')
+        self.assertIn('Hottest templates', self.generator.instrumentation_report())
+
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
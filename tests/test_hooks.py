@@ -0,0 +1,134 @@
+import unittest
+import io
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import redirect_stdout
+import yaml
+from code_gen_lib.core.exceptions import BatchGenerationError, OutputError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.hooks import HookPipeline, command_hook, header_hook
+
+
+def shout(content):
+    return content.upper()
+
+
+class TestHookPipeline(unittest.TestCase):
+
+    def test_stages_patterns_and_timings(self):
+        hooks = HookPipeline()
+        hooks.add('post_render', shout, pattern='*.py')
+        hooks.add('pre_render', lambda context: {**context, 'extra': 1}, name='extra')
+        with self.assertRaises(ValueError):
+            hooks.add('post_write', shout)
+        self.assertEqual(hooks.post_render('x', 'app/models.py'), 'X')
+        self.assertEqual(hooks.post_render('x', 'README.md'), 'x')
+        self.assertEqual(hooks.pre_render({'a': 0}), {'a': 0, 'extra': 1})
+        timings = hooks.timings()
+        self.assertEqual((timings['shout']['calls'], timings['extra']['calls']), (1, 1))
+
+    def test_post_render_must_return_text(self):
+        hooks = HookPipeline()
+        hooks.add('post_render', lambda content: None, name='broken')
+        with self.assertRaises(OutputError):
+            hooks.post_render('x')
+
+    def test_header_hook_is_idempotent(self):
+        add_header = header_hook('# header\n')
+        self.assertEqual(add_header(add_header('code\n')), '# header\ncode\n')
+
+
+class TestGeneratorHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(template_dir)
+        with open(os.path.join(template_dir, 'model.py'), 'w') as f:
+            f.write('class {{ name }}: {{ extra|default("") }}\n')
+        self.config_path = os.path.join(self.temp_dir, 'codegen.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump({'template_dirs': [template_dir], 'output': {'streaming': True}}, f)
+        with redirect_stdout(io.StringIO()):
+            self.generator = CodeGenerator(self.config_path)
+        self.outputs = [{'template_name': 'model.py', 'output_path': self.path(f'model_{i}.py'),
+                         'context': {'name': f'M{i}'}} for i in range(5)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, name):
+        return os.path.join(self.temp_dir, 'out', name)
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def generate(self, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            return self.generator.generate_multiple(self.outputs, **kwargs)
+
+    def test_render_hooks_apply_to_streamed_outputs(self):
+        self.generator.add_hook('pre_render', lambda context: context.update(extra='pass'), name='extra')
+        self.generator.add_hook('post_render', header_hook('# generated\n'))
+        with redirect_stdout(io.StringIO()):
+            self.generator.generate_code('model.py', self.path('user.py'), name='User')
+        self.assertEqual(self.read('user.py'), '# generated\nclass User: pass')
+
+    def test_render_many_applies_render_hooks(self):
+        self.generator.add_hook('pre_render', lambda context: context.update(extra='pass'), name='extra')
+        self.generator.add_hook('post_render', shout)
+        contexts = [{'name': 'A'}, {'name': 'B'}]
+        pairs = list(self.generator.render_many('model.py', contexts))
+        self.assertEqual([output for _, output in pairs], ['CLASS A: PASS', 'CLASS B: PASS'])
+        result = self.generator.render_many('model.py', contexts, self.path('{name}.py'))
+        self.assertEqual(len(result.generated), 2)
+        self.assertEqual(self.read('B.py'), 'CLASS B: PASS')
+        self.assertEqual(self.generator.hooks.timings()['extra']['calls'], 4)
+
+    def test_batch_hook_receives_every_output_once(self):
+        calls = []
+        self.generator.add_hook('batch', calls.append, name='collect')
+        batch = self.generate(workers=3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(calls[0]), sorted(item['output_path'] for item in self.outputs))
+        self.assertEqual(batch.hook_errors, [])
+        self.assertEqual(self.generator.hooks.timings()['collect']['outputs'], 5)
+
+    def test_batch_hook_errors_are_reported(self):
+        def fail(paths):
+            raise RuntimeError('formatter crashed')
+        self.generator.add_hook('batch', fail)
+        batch = self.generate()
+        self.assertFalse(batch.failed)
+        self.assertEqual([name for name, _ in batch.hook_errors], ['fail'])
+        self.assertEqual(batch.summary()['hook_errors'], 1)
+        with self.assertRaises(BatchGenerationError):
+            batch.raise_for_errors()
+
+    def test_process_workers(self):
+        self.generator.add_hook('post_render', shout)
+        self.generate(executor='process', workers=2)
+        self.assertEqual(self.read('model_0.py'), 'CLASS M0: ')
+        self.assertEqual(self.generator.hooks.timings()['shout']['calls'], 5)
+        # Hooks that cannot be pickled run in the parent process instead.
+        self.generator.add_hook('post_render', lambda content: content + '# done\n', name='suffix')
+        self.generate(executor='process', workers=2)
+        self.assertEqual(self.read('model_4.py'), 'CLASS M4: # done\n')
+
+    def test_command_hook_runs_in_chunks(self):
+        script = 'import sys\nfor path in sys.argv[1:]:\n    open(path, "a").write("# formatted\\n")\n'
+        self.generator.add_hook('batch', command_hook([sys.executable, '-c', script], workers=2, chunk_size=2),
+                                name='format')
+        batch = self.generate()
+        self.assertEqual(batch.hook_errors, [])
+        self.assertTrue(all(self.read(f'model_{i}.py').endswith('# formatted\n') for i in range(5)))
+        failing = command_hook([sys.executable, '-c', 'import sys; sys.exit(3)'])
+        with self.assertRaises(OutputError):
+            failing([self.path('model_0.py')])
+
+
+if __name__ == '__main__':
+    unittest.main()
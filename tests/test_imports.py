@@ -0,0 +1,43 @@
+import unittest
+import os
+import subprocess
+import sys
+import code_gen_lib
+from code_gen_lib.benchmarks.bench_import import MARKER, parse_importtime
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def run_python(self, code):
+        package_parent = os.path.dirname(os.path.dirname(os.path.abspath(code_gen_lib.__file__)))
+        return subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                              cwd=package_parent, check=True).stdout.split()
+
+    def test_package_import_does_not_load_heavy_dependencies(self):
+        loaded = self.run_python(
+            "import sys, code_gen_lib\n"
+            "code_gen_lib.camel_to_snake('FooBar')\n"
+            "print('jinja2' in sys.modules, 'yaml' in sys.modules)")
+        self.assertEqual(loaded, ['False', 'False'])
+
+    def test_attributes_load_on_first_use(self):
+        from code_gen_lib.core.generator import CodeGenerator
+        self.assertIs(code_gen_lib.CodeGenerator, CodeGenerator)
+        self.assertIn('CodeGenerator', dir(code_gen_lib))
+        with self.assertRaises(AttributeError):
+            code_gen_lib.DoesNotExist
+
+    def test_parse_importtime(self):
+        stderr = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 | site',
+            MARKER,
+            'import time:        20 |         20 |   code_gen_lib.utils',
+            'import time:        30 |         50 | code_gen_lib',
+        ])
+        self.assertEqual(parse_importtime(stderr), [('code_gen_lib.utils', 20, 20, 1),
+                                                    ('code_gen_lib', 30, 50, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
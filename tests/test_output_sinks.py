@@ -0,0 +1,95 @@
+import unittest
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import yaml
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.utils.file_operations import BatchFileWriter
+from code_gen_lib.utils.output_sinks import MemorySink, TarSink, ZipSink, create_sink
+
+
+class TestOutputSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.temp_dir, 'project')
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'incremental': True}, f)
+        self.generator = CodeGenerator(self.config_path)
+        self.configs = [{
+            'template_name': 'database/connection.py.jinja2',
+            'output_path': os.path.join(self.project_dir, 'app', f'db_{index}.py'),
+            'context': {'database_url': f'sqlite:///{index}.db'},
+        } for index in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_memory_sink(self):
+        sink = MemorySink(root=self.project_dir)
+        result = self.generator.generate_multiple(self.configs, sink=sink)
+        self.assertEqual(len(result.generated), 3)
+        self.assertEqual(sorted(sink.files), ['app/db_0.py', 'app/db_1.py', 'app/db_2.py'])
+        self.assertIn('sqlite:///1.db', sink.read('app/db_1.py'))
+        self.assertEqual(sorted(sink.tree()['app']), ['db_0.py', 'db_1.py', 'db_2.py'])
+        self.assertFalse(os.path.exists(self.project_dir))
+
+        # Outputs in a sink are never skipped by the incremental manifest.
+        again = self.generator.generate_multiple(self.configs, sink=MemorySink(root=self.project_dir))
+        self.assertEqual(len(again.generated), 3)
+
+        sink.write_to(self.project_dir)
+        self.assertTrue(os.path.exists(os.path.join(self.project_dir, 'app', 'db_2.py')))
+
+    def test_zip_sink_with_process_backend(self):
+        buffer = io.BytesIO()
+        with ZipSink(buffer, root=self.project_dir) as sink:
+            result = self.generator.generate_multiple(self.configs, workers=2, executor='process', sink=sink)
+        self.assertFalse(result.failed)
+        with zipfile.ZipFile(buffer) as archive:
+            self.assertEqual(sorted(archive.namelist()), ['app/db_0.py', 'app/db_1.py', 'app/db_2.py'])
+            self.assertIn(b'sqlite:///2.db', archive.read('app/db_2.py'))
+
+    def test_tar_sink(self):
+        archive_path = os.path.join(self.temp_dir, 'project.tar.gz')
+        with create_sink(archive_path, root=self.project_dir) as sink:
+            self.assertIsInstance(sink, TarSink)
+            self.generator.generate_multiple(self.configs, workers=2, executor='thread', sink=sink)
+        with tarfile.open(archive_path) as archive:
+            self.assertEqual(sorted(archive.getnames()), ['app/db_0.py', 'app/db_1.py', 'app/db_2.py'])
+
+    def test_zip_sink_keeps_entries_whole_and_unique(self):
+        def failing():
+            yield 'partial'
+            raise RuntimeError('render failed')
+
+        buffer = io.BytesIO()
+        with ZipSink(buffer) as sink:
+            sink.write('a.py', 'a')
+            with self.assertRaises(FileExistsError):
+                sink.write('a.py', 'again')
+            with self.assertRaises(RuntimeError):
+                sink.write_chunks('b.py', failing())
+            sink.write('b.py', 'b')
+        with zipfile.ZipFile(buffer) as archive:
+            self.assertEqual(archive.namelist(), ['a.py', 'b.py'])
+            self.assertEqual(archive.read('a.py'), b'a')
+
+    def test_sink_stats_match_the_file_writer(self):
+        expected = set(BatchFileWriter().stats())
+        for sink in (MemorySink(), ZipSink(io.BytesIO()), TarSink(io.BytesIO())):
+            with sink:
+                self.assertEqual(set(sink.stats()), expected, type(sink).__name__)
+
+    def test_paths_escaping_the_sink_are_rejected(self):
+        sink = MemorySink(root=self.project_dir)
+        with self.assertRaises(ValueError):
+            sink.write(os.path.join(self.project_dir, '..', 'evil.py'), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
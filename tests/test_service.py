@@ -0,0 +1,165 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from code_gen_lib.service import GenerationHTTPServer, GenerationService, ServiceError
+
+
+class TestGenerationService(unittest.TestCase):
+
+    executor = 'thread'
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = os.path.join(self.temp_dir, 'codegen.yaml')
+        with open(self.config_path, 'w') as f:
+            f.write('templates:\n  database/connection.py.jinja2:\n    database_url: sqlite:///app.db\n')
+        self.service = GenerationService(self.config_path, workers=1, executor=self.executor, max_queue=0,
+                                         warm=False)
+        self.server = GenerationHTTPServer(self.service, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join(5)
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, path, payload=None, body=None, headers=None):
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.server.url + path, data=body,
+                                         headers=dict({'Content-Type': 'application/json'}, **(headers or {})))
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, json.loads(response.read()), response.headers
+        except urllib.error.HTTPError as e:
+            with e:
+                return e.code, json.loads(e.read()), e.headers
+
+    def test_render(self):
+        status, response, _ = self.request('/render', {'template_name': 'database/connection.py.jinja2'})
+        self.assertEqual(status, 200)
+        self.assertIn('sqlite:///app.db', response['output'])
+
+    def test_generate_and_batch(self):
+        status, response, _ = self.request('/generate', {
+            'template_name': 'database/connection.py.jinja2', 'output_path': 'out/db.py'})
+        self.assertEqual((status, response['generated']), (200, True))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'out', 'db.py')))
+
+        status, response, _ = self.request('/batch', {'outputs': [
+            {'template_name': 'database/connection.py.jinja2', 'output_path': 'out/db.py'},
+            {'template_name': 'missing.jinja2', 'output_path': 'missing.py'},
+        ]})
+        self.assertEqual(status, 200)
+        self.assertFalse(response['ok'])
+        self.assertEqual([r['status'] for r in response['results']], ['generated', 'failed'])
+
+    def test_errors(self):
+        self.assertEqual(self.request('/render', body=b'{not json')[0], 400)
+        self.assertEqual(self.request('/render', {'context': {}})[0], 400)
+        self.assertEqual(self.request('/render', {'template_name': 'missing.jinja2'})[0], 422)
+        self.assertEqual(self.request('/nowhere', {})[0], 404)
+        self.assertEqual(self.request('/health', {})[0], 405)
+        # A file where the output directory should be: an OutputError, not a server error.
+        open(os.path.join(self.temp_dir, 'blocker'), 'w').close()
+        self.assertEqual(self.request('/generate', {'template_name': 'database/connection.py.jinja2',
+                                                    'output_path': 'blocker/db.py'})[0],
+                         422)
+
+    def test_refuses_cross_site_requests(self):
+        # Bodies a browser may send cross-site without a preflight.
+        self.assertEqual(self.request('/render', {'template_name': 'database/connection.py.jinja2'},
+                                      headers={'Content-Type': 'text/plain'})[0], 415)
+        # A page on another site reaching the port through DNS rebinding.
+        self.assertEqual(self.request('/health', headers={'Host': 'evil.example'})[0], 403)
+        self.assertEqual(self.request('/render', {'template_name': 'database/connection.py.jinja2'},
+                                      headers={'Host': f'evil.example:{self.server.server_port}'})[0], 403)
+        self.assertEqual(self.request('/health', headers={'Host': f'localhost:{self.server.server_port}'})[0], 200)
+
+    def test_confines_outputs_to_output_root(self):
+        outside = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, outside)
+        os.symlink(outside, os.path.join(self.temp_dir, 'link'))
+        for output_path in (os.path.join(outside, 'db.py'), '../db.py', 'out/../../db.py', 'link/db.py'):
+            item = {'template_name': 'database/connection.py.jinja2', 'output_path': output_path}
+            self.assertEqual(self.request('/generate', item)[0], 403, output_path)
+            self.assertEqual(self.request('/batch', {'outputs': [item]})[0], 403, output_path)
+        self.assertEqual(os.listdir(outside), [])
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.temp_dir), 'db.py')))
+
+    def test_rejects_when_saturated(self):
+        # One worker and no queue: a held slot leaves no room for another request.
+        with self.service.admit():
+            status, response, headers = self.request('/render', {'template_name': 'database/connection.py.jinja2'})
+        self.assertEqual(status, 503)
+        self.assertEqual(headers['Retry-After'], '1')
+        self.assertEqual(self.request('/render', {'template_name': 'database/connection.py.jinja2'})[0], 200)
+
+    def blocked_batch(self, service, count):
+        # pre_render hooks run before an output is handed to the pool, in every backend.
+        release = threading.Event()
+
+        def block(context):
+            release.wait(10)
+        service.generator.add_hook('pre_render', block)
+        outputs = [{'template_name': 'database/connection.py.jinja2',
+                    'output_path': f'out/{i}.py'} for i in range(count)]
+        return release, {'outputs': outputs}
+
+    def wait_until_idle(self, service):
+        deadline = time.monotonic() + 10
+        while service.metrics_snapshot()['in_flight'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_batch_times_out(self):
+        self.service.request_timeout = 0.2
+        release, request = self.blocked_batch(self.service, 2)
+        self.assertEqual(self.request('/batch', request)[0], 504)
+        # The timed-out batch still holds its slot until it finishes.
+        self.assertEqual(self.request('/render', {'template_name': 'database/connection.py.jinja2'})[0], 503)
+        release.set()
+        self.wait_until_idle(self.service)
+        self.assertEqual(self.request('/render', {'template_name': 'database/connection.py.jinja2'})[0], 200)
+
+    def test_batch_outputs_count_against_admission(self):
+        service = GenerationService(self.config_path, workers=2, executor=self.executor, max_queue=1, warm=False)
+        self.addCleanup(service.close)
+        release, request = self.blocked_batch(service, 5)
+        thread = threading.Thread(target=service.batch, args=(request,))
+        thread.start()
+        deadline = time.monotonic() + 10
+        while service.metrics_snapshot()['queued'] != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Five outputs take all three slots, so there is no room for one more render.
+        with self.assertRaises(ServiceError) as raised:
+            service.render({'template_name': 'database/connection.py.jinja2'})
+        self.assertEqual(raised.exception.status, 503)
+        release.set()
+        thread.join(10)
+        self.assertEqual(len(os.listdir(os.path.join(self.temp_dir, 'out'))), 5)
+
+    def test_health_and_metrics(self):
+        self.assertEqual(self.request('/health')[1]['status'], 'ok')
+        self.request('/render', {'template_name': 'database/connection.py.jinja2'})
+        self.request('/render', {'template_name': 'missing.jinja2'})
+        metrics = self.request('/metrics')[1]
+        self.assertEqual(metrics['endpoints']['/render']['requests'], 2)
+        self.assertEqual(metrics['endpoints']['/render']['errors'], 1)
+        self.assertEqual((metrics['backend'], metrics['workers'], metrics['in_flight']), (self.executor, 1, 0))
+
+
+class TestGenerationServiceProcesses(TestGenerationService):
+
+    executor = 'process'
+
+
+if __name__ == '__main__':
+    unittest.main()
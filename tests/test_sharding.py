@@ -0,0 +1,107 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+import yaml
+from code_gen_lib.cli import main
+from code_gen_lib.core.exceptions import ShardingError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.sharding import generate_shard, merge_shard_results, plan_shards, shard_key
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(template_dir)
+        with open(os.path.join(template_dir, 'model.py'), 'w') as f:
+            f.write('class {{ name }}:\n    pass\n')
+        self.config_path = os.path.join(self.temp_dir, 'codegen.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump({'template_dirs': [template_dir]}, f)
+        self.outputs = [{'template_name': 'model.py', 'output_path': f'out/model_{i}.py', 'context': {'name': f'M{i}'}}
+                        for i in range(20)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_shards(self, shard_count, outputs=None, balance='hash', costs=None):
+        outputs = outputs or self.outputs
+        root = os.path.join(self.temp_dir, f'run_{shard_count}_{balance}')
+        items = [dict(item, output_path=os.path.join(root, item['output_path'])) for item in outputs]
+        with redirect_stdout(io.StringIO()):
+            generator = CodeGenerator(self.config_path)
+            results = [generate_shard(generator, items, index, shard_count, balance=balance, costs=costs, root=root)
+                       for index in range(shard_count)]
+        return results
+
+    def test_plan_is_stable_and_covers_every_item(self):
+        plan = plan_shards(self.outputs, 4)
+        self.assertEqual(sorted(index for shard in plan.shards for index in shard), list(range(20)))
+        self.assertEqual(plan.shards, plan_shards(list(self.outputs), 4).shards)
+        # An output stays on its shard when unrelated items are added.
+        grown = plan_shards(self.outputs + [{'template_name': 'model.py', 'output_path': 'out/extra.py'}], 4)
+        self.assertEqual([tuple(i for i in shard if i < 20) for shard in grown.shards], plan.shards)
+
+    def test_shard_key_is_relative_to_root(self):
+        self.assertEqual(shard_key('/a/b/out/./x.py', '/a/b'), 'out/x.py')
+        self.assertEqual(shard_key('out//x.py'), 'out/x.py')
+
+    def test_cost_balancing(self):
+        outputs = [{'template_name': 'big.py' if i < 2 else 'small.py', 'output_path': f'{i}.py'} for i in range(10)]
+        plan = plan_shards(outputs, 2, balance='cost', costs={'big.py': 4.0, 'small.py': 1.0})
+        self.assertEqual(plan.loads, [8.0, 8.0])
+        self.assertEqual([sum(i < 2 for i in shard) for shard in plan.shards], [1, 1])
+        with self.assertRaises(ValueError):
+            plan_shards(outputs, 2, balance='random')
+
+    def test_merge_is_independent_of_shard_count(self):
+        merged = [merge_shard_results(self.run_shards(count)) for count in (1, 3, 7)]
+        self.assertTrue(merged[0]['ok'])
+        self.assertEqual(merged[0]['summary'], {'generated': 20, 'skipped': 0, 'failed': 0})
+        for other in merged[1:]:
+            self.assertEqual({k: v for k, v in other.items() if k != 'shards'},
+                             {k: v for k, v in merged[0].items() if k != 'shards'})
+        balanced = merge_shard_results(self.run_shards(3, balance='cost', costs=merged[0]['shards']['template_costs']))
+        self.assertEqual(balanced['outputs'], merged[0]['outputs'])
+
+    def test_merge_detects_missing_and_mismatched_shards(self):
+        results = self.run_shards(3)
+        with self.assertRaises(ShardingError):
+            merge_shard_results(results[:2])
+        with self.assertRaises(ShardingError):
+            merge_shard_results(results + [results[0]])
+        other = self.run_shards(3, outputs=self.outputs[:10])
+        with self.assertRaises(ShardingError):
+            merge_shard_results(results[:2] + other[2:])
+
+    def test_conflicting_outputs(self):
+        outputs = self.outputs + [{'template_name': 'model.py', 'output_path': 'out/model_0.py',
+                                   'context': {'name': 'Other'}}]
+        merged = merge_shard_results(self.run_shards(3, outputs=outputs))
+        self.assertFalse(merged['ok'])
+        self.assertEqual(merged['conflicts'], [{'output_path': 'out/model_0.py', 'indices': [0, 20]}])
+        self.assertEqual(merged['summary']['failed'], 2)
+
+    def test_command_line(self):
+        manifest_path = os.path.join(self.temp_dir, 'batch.json')
+        with open(manifest_path, 'w') as f:
+            json.dump({'config': 'codegen.yaml', 'outputs': self.outputs}, f)
+        result_paths = [os.path.join(self.temp_dir, f'shard-{i}.json') for i in range(2)]
+        merged_path = os.path.join(self.temp_dir, 'merged.json')
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            for index, path in enumerate(result_paths):
+                self.assertEqual(main(['generate', manifest_path, '--shard', f'{index}/2',
+                                       '--shard-result', path]), 0)
+            self.assertEqual(main(['merge', *result_paths, '--output', merged_path]), 0)
+            self.assertEqual(main(['merge', result_paths[0]]), 2)
+        with open(merged_path) as f:
+            self.assertEqual(json.load(f)['summary']['generated'], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
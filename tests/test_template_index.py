@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+import tempfile
+from code_gen_lib.templates import list_templates
+from code_gen_lib.templates.index import TemplateIndex
+
+
+class TestTemplateIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.write('crud/model.py.jinja2', 'class {{ name }}: {{ body | default("pass") }}')
+        self.write('crud/view.py.jinja2', '{% set title = name %}def {{ title }}(): pass')
+        self.write('settings.py.jinja2', 'DEBUG = {{ debug }}')
+        self.index = TemplateIndex(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_names_match_loader_naming(self):
+        self.assertEqual(self.index.names(),
+                         ['crud/model.py.jinja2', 'crud/view.py.jinja2', 'settings.py.jinja2'])
+
+    def test_glob_and_prefix_queries(self):
+        self.assertEqual(self.index.glob('*/view.*'), ['crud/view.py.jinja2'])
+        self.assertEqual(self.index.with_prefix('crud/'), ['crud/model.py.jinja2', 'crud/view.py.jinja2'])
+        self.assertEqual(self.index.with_prefix('nothing/'), [])
+
+    def test_metadata(self):
+        info = self.index.metadata('crud/view.py.jinja2')
+        self.assertEqual(info['size'], os.path.getsize(os.path.join(self.temp_dir, 'crud', 'view.py.jinja2')))
+        self.assertEqual(info['required_variables'], ['name'])
+        self.assertEqual(len(info['checksum']), 64)
+        with self.assertRaises(KeyError):
+            self.index.metadata('missing.jinja2')
+
+    def test_lazy_iteration(self):
+        metadata = self.index.iter_metadata(prefix='crud/')
+        self.assertEqual(next(metadata)['name'], 'crud/model.py.jinja2')
+
+    def test_rebuilt_only_when_directories_change(self):
+        self.index.names()
+        self.assertFalse(self.index.refresh())
+        self.write('crud/delete.py.jinja2', 'delete')
+        self.assertIn('crud/delete.py.jinja2', self.index)
+        self.assertFalse(self.index.refresh())
+
+    def test_metadata_follows_file_edits(self):
+        first = self.index.metadata('settings.py.jinja2')
+        self.write('settings.py.jinja2', 'DEBUG = {{ debug }}\nSECRET = {{ secret_key }}')
+        second = self.index.metadata('settings.py.jinja2')
+        self.assertNotEqual(first['checksum'], second['checksum'])
+        self.assertEqual(second['required_variables'], ['debug', 'secret_key'])
+
+    def test_packaged_templates(self):
+        templates = list_templates()
+        self.assertIn('connection.py.jinja2', templates['database'])
+        self.assertIn('flask_config.py.jinja2', templates['framework_configs'])
+
+
+if __name__ == '__main__':
+    unittest.main()
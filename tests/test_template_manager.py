@@ -1,6 +1,7 @@
 import unittest
 import os
 import tempfile
+from code_gen_lib.core.exceptions import TemplateError
 from code_gen_lib.core.template_manager import TemplateManager
 
 class TestTemplateManager(unittest.TestCase):
@@ -64,5 +65,59 @@ class TestTemplateManager(unittest.TestCase):
         content = self.template_manager.get_template_content('test2.py')
         self.assertEqual(content, 'Content of test2')
 
+    def test_render_template_to_file(self):
+        self.create_test_template('loop.py', '{% for i in items %}line {{ i }}\n{% endfor %}')
+        output_dir = tempfile.mkdtemp()
+        output_path = os.path.join(output_dir, 'out.py')
+        written = self.template_manager.render_template_to_file(
+            'loop.py', {'items': range(1000)}, output_path, buffer_size=256)
+        with open(output_path) as f:
+            content = f.read()
+        self.assertEqual(written, len(content))
+        self.assertEqual(content, self.template_manager.render_template('loop.py', {'items': range(1000)}))
+        os.remove(output_path)
+        os.rmdir(output_dir)
+
+    def test_render_template_to_file_removes_partial_output(self):
+        self.create_test_template('broken.py', '{{ 1 }}{{ 1 / 0 }}')
+        output_dir = tempfile.mkdtemp()
+        output_path = os.path.join(output_dir, 'out.py')
+        with self.assertRaises(TemplateError):
+            self.template_manager.render_template_to_file('broken.py', {}, output_path)
+        self.assertFalse(os.path.exists(output_path))
+        os.rmdir(output_dir)
+
+    def test_render_many_uses_shared_context(self):
+        self.create_test_template('greet.py', '{{ greeting }} {{ name }}')
+        pairs = list(self.template_manager.render_many('greet.py', [{'name': 'A'}, {'name': 'B', 'greeting': 'Bye'}],
+                                                       {'greeting': 'Hi'}))
+        self.assertEqual([output for _, output in pairs], ['Hi A', 'Bye B'])
+        self.assertEqual(pairs[0][0], {'name': 'A'})
+
+    def test_render_cache_hits_and_bypasses(self):
+        self.create_test_template('hello.py', 'Hello {{ name }}')
+        cache = self.template_manager.enable_render_cache()
+        self.assertEqual(self.template_manager.render_template('hello.py', {'name': 'A'}), 'Hello A')
+        self.assertEqual(self.template_manager.render_template('hello.py', {'name': 'A'}), 'Hello A')
+        self.assertEqual(self.template_manager.render_template('hello.py', {'name': 'B'}), 'Hello B')
+        self.template_manager.render_template('hello.py', {'name': lambda: 'C'})
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['bypassed']), (1, 2, 1))
+        self.assertEqual(self.template_manager.render_with_stats('hello.py', {'name': 'B'}), ('Hello B', True))
+
+    def test_render_cache_distinguishes_lists_and_tuples(self):
+        self.create_test_template('value.py', '{{ value }}')
+        self.template_manager.enable_render_cache()
+        self.assertEqual(self.template_manager.render_template('value.py', {'value': [1]}), '[1]')
+        self.assertEqual(self.template_manager.render_template('value.py', {'value': (1,)}), '(1,)')
+
+    def test_render_cache_notices_template_changes(self):
+        self.create_test_template('hello.py', 'Hello {{ name }}')
+        self.template_manager.enable_render_cache()
+        self.template_manager.render_template('hello.py', {'name': 'A'})
+        self.create_test_template('hello.py', 'Bye {{ name }}')
+        self.template_manager.reload_templates()
+        self.assertEqual(self.template_manager.render_template('hello.py', {'name': 'A'}), 'Bye A')
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stderr, redirect_stdout
+import yaml
+from code_gen_lib.cli import main
+from code_gen_lib.core.exceptions import ValidationError
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.template_manager import TemplateManager
+
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        os.makedirs(self.template_dir)
+        self.write_template('model.py', '{% include "header.py" %}class {{ model_name }}:\n'
+                                        '{% for field in fields %}    {{ field }} = None\n{% endfor %}'
+                                        '{% if docs %}"""{{ docs }}"""{% endif %}{{ base|default("object") }}\n')
+        self.write_template('header.py', '# {{ project }} {{ range(1)|list }}\n')
+        self.write_template('connection.py', 'URL = "{{ database_url }}"\n')
+        self.write_template('broken.py', '{% for %}')
+        self.write_config({
+            'template_dirs': [self.template_dir],
+            'templates': {'connection.py': {'required_kwargs': ['pool_size']}, 'model.py': {'project': 'demo'}},
+        })
+        self.outputs = [{'template_name': 'model.py', 'output_path': os.path.join(self.temp_dir, f'out/m{i}.py'),
+                         'context': {'model_name': f'M{i}', 'fields': ['id']}} for i in range(3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_template(self, name, content):
+        with open(os.path.join(self.template_dir, name), 'w') as f:
+            f.write(content)
+
+    def write_config(self, config):
+        self.config_path = os.path.join(self.temp_dir, 'codegen.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+
+    def generator(self):
+        with redirect_stdout(io.StringIO()):
+            return CodeGenerator(self.config_path)
+
+    def test_template_variables_are_cached(self):
+        template_manager = TemplateManager(self.template_dir, shared_environment=False)
+        variables = template_manager.get_template_variables('model.py')
+        self.assertEqual(variables.required, {'model_name', 'fields'})
+        self.assertEqual(variables.optional, {'docs', 'base'})
+        self.assertEqual(variables.references, ('header.py',))
+        self.assertIs(template_manager.get_template_variables('model.py'), variables)
+
+    def test_valid_manifest(self):
+        self.assertEqual(self.generator().validate_manifest(self.outputs), [])
+
+    def test_every_problem_is_reported(self):
+        outputs = self.outputs + [
+            {'template_name': 'model.py', 'output_path': 'x.py', 'context': {}},
+            {'template_name': 'connection.py', 'output_path': 'db.py'},
+            {'template_name': 'missing.py', 'output_path': 'missing.py'},
+            {'template_name': 'broken.py', 'output_path': 'broken.py'},
+            {'template_name': 'model.py'},
+        ]
+        issues = self.generator().validate_manifest(outputs)
+        self.assertEqual([issue.index for issue in issues], [3, 4, 5, 6, 7])
+        self.assertEqual(issues[0].missing, ('fields', 'model_name'))
+        self.assertEqual(issues[1].missing, ('database_url', 'pool_size'))
+
+    def test_context_transforms_and_hooks_count(self):
+        self.write_template('crud.py', '{{ model_name_snake }} {{ audit }}')
+        generator = self.generator()
+        generator.add_hook('pre_render', lambda context: context.update(audit=True), name='audit')
+        outputs = [{'template_name': 'crud.py', 'output_path': 'crud.py', 'context': {'model_name': 'User'}}]
+        self.assertEqual(generator.validate_manifest(outputs), [])
+
+    def test_generate_multiple_stops_before_rendering(self):
+        generator = self.generator()
+        outputs = self.outputs + [{'template_name': 'connection.py', 'output_path': 'db.py'}]
+        with self.assertRaises(ValidationError) as raised:
+            generator.generate_multiple(outputs, validate=True)
+        self.assertEqual(len(raised.exception.issues), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'out')))
+        # Off by default: the item renders, with a blank database URL.
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(len(generator.generate_multiple(outputs).generated), 4)
+
+    def test_validated_batch_runs_pre_render_hooks_once(self):
+        calls = []
+        generator = self.generator()
+        generator.add_hook('pre_render', lambda context: calls.append(context['model_name']), name='count')
+        for executor in ('serial', 'thread', 'process'):
+            calls.clear()
+            with redirect_stdout(io.StringIO()):
+                batch = generator.generate_multiple(self.outputs, executor=executor, workers=2, validate=True)
+            self.assertEqual(len(batch.generated), 3)
+            self.assertEqual(sorted(calls), ['M0', 'M1', 'M2'])
+        self.assertEqual(generator.hooks.timings()['count']['calls'], 9)
+
+    def test_validation_config_and_generate_code(self):
+        self.write_config({'template_dirs': [self.template_dir], 'validation': True})
+        generator = self.generator()
+        with self.assertRaises(ValidationError):
+            generator.generate_code('connection.py', os.path.join(self.temp_dir, 'db.py'))
+        with self.assertRaises(ValidationError):
+            generator.generate_multiple(self.outputs + [{'template_name': 'broken.py', 'output_path': 'b.py'}])
+
+    def test_command_line(self):
+        manifest_path = os.path.join(self.temp_dir, 'batch.json')
+        with open(manifest_path, 'w') as f:
+            json.dump({'config': 'codegen.yaml', 'outputs': [
+                {'template_name': 'model.py', 'output_path': 'a.py', 'context': {'model_name': 'A', 'fields': []}},
+                {'template_name': 'connection.py', 'output_path': 'b.py'},
+            ]}, f)
+        stderr = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(stderr):
+            self.assertEqual(main(['validate', manifest_path]), 1)
+            self.assertEqual(main(['generate', manifest_path, '--validate', '--quiet']), 2)
+        self.assertIn('database_url, pool_size', stderr.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'a.py')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import os
+import shutil
+import tempfile
+import yaml
+from code_gen_lib.core.generator import CodeGenerator
+from code_gen_lib.core.watcher import GenerationWatcher
+
+
+class TestGenerationWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_dir = os.path.join(self.temp_dir, 'templates')
+        os.mkdir(self.template_dir)
+        self.write(os.path.join(self.template_dir, 'model.jinja2'), 'class {{ name }}: pass')
+        self.write(os.path.join(self.template_dir, 'settings.jinja2'), 'DEBUG = {{ debug }}')
+        self.config_path = os.path.join(self.temp_dir, 'config.yaml')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'template_dirs': [self.template_dir]}, f)
+
+        self.generator = CodeGenerator(self.config_path)
+        self.configs = [
+            {'template_name': 'model.jinja2', 'output_path': self.output('user.py'), 'context': {'name': 'User'}},
+            {'template_name': 'settings.jinja2', 'output_path': self.output('settings.py'), 'context': {'debug': True}},
+        ]
+        self.generator.generate_multiple(self.configs)
+        self.watcher = GenerationWatcher(self.generator, self.configs, interval=0.01, debounce=0.01)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def output(self, name):
+        return os.path.join(self.temp_dir, 'out', name)
+
+    def write(self, path, content):
+        with open(path, 'w') as f:
+            f.write(content)
+
+    def test_poll_detects_changes(self):
+        self.assertEqual(self.watcher.poll(), set())
+        path = os.path.join(self.template_dir, 'model.jinja2')
+        self.write(path, 'class {{ name }}(Base): pass')
+        self.assertEqual(self.watcher.poll(), {os.path.abspath(path)})
+
+    def test_cycle_regenerates_only_affected_outputs(self):
+        self.write(os.path.join(self.template_dir, 'model.jinja2'), 'class {{ name }}(Base): pass')
+        result = self.watcher.run_cycle(self.watcher.poll())
+        self.assertEqual([r.output_path for r in result], [self.output('user.py')])
+        with open(self.output('user.py')) as f:
+            self.assertEqual(f.read(), 'class User(Base): pass')
+        self.assertEqual(len(self.watcher.cycles), 1)
+
+    def test_config_reload_rebinds_the_graph(self):
+        other_dir = os.path.join(self.temp_dir, 'other_templates')
+        os.mkdir(other_dir)
+        self.write(os.path.join(other_dir, 'model.jinja2'), 'class {{ name }}(Other): pass')
+        self.write(os.path.join(other_dir, 'settings.jinja2'), 'DEBUG = {{ debug }}')
+        with open(self.config_path, 'w') as f:
+            yaml.dump({'template_dirs': [other_dir]}, f)
+        self.watcher.run_cycle(self.watcher.poll())
+        self.assertIs(self.watcher.graph.template_manager, self.generator.template_manager)
+        self.assertIn(os.path.join(other_dir, 'model.jinja2'), self.watcher.graph.template_files)
+        with open(self.output('user.py')) as f:
+            self.assertEqual(f.read(), 'class User(Other): pass')
+
+        self.write(os.path.join(other_dir, 'model.jinja2'), 'class {{ name }}(Edited): pass')
+        result = self.watcher.run_cycle(self.watcher.poll())
+        self.assertEqual([r.output_path for r in result], [self.output('user.py')])
+
+
+if __name__ == '__main__':
+    unittest.main()
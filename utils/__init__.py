@@ -1,13 +1,21 @@
 # utils/__init__.py
 
-# Import functions from file_operations.py
-from .file_operations import create_directory, write_file
+from .lazy import lazy_attributes
 
-# Import functions from string_utils.py
-from .string_utils import camel_to_snake, snake_to_camel
+# Functions from file_operations.py and string_utils.py are imported on first use,
+# so that importing the package does not load yaml.
+_LAZY_ATTRIBUTES = {
+    'create_directory': ('.file_operations', 'ensure_directory'),
+    'write_file': ('.file_operations', 'write_file'),
+    'camel_to_snake': ('.string_utils', 'camel_to_snake'),
+    'snake_to_camel': ('.string_utils', 'snake_to_camel'),
+    'snake_to_pascal': ('.string_utils', 'snake_to_pascal'),
+    'pluralize': ('.string_utils', 'pluralize'),
+}
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY_ATTRIBUTES, globals())
 
 # You can optionally define __all__ to specify what gets imported with "from utils import *"
-__all__ = ['create_directory', 'write_file', 'camel_to_snake', 'snake_to_camel']
+__all__ = ['create_directory', 'write_file', 'camel_to_snake', 'snake_to_camel', 'snake_to_pascal', 'pluralize']
 
 # Version of the utils package
 __version__ = '0.1.0'
@@ -24,4 +32,4 @@ def get_utils_info():
         'author': __author__,
         'email': __email__,
         'description': __description__
-    }
\ No newline at end of file
+    }
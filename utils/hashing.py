@@ -0,0 +1,32 @@
+import hashlib
+import json
+
+
+def hash_text(text):
+    """
+    Compute a stable hash of a string.
+
+    Args:
+        text (str): The text to hash.
+
+    Returns:
+        str: The hex-encoded SHA-256 digest of the text.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def hash_context(context):
+    """
+    Compute a stable hash of a template context.
+
+    Keys are sorted, so two equal contexts always hash the same regardless of
+    insertion order. Values that are not JSON serializable are hashed by their
+    repr(), which errs on the side of reporting a change.
+
+    Args:
+        context (dict): The template context.
+
+    Returns:
+        str: The hex-encoded SHA-256 digest of the context.
+    """
+    return hash_text(json.dumps(context, sort_keys=True, default=repr, separators=(',', ':')))
@@ -0,0 +1,34 @@
+import importlib
+
+
+def lazy_attributes(package, attributes, namespace):
+    """
+    Build module-level __getattr__ and __dir__ functions that import on first use.
+
+    A package's public names can be listed in a table instead of imported at the
+    top of its __init__.py, so importing the package stays cheap and heavy
+    dependencies such as jinja2 and yaml are only loaded by the first access to
+    a name that needs them. The loaded value is stored in the package namespace,
+    so later accesses are plain attribute lookups.
+
+    Args:
+        package (str): Name of the package, i.e. its ``__name__``.
+        attributes (dict): Mapping of public name to (relative module, attribute name).
+        namespace (dict): The package's ``globals()``.
+
+    Returns:
+        tuple: (__getattr__, __dir__) to assign at module level.
+    """
+    def __getattr__(name):
+        try:
+            module_name, attribute = attributes[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        value = getattr(importlib.import_module(module_name, package), attribute)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(attributes))
+
+    return __getattr__, __dir__
@@ -0,0 +1,360 @@
+import io
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+
+# Size up to which ZipSink holds an entry in memory before spilling it to a temporary file.
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+class OutputSink:
+    """
+    Base class of the non-filesystem output sinks.
+
+    Sinks expose the same interface as BatchFileWriter (write, write_chunks,
+    register, commit and stats), so they can be passed to
+    CodeGenerator.generate_multiple() in its place. With a ``root``, output
+    paths are resolved against it and turned into entry names relative to it,
+    and paths outside it are rejected. Without one, paths are used as given,
+    minus any leading separator. Names that would escape the sink (e.g.
+    '../x.py') are rejected, and archives reject a name written twice.
+    """
+
+    # Outputs never touch the real filesystem, so incremental skipping does not apply.
+    writes_to_filesystem = False
+
+    def __init__(self, root=None, encoding='utf-8'):
+        """
+        Initialize the OutputSink.
+
+        Args:
+            root (str, optional): Directory that output paths are made relative to.
+            encoding (str): Text encoding of the outputs.
+        """
+        self.root = os.path.abspath(root) if root is not None else None
+        self.encoding = encoding
+        self.fsync = False
+        self.buffer_size = io.DEFAULT_BUFFER_SIZE
+        self.files_written = 0
+        self.bytes_written = 0
+        self._names = set()
+        self._lock = threading.Lock()
+
+    def entry_name(self, file_path):
+        """
+        Map an output path to its name inside the sink.
+
+        Args:
+            file_path (str): The output path.
+
+        Returns:
+            str: The entry name, with '/' separators.
+
+        Raises:
+            ValueError: If the path is outside the root or would escape the sink.
+        """
+        path = file_path
+        if self.root is not None:
+            # Relative paths (and entry names) are taken relative to the root.
+            absolute = os.path.abspath(os.path.join(self.root, file_path))
+            if not absolute.startswith(self.root + os.sep):
+                raise ValueError(f"Output path is outside the sink root {self.root}: {file_path}")
+            path = os.path.relpath(absolute, self.root)
+        name = posixpath.normpath(path.replace(os.sep, '/')).lstrip('/')
+        if name in ('', '.') or name == '..' or name.startswith('../'):
+            raise ValueError(f"Output path escapes the sink: {file_path}")
+        return name
+
+    def write(self, file_path, content):
+        """
+        Add a file to the sink.
+
+        Args:
+            file_path (str): The output path.
+            content (str): The content to write.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        return self.write_chunks(file_path, (content,))
+
+    def write_chunks(self, file_path, chunks):
+        """
+        Add a file to the sink from an iterable of string chunks.
+
+        Args:
+            file_path (str): The output path.
+            chunks (iterable): The string chunks to write, in order.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        raise NotImplementedError
+
+    def register(self, file_path, nbytes):
+        """
+        Account for a file written elsewhere.
+
+        Args:
+            file_path (str): The output path.
+            nbytes (int): The number of bytes that were written.
+        """
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += nbytes
+
+    def commit(self):
+        """Finish a batch. Sinks stay open for further batches until close()."""
+        pass
+
+    def close(self):
+        """Finalize the sink."""
+        pass
+
+    def stats(self):
+        """
+        Report what was written to the sink.
+
+        Returns:
+            dict: The keys of BatchFileWriter.stats(); no directories or fsyncs
+                  are needed.
+        """
+        return {
+            'files_written': self.files_written,
+            'bytes_written': self.bytes_written,
+            'directories_created': 0,
+            'makedirs_calls': 0,
+            'fsync_calls': 0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _count(self, nbytes):
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += nbytes
+
+    def _claim(self, name):
+        # Archives cannot replace an entry; a second one would shadow the first.
+        # Called with the lock held.
+        if name in self._names:
+            raise FileExistsError(f"Output was already written to the archive: {name}")
+        self._names.add(name)
+
+
+class MemorySink(OutputSink):
+    """
+    Virtual file tree held in memory.
+
+    Writing a path twice replaces its content. The tree can be inspected or
+    written out to a real directory in one pass.
+    """
+
+    def __init__(self, root=None, encoding='utf-8'):
+        """
+        Initialize the MemorySink.
+
+        Args:
+            root (str, optional): Directory that output paths are made relative to.
+            encoding (str): Text encoding used to count bytes and by write_to().
+        """
+        super().__init__(root, encoding)
+        self.files = {}
+
+    def write_chunks(self, file_path, chunks):
+        name = self.entry_name(file_path)
+        content = ''.join(chunks)
+        nbytes = len(content.encode(self.encoding))
+        with self._lock:
+            self.files[name] = content
+        self._count(nbytes)
+        return nbytes
+
+    def read(self, name):
+        """
+        Get the content of a file in the tree.
+
+        Args:
+            name (str): Entry name or output path.
+
+        Returns:
+            str: The file content.
+
+        Raises:
+            KeyError: If the file is not in the tree.
+        """
+        return self.files[self.entry_name(name)]
+
+    def __contains__(self, name):
+        try:
+            return self.entry_name(name) in self.files
+        except ValueError:
+            return False
+
+    def __len__(self):
+        return len(self.files)
+
+    def tree(self):
+        """
+        Build a nested view of the files.
+
+        Returns:
+            dict: Directory names mapping to nested dicts and file names to contents.
+        """
+        root = {}
+        for name, content in sorted(self.files.items()):
+            node = root
+            *directories, filename = name.split('/')
+            for directory in directories:
+                node = node.setdefault(directory, {})
+            node[filename] = content
+        return root
+
+    def write_to(self, directory, writer=None):
+        """
+        Write every file of the tree below a real directory.
+
+        Args:
+            directory (str): Target directory.
+            writer (BatchFileWriter, optional): Writer to use; a new one is
+                                                created and committed if omitted.
+
+        Returns:
+            int: The number of files written.
+        """
+        from .file_operations import BatchFileWriter
+        own_writer = writer is None
+        if own_writer:
+            writer = BatchFileWriter(encoding=self.encoding)
+        for name, content in sorted(self.files.items()):
+            writer.write(os.path.join(directory, *name.split('/')), content)
+        if own_writer:
+            writer.commit()
+        return len(self.files)
+
+
+class ZipSink(OutputSink):
+    """
+    Streams outputs into a zip archive as they are generated.
+
+    Each entry is rendered into a spooled buffer first, which stays in memory
+    up to SPOOL_MAX_SIZE bytes, and is only appended to the archive once its
+    render succeeded, so a failed render leaves no truncated entry behind. The
+    archive is completed by close().
+    """
+
+    def __init__(self, file, root=None, compression=zipfile.ZIP_DEFLATED, encoding='utf-8'):
+        """
+        Initialize the ZipSink.
+
+        Args:
+            file (str or file object): Path of the archive, or a writable binary file object.
+            root (str, optional): Directory that output paths are made relative to.
+            compression (int): zipfile compression method.
+            encoding (str): Text encoding of the outputs.
+        """
+        super().__init__(root, encoding)
+        self.archive = zipfile.ZipFile(file, 'w', compression=compression)
+
+    def write_chunks(self, file_path, chunks):
+        info = zipfile.ZipInfo(self.entry_name(file_path), date_time=time.localtime()[:6])
+        info.compress_type = self.archive.compression
+        info.external_attr = 0o644 << 16
+        nbytes = 0
+        with tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE) as spool:
+            for chunk in chunks:
+                data = chunk.encode(self.encoding)
+                spool.write(data)
+                nbytes += len(data)
+            spool.seek(0)
+            # ZipFile supports one open entry at a time.
+            with self._lock:
+                self._claim(info.filename)
+                with self.archive.open(info, 'w', force_zip64=True) as entry:
+                    shutil.copyfileobj(spool, entry)
+                self.files_written += 1
+                self.bytes_written += nbytes
+        return nbytes
+
+    def close(self):
+        """Write the archive's central directory and close it."""
+        with self._lock:
+            self.archive.close()
+
+
+class TarSink(OutputSink):
+    """
+    Streams outputs into a tar archive, optionally gzip, bz2 or xz compressed.
+
+    The archive is written as a stream, so it can go to a pipe or socket as
+    well as a file. Tar headers carry the entry size, so each entry is
+    assembled in memory before it is appended.
+    """
+
+    def __init__(self, file, root=None, compression='gz', encoding='utf-8'):
+        """
+        Initialize the TarSink.
+
+        Args:
+            file (str or file object): Path of the archive, or a writable binary file object.
+            root (str, optional): Directory that output paths are made relative to.
+            compression (str): '', 'gz', 'bz2' or 'xz'.
+            encoding (str): Text encoding of the outputs.
+        """
+        super().__init__(root, encoding)
+        self._own_file = isinstance(file, (str, os.PathLike))
+        self._file = open(file, 'wb') if self._own_file else file
+        self.archive = tarfile.open(fileobj=self._file, mode=f"w|{compression}")
+
+    def write_chunks(self, file_path, chunks):
+        info = tarfile.TarInfo(self.entry_name(file_path))
+        data = ''.join(chunks).encode(self.encoding)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        with self._lock:
+            self._claim(info.name)
+            self.archive.addfile(info, io.BytesIO(data))
+            self.files_written += 1
+            self.bytes_written += info.size
+        return info.size
+
+    def close(self):
+        """Write the end-of-archive marker and close the archive."""
+        with self._lock:
+            self.archive.close()
+            if self._own_file:
+                self._file.close()
+
+
+def create_sink(target, root=None):
+    """
+    Create a sink for an archive path based on its extension.
+
+    Args:
+        target (str): '.zip', '.tar', '.tar.gz'/'.tgz', '.tar.bz2' or '.tar.xz' path.
+        root (str, optional): Directory that output paths are made relative to.
+
+    Returns:
+        OutputSink: A ZipSink or TarSink writing to ``target``.
+
+    Raises:
+        ValueError: If the extension is not recognised.
+    """
+    lowered = target.lower()
+    if lowered.endswith('.zip'):
+        return ZipSink(target, root)
+    for suffixes, compression in ((('.tar.gz', '.tgz'), 'gz'), (('.tar.bz2',), 'bz2'),
+                                  (('.tar.xz',), 'xz'), (('.tar',), '')):
+        if lowered.endswith(suffixes):
+            return TarSink(target, root, compression)
+    raise ValueError(f"Unsupported archive type: {target}")
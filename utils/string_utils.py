@@ -1,8 +1,128 @@
+import re
+from functools import lru_cache
 
+# Bound of the memo cache of each name conversion.
+NAME_CACHE_SIZE = 4096
+
+# 'URLs' -> 'URLS', so that a pluralized acronym stays one word.
+_ACRONYM_PLURAL = re.compile(r'([A-Z]{2,})s(?=[A-Z_]|$)')
+# 'HTTPServer' -> 'HTTP_Server'
+_ACRONYM_BOUNDARY = re.compile(r'([A-Z]+)([A-Z][a-z])')
+# 'userName' -> 'user_Name', 'model2Name' -> 'model2_Name'
+_WORD_BOUNDARY = re.compile(r'([a-z0-9])([A-Z])')
+_SEPARATORS = re.compile(r'[_\-\s]+')
+_LAST_WORD = re.compile(r'([A-Z]?[a-z]+|[A-Z]+)$')
+
+_IRREGULAR_PLURALS = {
+    'person': 'people',
+    'man': 'men',
+    'woman': 'women',
+    'child': 'children',
+    'mouse': 'mice',
+    'goose': 'geese',
+    'tooth': 'teeth',
+    'foot': 'feet',
+    'ox': 'oxen',
+    'leaf': 'leaves',
+    'life': 'lives',
+    'knife': 'knives',
+    'wife': 'wives',
+    'half': 'halves',
+    'index': 'indices',
+    'matrix': 'matrices',
+    'vertex': 'vertices',
+    'criterion': 'criteria',
+    'analysis': 'analyses',
+    'datum': 'data',
+}
+_UNCOUNTABLE = frozenset(['data', 'metadata', 'information', 'equipment', 'news', 'series', 'species',
+                          'media', 'feedback', 'software', 'hardware', 'staff', 'people', 'children'])
+_IRREGULAR_PLURAL_FORMS = frozenset(_IRREGULAR_PLURALS.values())
+# Singular endings in 's': 'address', 'status', 'analysis', 'alias'.
+_SINGULAR_S_ENDINGS = ('ss', 'us', 'is', 'as')
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
 def camel_to_snake(string):
-    return ''.join(['_' + char.lower() if char.isupper() else char for char in string]).lstrip('_')
+    """
+    Convert a camelCase or PascalCase string to snake_case.
+
+    Acronyms are kept together ('HTTPServer' -> 'http_server', 'userID' ->
+    'user_id', 'UserIDs' -> 'user_ids'). Results are memoized.
 
+    Args:
+        string (str): The string to convert.
+
+    Returns:
+        str: The snake_case string.
+    """
+    string = _ACRONYM_PLURAL.sub(r'\1S', string)
+    string = _ACRONYM_BOUNDARY.sub(r'\1_\2', string)
+    string = _WORD_BOUNDARY.sub(r'\1_\2', string)
+    return _SEPARATORS.sub('_', string).strip('_').lower()
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
 def snake_to_camel(string):
+    """
+    Convert a snake_case string to camelCase. Results are memoized.
+
+    Args:
+        string (str): The string to convert.
+
+    Returns:
+        str: The camelCase string.
+    """
     components = string.split('_')
     return components[0] + ''.join(x.title() for x in components[1:])
 
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def snake_to_pascal(string):
+    """
+    Convert a snake_case string to PascalCase. Results are memoized.
+
+    Args:
+        string (str): The string to convert.
+
+    Returns:
+        str: The PascalCase string.
+    """
+    return ''.join(x.title() for x in string.split('_'))
+
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def pluralize(string):
+    """
+    Pluralize the last word of an identifier with English rules.
+
+    The identifier's style is kept: 'UserCategory' -> 'UserCategories',
+    'sales_person' -> 'sales_people', 'URL' -> 'URLs'. Identifiers that are
+    already plural, such as 'Statuses', 'URLs' or 'urls', are returned as they
+    are. Results are memoized.
+
+    Args:
+        string (str): The identifier to pluralize.
+
+    Returns:
+        str: The pluralized identifier.
+    """
+    match = _LAST_WORD.search(string)
+    if match is None:
+        return string
+    prefix, word = string[:match.start()], match.group(1)
+    lowered = word.lower()
+    if word.isupper() and len(word) > 1:
+        return f"{string}s"
+    if lowered in _UNCOUNTABLE or lowered in _IRREGULAR_PLURAL_FORMS:
+        return string
+    if lowered.endswith('s') and not lowered.endswith(_SINGULAR_S_ENDINGS):
+        return string
+    if lowered in _IRREGULAR_PLURALS:
+        plural = _IRREGULAR_PLURALS[lowered]
+        return prefix + (plural.capitalize() if word[0].isupper() else plural)
+    if lowered.endswith(('s', 'x', 'z', 'ch', 'sh')):
+        return f"{string}es"
+    if lowered.endswith('y') and lowered[-2:-1] not in ('a', 'e', 'i', 'o', 'u', ''):
+        return f"{string[:-1]}ies"
+    return f"{string}s"